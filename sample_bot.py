@@ -0,0 +1,34 @@
+"""A sample Street Black Jack bot for the subprocess line protocol.
+
+Try it with:  python "94%.py" bots "python sample_bot.py" --opponents hard,easy
+
+Each request is one JSON line on stdin with an "id", the decision "kind"
+("turn", "pick up" or "suit"), the bot's "hand", the "top_card" and the
+legal "options". Answer with one JSON line {"id": ..., "move": index}.
+An optional first argument makes the bot think for that many seconds per
+move, which is handy for seeing the per-move timeout kick in.
+"""
+import collections
+import json
+import sys
+import time
+
+def choose(request):
+    options = request["options"]
+    if request["kind"] == "suit":
+        suit_counts = collections.Counter(card.split(' of ')[1] for card in request["hand"])
+        suits = [option["suit"] for option in options]
+        return max(range(len(options)), key=lambda index: suit_counts[suits[index]])
+    # Longest run first, then any single card, and only draw when nothing else is legal
+    return max(range(len(options)), key=lambda index: len(options[index].get("cards", [])))
+
+def main():
+    delay = float(sys.argv[1]) if len(sys.argv) > 1 else 0.0
+    for line in sys.stdin:
+        request = json.loads(line)
+        if delay:
+            time.sleep(delay)
+        print(json.dumps({"id": request["id"], "move": choose(request)}), flush=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,17 @@
+"""Street Black Jack, a UK-style card game, with AI players, simulations and bot APIs.
+
+The package is split so that each part imports only what it needs:
+
+    engine      cards, special card rules, move generation, effects, GameState, the event bus
+    ai          AIPlayer strategies, belief tracking and the endgame search
+    game        the turn loop and play_game
+    stats       statistics store
+    records     binary game records and replays
+    render      the terminal UI, loaded only once something is shown
+    simulation  sweeps, tournaments, duplicate deals and benchmarks
+    fuzz        differential checks of the move generators
+    bots        the HTTP/JSON and subprocess bot interfaces
+    cli         interactive setup, the command line and main()
+
+Importing the package itself loads none of them.
+"""
@@ -0,0 +1,725 @@
+"""AI players: the difficulty strategies, belief tracking over hidden hands and the endgame search."""
+import random
+import collections
+import itertools
+import threading
+
+from .engine import (
+    CARD_IDS, CARD_NAMES, CHANGE_SUIT, COVER, DEBUG_FLAGS, MISS_A_TURN, PICK_UP_FIVE, PICK_UP_TWO, find_valid_runs,
+    find_valid_single_cards, get_special_effect, is_pickup_card, played_effects, ranks, special_cards, suits)
+
+class AIPlayer:
+    def __init__(self, name, difficulty):
+        self.name = name
+        self.difficulty = difficulty
+        self.card_count = collections.defaultdict(int)
+        self.performance_score = 0        
+        self.strategy_weights = {'play_high': 0.5, 'play_low': 0.5, 'play_run': 0.5}
+        self.last_action = None
+        self.player_model = collections.defaultdict(lambda: collections.defaultdict(int))
+        self.beliefs = None  # BeliefTracker over the opponents' hands, set up by game.BeliefKeeper for hard and adaptive AIs
+        self.rng = random  # play_game hands every AI its game's own random.Random
+
+    def __str__(self):
+        return f"{self.name}[{self.difficulty.capitalize()}]"
+
+    def play_turn(self, hand, top_card, valid_single_cards, valid_runs, num_opponents=None):
+        if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+            print(f"DEBUG [AI]: {self} is deciding on a move")
+        if self.solves_endgame(hand) and (valid_single_cards or valid_runs):
+            action, choice, value = solve_endgame(hand, top_card, valid_single_cards, valid_runs, num_opponents or 1)
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} endgame search chose action {action} with choice {choice} (value {value:.2f})")
+            return action, choice
+        if self.difficulty == 'easy':
+            return self.play_easy(valid_single_cards, valid_runs)
+        elif self.difficulty == 'medium':
+            return self.play_medium(hand, valid_single_cards, valid_runs)
+        elif self.difficulty == 'hard':
+            return self.play_hard(hand, valid_single_cards, valid_runs)
+        elif self.difficulty == 'adaptive':
+            if self.performance_score > 0:
+                return self.play_hard(hand, valid_single_cards, valid_runs)
+            elif self.performance_score < 0:
+                return self.play_easy(valid_single_cards, valid_runs)
+            else:
+                return self.play_medium(hand, valid_single_cards, valid_runs)
+        else:  # learning
+            return self.play_learning(hand, valid_single_cards, valid_runs)
+
+    def solves_endgame(self, hand):
+        return self.difficulty in ('hard', 'adaptive') and len(hand) <= ENDGAME_HAND_SIZE
+
+    def play_easy(self, valid_single_cards, valid_runs):
+        if valid_runs:
+            choice = self.rng.randint(1, len(valid_runs))
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to play run {choice}")
+            return 2, choice
+        elif valid_single_cards:
+            choice = self.rng.randint(1, len(valid_single_cards))
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to play single card {choice}")
+            return 1, choice
+        else:
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to draw a card")
+            return 3, None
+
+    def play_medium(self, hand, valid_single_cards, valid_runs):
+        if valid_runs:
+            longest_run = max(valid_runs, key=lambda x: len(x.split(' - ')))
+            choice = valid_runs.index(longest_run) + 1
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to play run {choice}")
+            return 2, choice
+        elif valid_single_cards:
+            highest_card = max(valid_single_cards, key=lambda x: ranks.index(x.split()[0]))
+            choice = valid_single_cards.index(highest_card) + 1
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to play single card {choice}")
+            return 1, choice
+        else:
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to draw a card")
+            return 3, None
+
+    def play_hard(self, hand, valid_single_cards, valid_runs):
+        if self.rng.random() < 0.1:  # 10% chance to bluff
+            return self.bluff(valid_single_cards, valid_runs)
+
+        if self.beliefs:
+            pick_up_cards = [card for card in valid_single_cards if is_pickup_card(card)]
+            if pick_up_cards and self.beliefs.p_can_answer_pick_up() < PICK_UP_UNLIKELY:
+                choice = valid_single_cards.index(pick_up_cards[0]) + 1
+                if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                    print(f"DEBUG [AI]: {self} expects the next player can't answer a Pick Up, playing {choice}")
+                return 1, choice
+
+        count_score = self.get_card_count_score()
+        predicted_action = self.predict_player_action('human_player', len(hand))
+
+        if count_score > 5 and valid_single_cards:  # More low cards have been played
+            highest_card = max(valid_single_cards, key=lambda x: ranks.index(x.split()[0]))
+            choice = valid_single_cards.index(highest_card) + 1
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to play highest card {choice}")
+            return 1, choice
+        elif count_score < -5:  # More high cards have been played
+            if valid_single_cards:
+                lowest_card = min(valid_single_cards, key=lambda x: ranks.index(x.split()[0]))
+                choice = valid_single_cards.index(lowest_card) + 1
+                if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                    print(f"DEBUG [AI]: {self} chose to play lowest card {choice}")
+                return 1, choice
+            else:
+                if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                    print(f"DEBUG [AI]: {self} chose to draw a card")
+                return 3, None  # Draw a card
+        elif predicted_action == 'play_run' and valid_single_cards:
+            return self.play_highest_card(valid_single_cards)
+        elif valid_runs:
+            best_run = max(valid_runs, key=lambda x: len(x.split(' - ')))
+            choice = valid_runs.index(best_run) + 1
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to play run {choice}")
+            return 2, choice
+        elif valid_single_cards:
+            non_ace_cards = [card for card in valid_single_cards if 'Ace' not in card]
+            if self.beliefs and self.beliefs.p_can_answer_pick_up() >= PICK_UP_LIKELY:
+                # Save Pick Up cards for when they are more likely to stick
+                non_ace_cards = [card for card in non_ace_cards if not is_pickup_card(card)] or non_ace_cards
+            if non_ace_cards:
+                highest_card = max(non_ace_cards, key=lambda x: ranks.index(x.split()[0]))
+            else:
+                highest_card = valid_single_cards[0]
+            choice = valid_single_cards.index(highest_card) + 1
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to play single card {choice}")
+            return 1, choice
+        else:
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to draw a card")
+            return 3, None
+
+    def play_learning(self, hand, valid_single_cards, valid_runs):
+        if valid_runs and self.rng.random() < self.strategy_weights['play_run']:
+            self.last_action = 'play_run'
+            return self.play_best_run(valid_runs)
+        elif valid_single_cards:
+            if self.rng.random() < self.strategy_weights['play_high']:
+                self.last_action = 'play_high'
+                return self.play_highest_card(valid_single_cards)
+            else:
+                self.last_action = 'play_low'
+                return self.play_lowest_card(valid_single_cards)
+        else:
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} chose to draw a card")
+            return 3, None
+
+    def update_card_count(self, card):
+        rank = card.split(' of ')[0]
+        self.card_count[rank] += 1
+
+    def get_card_count_score(self):
+        score = 0
+        for rank, count in self.card_count.items():
+            if rank in ['10', 'Jack', 'Queen', 'King', 'Ace']:
+                score -= count
+            elif rank in ['2', '3', '4', '5', '6']:
+                score += count
+        return score
+
+    def respond_to_pick_up(self, hand, pick_up_stack, pickup_cards, cancel_cards):
+        """Answer a Pick Up stack with ('run', cards), ('single', card) or ('draw', None)."""
+        if len(pickup_cards) >= 2:
+            return 'run', pickup_cards  # The longest pick-up run, without listing every shorter one
+        if pickup_cards or cancel_cards:
+            return 'single', (pickup_cards + cancel_cards)[0]
+        return 'draw', None
+
+    def update_player_model(self, player, action, hand_size):
+        self.player_model[player][action] += 1
+        self.player_model[player]['hand_size'] = hand_size
+    
+    def choose_suit(self, hand):
+        if self.difficulty == 'easy' or not hand:
+            return self.rng.choice(suits)
+        elif self.difficulty == 'medium':
+            suit_counts = collections.Counter(card.split(' of ')[1] for card in hand)
+            return max(suit_counts, key=suit_counts.get)
+        elif self.difficulty in ['hard', 'adaptive']:
+            suit_counts = collections.Counter(card.split(' of ')[1] for card in hand)
+            max_count = max(suit_counts.values())
+            best_suits = [suit for suit, count in suit_counts.items() if count == max_count]
+            if self.beliefs and len(best_suits) > 1:
+                # Of our strongest suits, pick the one the next player is least likely to follow
+                return min(best_suits, key=self.beliefs.p_holds_suit)
+            return self.rng.choice(best_suits) if best_suits else self.rng.choice(suits)
+        else:  # learning
+            suit_weights = {suit: self.strategy_weights.get(f'choose_{suit.lower()}', 0.25) for suit in suits}
+            return self.rng.choices(list(suit_weights.keys()), weights=suit_weights.values())[0]
+
+    def bluff(self, valid_single_cards, valid_runs):
+        if valid_single_cards:
+            choice = self.rng.randint(1, len(valid_single_cards))
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} is bluffing with single card {choice}")
+            return 1, choice
+        elif valid_runs:
+            choice = self.rng.randint(1, len(valid_runs))
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} is bluffing with run {choice}")
+            return 2, choice
+        else:
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: {self} failed to bluff, drawing a card")
+            return 3, None
+        
+    def learn(self, reward):
+        if self.last_action:
+            self.strategy_weights[self.last_action] += reward
+
+    def learned_state(self):
+        """What this AI carries from game to game, as JSON-friendly data for checkpoints."""
+        return {"difficulty": self.difficulty, "performance_score": self.performance_score,
+                "strategy_weights": dict(self.strategy_weights), "last_action": self.last_action,
+                "card_count": dict(self.card_count)}
+
+    def restore_learned_state(self, state):
+        self.difficulty = state["difficulty"]
+        self.performance_score = state["performance_score"]
+        self.strategy_weights = dict(state["strategy_weights"])
+        self.last_action = state["last_action"]
+        self.card_count = collections.defaultdict(int, state["card_count"])
+
+    def adjust_difficulty(self, result):
+        if result == 'win':
+            self.performance_score += 1
+        else:
+            self.performance_score -= 1
+
+        if self.performance_score > 3:
+            self.difficulty = 'hard'
+        elif self.performance_score < -3:
+            self.difficulty = 'easy'
+        else:
+            self.difficulty = 'medium'
+
+    def predict_player_action(self, player, context):
+        if context in self.player_model[player]:
+            return max(self.player_model[player][context], key=self.player_model[player][context].get)
+        return None
+
+    def play_best_run(self, valid_runs):
+        best_run = max(valid_runs, key=lambda x: len(x.split(' - ')))
+        choice = valid_runs.index(best_run) + 1
+        if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+            print(f"DEBUG [AI]: {self.name} chose to play best run {choice}")
+        return 2, choice
+
+    def play_highest_card(self, valid_single_cards):
+        highest_card = max(valid_single_cards, key=lambda x: ranks.index(x.split()[0]))
+        choice = valid_single_cards.index(highest_card) + 1
+        if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+            print(f"DEBUG [AI]: {self.name} chose to play highest card {choice}")
+        return 1, choice
+
+    def play_lowest_card(self, valid_single_cards):
+        lowest_card = min(valid_single_cards, key=lambda x: ranks.index(x.split()[0]))
+        choice = valid_single_cards.index(lowest_card) + 1
+        if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+            print(f"DEBUG [AI]: {self.name} chose to play lowest card {choice}")
+        return 1, choice
+    
+# Belief tracking
+#
+# A BeliefTracker (see game.BeliefKeeper, which games opt into) follows the
+# game's event bus for a hard or adaptive AI: a weighted sample of
+# "particles", each a complete guess of where every card it cannot see is.
+# Particles are the rows of one bytearray holding the owner of every
+# physical card (an opponent, the draw pile, the AI's own hand, the discard
+# pile or the top card). Most updates work on whole columns at once: a
+# strided slice holds one card's owner in every particle, translate() turns
+# it into one 0/1 byte per particle, and those bytes read as an integer make
+# a mask that moves a card in all the particles that agree with a single
+# addition. Only the particles that had put a played card elsewhere, and
+# random draws from the draw pile, are handled one particle at a time.
+# Draws move random draw-pile cards into the drawer's hand, and a player who
+# draws when they could have played makes particles that gave them a
+# playable card less likely. Questions like "does the next player hold a
+# Pick Up card?" are answered from the same masks, once per event.
+
+BELIEF_PARTICLES = 64
+BELIEF_RESAMPLE_FRACTION = 0.5  # Resample once the effective sample size drops below this share of the particles
+BELIEF_PASS_LIKELIHOOD = 0.05  # Chance a player draws although they could have played (humans may choose to)
+BELIEF_NO_PICK_UP_LIKELIHOOD = 0.001  # The game checks this one itself, so it is all but certain
+BELIEF_DIFFICULTIES = ('hard', 'adaptive')
+PICK_UP_LIKELY = 0.7  # Hard AIs stop short of playing into a Pick Up they expect to be answered
+PICK_UP_UNLIKELY = 0.3  # ...and lead with one when the next player probably can't answer it
+
+# Card features a query can ask about: 4 suits, 13 ranks, then effects 0-7
+SUIT_FEATURE = {suit: index for index, suit in enumerate(suits)}
+RANK_FEATURE = {rank: len(suits) + index for index, rank in enumerate(ranks)}
+EFFECT_FEATURE_BASE = len(suits) + len(ranks)
+NUM_BELIEF_FEATURES = EFFECT_FEATURE_BASE + 8
+PICK_UP_FEATURES = (EFFECT_FEATURE_BASE + 1, EFFECT_FEATURE_BASE + 2)
+PICK_UP_ANSWER_FEATURES = PICK_UP_FEATURES + (EFFECT_FEATURE_BASE + 5,)  # Pick Up or Cancel
+
+def owner_table(code):
+    """A bytes.translate table mapping the owner ``code`` to 1 and every other byte to 0."""
+    table = bytearray(256)
+    table[code] = 1
+    return bytes(table)
+
+def relabel_table(source, target):
+    """A bytes.translate table mapping ``source`` to ``target`` and leaving every other byte alone."""
+    table = bytearray(range(256))
+    table[source] = target
+    return bytes(table)
+
+class BeliefTracker:
+    """Particle filter over the hands of ``observer``'s opponents."""
+
+    def __init__(self, observer, game_state, own_hand, top_card, deck_size, num_decks=1,
+                 particles=BELIEF_PARTICLES, rng=None):
+        self.observer = observer
+        self.game_state = game_state
+        self.rng = rng or random.Random(random.getrandbits(32))
+        self.opponents = [player for player in game_state.players if player is not observer]
+        self.seat = {player: index for index, player in enumerate(self.opponents)}
+        self.pool = len(self.opponents)  # Owner codes after the opponents' seats
+        self.own = self.pool + 1
+        self.gone = self.pool + 2
+        self.top = self.pool + 3
+        self.num_particles = particles
+        self.num_slots = len(CARD_NAMES) * num_decks
+        self.copies = [range(card, self.num_slots, len(CARD_NAMES)) for card in range(len(CARD_NAMES))]
+        self.feature_slots = [[] for _ in range(NUM_BELIEF_FEATURES)]
+        for slot in range(self.num_slots):
+            card = CARD_NAMES[slot % len(CARD_NAMES)]
+            rank, suit = card.split(' of ')
+            for feature in (SUIT_FEATURE[suit], RANK_FEATURE[rank], EFFECT_FEATURE_BASE + get_special_effect(card)):
+                self.feature_slots[feature].append(slot)
+        self.is_owner = [owner_table(code) for code in range(self.top + 1)]
+        self.top_to_gone = relabel_table(self.top, self.gone)
+        self.gone_to_pool = relabel_table(self.gone, self.pool)
+        self.everyone = int.from_bytes(bytes([1]) * particles, 'little')
+        self.weights = [1.0] * particles
+        self.pool_size = deck_size
+        self.cache = {}
+        hand_sizes = [len(game_state.player_hands.get(player, [])) for player in self.opponents]
+        # Our own hand and the top card are the same in every particle; only the opponents' hands are guessed
+        template = bytearray([self.pool]) * self.num_slots
+        unseen = set(range(self.num_slots))
+        for card in own_hand:
+            slot = self._free_copy(card, unseen)
+            template[slot] = self.own
+            unseen.discard(slot)
+        slot = self._free_copy(top_card, unseen)
+        template[slot] = self.top
+        unseen.discard(slot)
+        unseen = sorted(unseen)
+        dealt = [seat for seat, size in enumerate(hand_sizes) for _ in range(size)]
+        uniform = self.rng.random
+        self.owners = bytearray()
+        for particle in range(particles):
+            row = bytearray(template)
+            for index, seat in enumerate(dealt):  # A partial Fisher-Yates shuffle deals the opponents' cards
+                pick = index + int(uniform() * (len(unseen) - index))
+                unseen[index], unseen[pick] = unseen[pick], unseen[index]
+                row[unseen[index]] = seat
+            self.owners += row
+
+    def _free_copy(self, card, unseen):
+        return next((slot for slot in self.copies[CARD_IDS[card]] if slot in unseen), CARD_IDS[card])
+
+    # Whole columns: one card slot in every particle
+
+    def _mask(self, slot, table):
+        """The particles (one 0/1 byte each, read as an int) whose owner of ``slot`` ``table`` maps to 1."""
+        return int.from_bytes(self.owners[slot::self.num_slots].translate(table), 'little')
+
+    def _shift(self, slot, mask, source, target):
+        """Hand ``slot`` from ``source`` to ``target`` in the particles of ``mask``, all of which give it to ``source``."""
+        column = int.from_bytes(self.owners[slot::self.num_slots], 'little') + mask * (target - source)
+        self.owners[slot::self.num_slots] = column.to_bytes(self.num_particles, 'little')
+
+    def _holds_mask(self, seat, features):
+        """The particles in which opponent ``seat`` holds a card with any of ``features``."""
+        held = 0
+        table = self.is_owner[seat]
+        for slot in {slot for feature in features for slot in self.feature_slots[feature]}:
+            held |= self._mask(slot, table)
+        return held
+
+    def _claim(self, card, source, target, donor):
+        """Move a copy of ``card`` from ``source`` to ``target`` in every particle.
+
+        Particles with no copy at ``source`` take one from wherever they had
+        put it, short of the discard pile and ``target``: its holder gets a
+        random card of ``donor`` in exchange, so every hand keeps its size.
+        """
+        missing = self.everyone
+        for slot in self.copies[CARD_IDS[card]]:
+            found = self._mask(slot, self.is_owner[source]) & missing
+            if found:
+                self._shift(slot, found, source, target)
+                missing -= found
+                if not missing:
+                    return
+        # The rest had put the card elsewhere: group them by who had it
+        holders = []
+        for slot in self.copies[CARD_IDS[card]]:
+            for holder in range(self.pool + 1):
+                found = self._mask(slot, self.is_owner[holder]) & missing
+                if found:
+                    self._shift(slot, found, holder, target)
+                    if holder != donor:
+                        holders.append((holder, found))
+                    missing -= found
+        # Otherwise every copy is accounted for already (a changed-suit card came back from the discard pile)
+        if holders:
+            self._hand_over(holders, donor)
+
+    def _hand_over(self, receivers, donor):
+        """For each (receiver, mask), a random card of ``donor`` goes to ``receiver`` in the particles of the mask.
+
+        The particles walk the slots in one random order together, each
+        stopping at the first card ``donor`` holds in it: any one particle
+        gives up each of its cards equally likely, and all of them together
+        take a single pass.
+        """
+        waiting = 0
+        for receiver, mask in receivers:
+            waiting |= mask
+        order = list(range(self.num_slots))
+        uniform = self.rng.random
+        table = self.is_owner[donor]
+        for index in range(self.num_slots):
+            pick = index + int(uniform() * (self.num_slots - index))
+            order[index], order[pick] = order[pick], order[index]
+            slot = order[index]
+            found = self._mask(slot, table) & waiting
+            if found:
+                for receiver, mask in receivers:
+                    if found & mask:
+                        self._shift(slot, found & mask, donor, receiver)
+                waiting -= found
+                if not waiting:
+                    return
+
+    # One particle at a time
+
+    def _random_slot(self, particle, owner):
+        """A random card of ``owner`` in one particle, or None if they have none."""
+        num_slots = self.num_slots
+        row = particle * num_slots
+        owners = self.owners
+        uniform = self.rng.random  # Much cheaper than randrange, and unbiased enough for a guess
+        if owner == self.pool and self.pool_size * 4 >= num_slots:
+            for _ in range(32):  # Rejection sampling while the draw pile is a good share of the cards
+                slot = int(uniform() * num_slots)
+                if owners[row + slot] == owner:
+                    return slot
+        row_owners = owners[row:row + num_slots]
+        count = row_owners.count(owner)
+        if not count:
+            return None
+        slot = -1
+        for _ in range(int(uniform() * count) + 1):  # The k-th of the owner's cards, found with C-level scans
+            slot = row_owners.index(owner, slot + 1)
+        return slot
+
+    # Observations
+
+    def subscribe(self, bus):
+        bus.subscribe('play', self.on_play)
+        bus.subscribe('draw', self.on_draw)
+        bus.subscribe('reshuffle', self.on_reshuffle)
+        bus.subscribe('miss-turn', self.on_miss_turn)
+
+    def on_play(self, event):
+        self.observe_play(event.player, event.cards)
+
+    def on_draw(self, event):
+        if event.player is not self.observer:
+            # Drawing instead of playing says something about the hand before the draw
+            if event.value == 'pick up':
+                self.observe_lacks(event.player, PICK_UP_ANSWER_FEATURES, BELIEF_PASS_LIKELIHOOD)
+            elif event.value == 'pass':
+                rank, suit = event.top_card.split(' of ')
+                self.observe_lacks(event.player, (SUIT_FEATURE[suit], RANK_FEATURE[rank], RANK_FEATURE['Ace']),
+                                   BELIEF_PASS_LIKELIHOOD)
+        self.observe_draw(event.player, event.cards)
+
+    def on_reshuffle(self, event):
+        self.observe_reshuffle()
+
+    def on_miss_turn(self, event):
+        if event.value == 'no pick up':
+            self.observe_lacks(event.player, PICK_UP_FEATURES, BELIEF_NO_PICK_UP_LIKELIHOOD)
+
+    def observe_play(self, player, cards):
+        owner = self.own if player is self.observer else self.seat.get(player)
+        if owner is None:
+            return
+        self.owners = self.owners.translate(self.top_to_gone)
+        donor = self.pool if owner == self.own else owner
+        for index, card in enumerate(cards):
+            self._claim(card, owner, self.top if index == len(cards) - 1 else self.gone, donor)
+        self.cache.clear()
+
+    def observe_draw(self, player, cards):
+        if player is self.observer:
+            for card in cards:
+                self._claim(card, self.pool, self.own, self.pool)
+        elif player in self.seat:
+            seat = self.seat[player]
+            owners, num_slots = self.owners, self.num_slots
+            for particle in range(self.num_particles):
+                for _ in cards:
+                    slot = self._random_slot(particle, self.pool)
+                    if slot is not None:
+                        owners[particle * num_slots + slot] = seat
+        self.pool_size = max(0, self.pool_size - len(cards))
+        self.cache.clear()
+
+    def observe_reshuffle(self):
+        """The discard pile went back into the draw pile; only the top card stays out."""
+        self.owners = self.owners.translate(self.gone_to_pool)
+        self.pool_size = self.owners[:self.num_slots].count(self.pool)
+        self.cache.clear()
+
+    def observe_lacks(self, player, features, likelihood):
+        """``player`` showed they probably hold none of ``features``: reweight the particles that say otherwise."""
+        seat = self.seat.get(player)
+        if seat is None:
+            return
+        held = self._holds_mask(seat, features).to_bytes(self.num_particles, 'little')
+        weights = self.weights = [weight * likelihood if flag else weight for weight, flag in zip(self.weights, held)]
+        total = sum(weights)
+        if total <= 0:
+            self.weights = [1.0] * self.num_particles
+        elif total * total < BELIEF_RESAMPLE_FRACTION * self.num_particles * sum(w * w for w in weights):
+            self.resample()
+        self.cache.clear()
+
+    def resample(self):
+        """Systematic resampling: copy the chosen rows and reset the weights."""
+        weights = self.weights
+        step = sum(weights) / self.num_particles
+        position = self.rng.random() * step
+        cumulative = weights[0]
+        chosen = []
+        source = 0
+        for _ in range(self.num_particles):
+            while cumulative < position and source < self.num_particles - 1:
+                source += 1
+                cumulative += weights[source]
+            chosen.append(source)
+            position += step
+        owners, slots = self.owners, self.num_slots
+        self.owners = bytearray().join(owners[source * slots:(source + 1) * slots] for source in chosen)
+        self.weights = [1.0] * self.num_particles
+
+    # Queries
+
+    def probability(self, player, features):
+        """Belief that ``player`` holds at least one card with any of ``features``."""
+        key = (player, features)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        seat = self.seat.get(player)
+        if seat is None:
+            return 0.0
+        held = self._holds_mask(seat, features).to_bytes(self.num_particles, 'little')
+        self.cache[key] = result = sum(itertools.compress(self.weights, held)) / sum(self.weights)
+        return result
+
+    def next_opponent(self):
+        return self.game_state.player_after(self.observer)
+
+    def p_holds_pick_up(self, player=None):
+        return self.probability(player or self.next_opponent(), PICK_UP_FEATURES)
+
+    def p_can_answer_pick_up(self, player=None):
+        return self.probability(player or self.next_opponent(), PICK_UP_ANSWER_FEATURES)
+
+    def p_holds_suit(self, suit, player=None):
+        return self.probability(player or self.next_opponent(), (SUIT_FEATURE[suit],))
+
+# Endgame search
+#
+# Once a hard or adaptive AI is down to ENDGAME_HAND_SIZE cards and has a
+# card it could play, it picks its move with an exact search over its own
+# cards instead of the difficulty heuristics. Every sequence in which it
+# plays its hand out is searched to the end: each single card and run,
+# Cover chains within a turn, the last-card rules of play_turn (Miss a Turn,
+# Pick Up and Cover) and, for every later turn, each top card it could face.
+# Every play empties at least one card, so no line is longer than the hand
+# and the search needs no depth limit. What the mover cannot know is scored
+# by a fixed model: the opponents leave it another turn with probability
+# ENDGAME_DISCOUNT and then a top card drawn uniformly from the pack, and a
+# line that draws a card leaves the endgame and is worth ENDGAME_DISCOUNT
+# times ENDGAME_CARD_VALUE per card then held. Finished positions are kept in
+# a transposition table keyed on the canonical position (sorted hand, top
+# card, opponent count), which carries over between turns and games.
+
+ENDGAME_HAND_SIZE = 2
+ENDGAME_DISCOUNT = 0.8  # Chance the opponents don't go out before our next turn
+ENDGAME_CARD_VALUE = 0.5  # Win probability multiplier per card held after drawing out of the endgame
+PICK_UP_LAST_WIN_PROBABILITY = 0.6  # Chance the next player can't answer a last Pick Up card
+ENDGAME_TABLE_LIMIT = 50000  # Positions kept per rule set before the table is cleared
+
+endgame_table = {}
+endgame_lock = threading.Lock()  # game.SpeculativePlanner solves on a thread of its own
+
+def clear_endgame_table():
+    with endgame_lock:
+        endgame_table.clear()
+
+def get_run_effect(cards):
+    """Return the effect number play_turn ends up with after playing a run (0 for none)."""
+    effects = [effect for _, effect in played_effects(cards)]
+    if CHANGE_SUIT in effects:
+        return CHANGE_SUIT
+    if MISS_A_TURN in effects:
+        return MISS_A_TURN
+    return effects[-1] if effects else 0
+
+def _endgame_draw_value(hand):
+    """Value of ending the turn with one unknown card more, which takes the hand out of the search."""
+    return ENDGAME_DISCOUNT * ENDGAME_CARD_VALUE ** (len(hand) + 1)
+
+def _endgame_next_turn_value(hand, num_opponents, table):
+    """Value at the start of our next turn, averaged over every top card we could face."""
+    key = ('next turn', hand, num_opponents)
+    if key in table:
+        return table[key]
+    # Only whether a top card shares a rank or suit with the hand matters, so
+    # every other rank (and suit) is folded into one representative.
+    hand_ranks = {card.split(' of ')[0] for card in hand}
+    hand_suits = {card.split(' of ')[1] for card in hand}
+    other_rank = next((rank for rank in ranks if rank not in hand_ranks), None)
+    other_suit = next((suit for suit in suits if suit not in hand_suits), None)
+    top_classes = collections.Counter(
+        f"{rank if rank in hand_ranks else other_rank} of {suit if suit in hand_suits else other_suit}"
+        for rank in ranks for suit in suits)
+    value = sum(count * _endgame_turn_value(hand, top_card, num_opponents, table)[0]
+                for top_card, count in top_classes.items()) / len(CARD_NAMES)
+    table[key] = value
+    return value
+
+def _endgame_play_value(hand, played, is_run, num_opponents, table):
+    remaining = list(hand)
+    for card in played:
+        remaining.remove(card)
+    remaining = tuple(remaining)
+    last_card = played[-1]
+    effect = get_run_effect(played) if is_run else get_special_effect(last_card)
+
+    if not remaining:
+        if is_run:
+            return 1.0  # Emptying the hand with a run always wins
+        if effect == MISS_A_TURN:
+            return 1.0 if num_opponents > 1 else _endgame_draw_value(remaining)
+        if effect in (PICK_UP_TWO, PICK_UP_FIVE):
+            return PICK_UP_LAST_WIN_PROBABILITY
+        if effect == COVER:  # Cover must be covered, so a card is drawn
+            return _endgame_draw_value(remaining)
+        return 1.0
+
+    if effect == COVER:  # Play again on our own card
+        return _endgame_turn_value(remaining, last_card, num_opponents, table)[0]
+    return ENDGAME_DISCOUNT * _endgame_next_turn_value(remaining, num_opponents, table)
+
+def _endgame_turn_value(hand, top_card, num_opponents, table, valid_single_cards=None, valid_runs=None):
+    """Return (value, action, choice) of the best move from this position."""
+    key = ('turn', hand, top_card, num_opponents)
+    cacheable = valid_single_cards is None  # Choices index the caller's lists, which may be ordered differently
+    if cacheable:
+        if key in table:
+            return table[key]
+        valid_single_cards = find_valid_single_cards(list(hand), top_card)
+        valid_runs = find_valid_runs(list(hand), top_card, valid_single_cards)
+
+    best = (_endgame_draw_value(hand), 3, None)
+    for index, card in enumerate(valid_single_cards, 1):
+        value = _endgame_play_value(hand, [card], False, num_opponents, table)
+        if value > best[0]:
+            best = (value, 1, index)
+    for index, run in enumerate(valid_runs, 1):
+        value = _endgame_play_value(hand, run.split(' - '), True, num_opponents, table)
+        if value > best[0]:
+            best = (value, 2, index)
+    if cacheable:
+        table[key] = best
+    return best
+
+def solve_endgame(hand, top_card, valid_single_cards, valid_runs, num_opponents=1):
+    """Pick the move that maximises the win probability of a small hand.
+
+    Returns ``(action, choice, value)`` where action and choice follow the
+    AIPlayer.play_turn convention (1 = single, 2 = run, 3 = draw, choice is
+    a 1-based index into valid_single_cards or valid_runs). The search holds
+    endgame_lock, so the planner's thread and the game's never share the
+    table mid-search.
+    """
+    rules = tuple(sorted(special_cards.items()))
+    hand = tuple(sorted(hand))
+    num_opponents = min(num_opponents, 2)
+    # The choice indexes the caller's lists, so the decision is cached along with them
+    key = ('root', hand, top_card, num_opponents, tuple(valid_single_cards), tuple(valid_runs))
+    with endgame_lock:
+        table = endgame_table.setdefault(rules, {})
+        if len(table) > ENDGAME_TABLE_LIMIT:
+            table.clear()
+        best = table.get(key)
+        if best is None:
+            best = table[key] = _endgame_turn_value(hand, top_card, num_opponents, table, valid_single_cards,
+                                                    valid_runs)
+    value, action, choice = best
+    return action, choice, value
@@ -0,0 +1,500 @@
+"""External bots: the HTTP/JSON bot API and the subprocess line protocol."""
+import collections
+import time
+import os
+import http.server
+import threading
+import subprocess
+import shlex
+import concurrent.futures
+import contextlib
+import json
+
+from .engine import CARD_NAMES, DEBUG_FLAGS, find_pickup_runs, pacing, suits
+from .ai import AIPlayer
+from .stats import DIFFICULTY_CODES, StreamingStat, winner_seat
+from .game import play_game
+from .simulation import SIMULATION_MAX_TURNS, seat_difficulties
+
+# External bots and the HTTP/JSON bot API
+
+class ExternalPlayer(AIPlayer):
+    """An AI seat whose decisions are made outside this process.
+
+    Every decision is offered as a list of options and ``decide`` returns
+    the chosen index, or None to fall back to the built-in easy strategy.
+    """
+
+    def __init__(self, name, difficulty='external'):
+        super().__init__(name, difficulty)
+
+    def decide(self, kind, options, hand, top_card, pick_up_stack=0):
+        raise NotImplementedError
+
+    def play_turn(self, hand, top_card, valid_single_cards, valid_runs, num_opponents=None):
+        options = turn_options(valid_single_cards, valid_runs)
+        choice = self.decide('turn', options, hand, top_card)
+        if choice is None:
+            return self.play_easy(valid_single_cards, valid_runs)
+        if choice == 0:
+            return 3, None
+        if choice <= len(valid_single_cards):
+            return 1, choice
+        return 2, choice - len(valid_single_cards)
+
+    def respond_to_pick_up(self, hand, pick_up_stack, pickup_cards, cancel_cards):
+        options = pick_up_options(hand, pickup_cards, cancel_cards)
+        choice = self.decide('pick up', options, hand, None, pick_up_stack)
+        if choice is None:
+            return super().respond_to_pick_up(hand, pick_up_stack, pickup_cards, cancel_cards)
+        option = options[choice]
+        if option['action'] == 'draw':
+            return 'draw', None
+        if option['action'] == 'run':
+            return 'run', option['cards']
+        return 'single', option['cards'][0]
+
+    def choose_suit(self, hand):
+        choice = self.decide('suit', [{'action': 'suit', 'suit': suit} for suit in suits], hand, None)
+        return suits[choice] if choice is not None else self.rng.choice(suits)
+
+    def adjust_difficulty(self, result):
+        pass  # External bots keep their own counsel
+
+def turn_options(valid_single_cards, valid_runs):
+    """Legal moves of a normal turn: draw first, then each single card, then each run."""
+    return ([{'action': 'draw'}] + [{'action': 'single', 'cards': [card]} for card in valid_single_cards]
+            + [{'action': 'run', 'cards': run.split(' - ')} for run in valid_runs])
+
+def pick_up_options(hand, pickup_cards, cancel_cards):
+    """Legal answers to a Pick Up stack: draw it, play a pick-up run, or play one Pick Up/Cancel card."""
+    options = [{'action': 'draw'}]
+    options += [{'action': 'run', 'cards': list(run)} for run in find_pickup_runs(hand)]
+    options += [{'action': 'single', 'cards': [card]} for card in dict.fromkeys(pickup_cards + cancel_cards)]
+    return options
+
+BOT_MOVE_TIMEOUT = 300  # Seconds an HTTP bot may take over one decision before the easy strategy steps in
+BOT_ADVANCE_TIMEOUT = 10  # Seconds a move request waits for the table to reach the bot's next decision
+
+class HttpBotPlayer(ExternalPlayer):
+    """A seat driven by HTTP requests: decisions wait on the table until a move is submitted."""
+
+    def __init__(self, name, table):
+        super().__init__(name)
+        self.table = table
+
+    def decide(self, kind, options, hand, top_card, pick_up_stack=0):
+        return self.table.wait_for_move(self, kind, options)
+
+class BotTable:
+    """One game on its own thread, with HTTP bot seats waiting for moves.
+
+    The table is passed to play_game as its recorder, which is how it gets
+    hold of the game state for state requests.
+    """
+
+    def __init__(self, table_id, seats, num_decks=1, cards_per_player=7, seed=None, move_timeout=BOT_MOVE_TIMEOUT):
+        self.table_id = table_id
+        self.seats = seats
+        self.num_decks = num_decks
+        self.cards_per_player = cards_per_player
+        self.seed = seed
+        self.move_timeout = move_timeout
+        self.condition = threading.Condition()
+        self.pending = None  # (player, kind, options) while a bot is to move
+        self.decision_id = 0
+        self.move = None
+        self.game_state = None
+        self.top_card = None
+        self.turn = 0
+        self.status = 'running'
+        self.winner_seat = None
+        self.closed = False
+        self.bots = {}
+        ai_difficulties = {}
+        for seat, difficulty in enumerate(seats):
+            name = f'AI PLAYER {seat + 1}'
+            if difficulty == 'external':
+                self.bots[name] = HttpBotPlayer(name, self)
+            ai_difficulties[name] = difficulty
+        self.thread = threading.Thread(target=self.run, args=(ai_difficulties,), daemon=True)
+        self.thread.start()
+
+    def run(self, ai_difficulties):
+        try:
+            play_game(0, len(self.seats), self.num_decks, self.cards_per_player, ai_difficulties, seed=self.seed,
+                      recorder=self, event_handler=None, max_turns=SIMULATION_MAX_TURNS, ai_players=self.bots)
+        except Exception as e:
+            with self.condition:
+                self.status = f'error: {e}'
+                self.condition.notify_all()
+
+    # Recorder interface, called from the game thread
+    def start_game(self, game_state, top_card, **kwargs):
+        self.game_state = game_state
+        self.top_card = top_card
+
+    def record_turn(self, game_state, player, turn, played, drawn, top_card, **kwargs):
+        self.turn = turn
+        self.top_card = top_card
+
+    def end_game(self, game_state, winner, turns):
+        with self.condition:
+            self.turn = turns
+            self.winner_seat = game_state.seats.get(winner) if winner is not None else None
+            self.status = 'finished'
+            self.condition.notify_all()
+
+    def wait_for_move(self, player, kind, options):
+        with self.condition:
+            if self.closed:
+                return None
+            self.decision_id += 1
+            self.pending = (player, kind, options)
+            self.move = None
+            self.condition.notify_all()
+            self.condition.wait_for(lambda: self.move is not None or self.closed, timeout=self.move_timeout)
+            move, self.move, self.pending = self.move, None, None
+            return move
+
+    # Called from request threads
+    def submit_move(self, move, decision_id=None):
+        with self.condition:
+            if self.pending is None:
+                raise ValueError("No bot is waiting to move at this table")
+            if decision_id is not None and decision_id != self.decision_id:
+                raise ValueError(f"Decision {decision_id} is stale; the table is at decision {self.decision_id}")
+            if not isinstance(move, int) or not 0 <= move < len(self.pending[2]):
+                raise ValueError(f"Move must be an option index from 0 to {len(self.pending[2]) - 1}")
+            self.move = move
+            submitted = self.decision_id
+            self.condition.notify_all()
+        return submitted
+
+    def wait_until_advanced(self, decision_id, timeout=BOT_ADVANCE_TIMEOUT):
+        with self.condition:
+            self.condition.wait_for(lambda: self.status != 'running' or
+                                    (self.pending is not None and self.decision_id > decision_id), timeout=timeout)
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def legal_moves(self):
+        with self.condition:
+            if self.pending is None:
+                return {"table": self.table_id, "decision": None, "moves": []}
+            player, kind, options = self.pending
+            return {"table": self.table_id, "decision": self.decision_id, "seat": self.game_state.seats[player],
+                    "kind": kind, "moves": [dict(option, id=index) for index, option in enumerate(options)]}
+
+    def state(self):
+        with self.condition:
+            game_state = self.game_state
+            seats = []
+            if game_state:
+                for player in game_state.players:
+                    hand = game_state.player_hands.get(player, [])
+                    seat = {"seat": game_state.seats[player], "name": player.name, "difficulty": player.difficulty,
+                            "cards": len(hand)}
+                    if isinstance(player, HttpBotPlayer):
+                        seat["hand"] = list(hand)
+                    seats.append(seat)
+            pending = None
+            if self.pending is not None:
+                pending = {"decision": self.decision_id, "seat": game_state.seats[self.pending[0]], "kind": self.pending[1]}
+            return {
+                "table": self.table_id, "status": self.status, "turn": self.turn, "top_card": self.top_card,
+                "current_seat": game_state.current_player_index if game_state and game_state.current_player else None,
+                "direction": game_state.direction if game_state else 1,
+                "pick_up_stack": game_state.pick_up_stack if game_state else 0,
+                "winner_seat": self.winner_seat, "seats": seats, "pending": pending,
+            }
+
+class BotTableServer(http.server.ThreadingHTTPServer):
+    """Keeps the tables; requests are routed by BotAPIHandler."""
+    daemon_threads = True
+
+    def __init__(self, address, move_timeout=BOT_MOVE_TIMEOUT):
+        super().__init__(address, BotAPIHandler)
+        self.tables = {}
+        self.tables_lock = threading.Lock()
+        self.next_table_id = 1
+        self.move_timeout = move_timeout
+
+    def create_table(self, body):
+        seats = body.get("seats") or ['external', 'hard']
+        if len(seats) < 2 or any(seat not in DIFFICULTY_CODES or seat == 'human' for seat in seats):
+            raise ValueError("seats must list at least two of: external, easy, medium, hard, adaptive, learning")
+        num_decks = int(body.get("decks", 1))
+        cards_per_player = int(body.get("cards", 7))
+        if len(seats) * cards_per_player + 19 > len(CARD_NAMES) * num_decks:
+            raise ValueError("Not enough cards for that many seats; add decks or deal fewer cards")
+        with self.tables_lock:
+            table_id = self.next_table_id
+            self.next_table_id += 1
+        table = BotTable(table_id, seats, num_decks, cards_per_player, body.get("seed"), self.move_timeout)
+        with self.tables_lock:
+            self.tables[table_id] = table
+        table.wait_until_advanced(0)
+        return table
+
+    def table(self, table_id):
+        with self.tables_lock:
+            table = self.tables.get(table_id)
+        if table is None:
+            raise KeyError(f"No table {table_id}")
+        return table
+
+    def delete_table(self, table_id):
+        with self.tables_lock:
+            table = self.tables.pop(table_id, None)
+        if table is None:
+            raise KeyError(f"No table {table_id}")
+        table.close()
+
+    def handle_api(self, method, path, body):
+        """Route one API call and return (status, payload); shared by plain and batched requests."""
+        parts = [part for part in path.split('?')[0].split('/') if part]
+        try:
+            if parts == ['tables'] and method == 'POST':
+                return 201, self.create_table(body).state()
+            if parts == ['tables'] and method == 'GET':
+                with self.tables_lock:
+                    tables = list(self.tables.values())
+                return 200, {"tables": [{"table": table.table_id, "status": table.status} for table in tables]}
+            if len(parts) >= 2 and parts[0] == 'tables':
+                table_id = int(parts[1])
+                if len(parts) == 2 and method == 'GET':
+                    return 200, self.table(table_id).state()
+                if len(parts) == 2 and method == 'DELETE':
+                    self.delete_table(table_id)
+                    return 200, {"table": table_id, "deleted": True}
+                if parts[2:] == ['moves'] and method == 'GET':
+                    return 200, self.table(table_id).legal_moves()
+                if parts[2:] == ['moves'] and method == 'POST':
+                    table = self.table(table_id)
+                    submitted = table.submit_move(body.get("move"), body.get("decision"))
+                    table.wait_until_advanced(submitted)
+                    return 200, table.state()
+            if parts == ['batch'] and method == 'POST':
+                return 200, {"responses": self.handle_batch(body.get("requests", []))}
+            return 404, {"error": f"No route for {method} {path}"}
+        except KeyError as e:
+            return 404, {"error": str(e.args[0])}
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+
+    def handle_batch(self, requests):
+        """Apply many calls in one round-trip. Moves are all submitted first, then awaited together."""
+        responses = [None] * len(requests)
+        submitted = []
+        for index, request in enumerate(requests):
+            method = request.get("method", "GET").upper()
+            path = request.get("path", "")
+            body = request.get("body") or {}
+            parts = [part for part in path.split('/') if part]
+            if method == 'POST' and len(parts) == 3 and parts[0] == 'tables' and parts[2] == 'moves':
+                try:
+                    table = self.table(int(parts[1]))
+                    submitted.append((index, table, table.submit_move(body.get("move"), body.get("decision"))))
+                except KeyError as e:
+                    responses[index] = {"status": 404, "body": {"error": str(e.args[0])}}
+                except (ValueError, TypeError) as e:
+                    responses[index] = {"status": 400, "body": {"error": str(e)}}
+            elif parts and parts[0] == 'batch':
+                responses[index] = {"status": 400, "body": {"error": "Batches cannot be nested"}}
+            else:
+                status, payload = self.handle_api(method, path, body)
+                responses[index] = {"status": status, "body": payload}
+        for index, table, decision_id in submitted:
+            table.wait_until_advanced(decision_id)
+            responses[index] = {"status": 200, "body": table.state()}
+        return responses
+
+class BotAPIHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive: clients reuse one connection for many requests
+    disable_nagle_algorithm = True  # Small responses go out at once instead of waiting on delayed ACKs
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def dispatch(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}') if length else {}
+        except ValueError:
+            status, payload = 400, {"error": "Request body must be JSON"}
+        else:
+            status, payload = self.server.handle_api(method, self.path, body if isinstance(body, dict) else {})
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if DEBUG_FLAGS["all"] or DEBUG_FLAGS["game"]:
+            super().log_message(format, *args)
+
+# Subprocess bots
+#
+# A bot program reads one JSON request per line on stdin and writes one JSON
+# answer per line on stdout:
+#   request: {"id": 7, "game": 3, "player": "AI PLAYER 1", "kind": "turn" | "pick up" | "suit",
+#             "hand": [...], "top_card": "...", "pick_up_stack": 0, "options": [{"action": ...}, ...]}
+#   answer:  {"id": 7, "move": <index into options>}
+# Requests from every game using the bot are in flight at once, so answers
+# may come back in any order; the id ties each one to its request.
+
+SUBPROCESS_MOVE_TIMEOUT = 1.0  # Seconds a bot program may take over one decision
+
+class SubprocessBot:
+    """One bot program shared by the seats of many concurrent games."""
+
+    def __init__(self, command, move_timeout=SUBPROCESS_MOVE_TIMEOUT):
+        self.command = command
+        self.move_timeout = move_timeout
+        self.process = subprocess.Popen(shlex.split(command) if isinstance(command, str) else command,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+        self.lock = threading.Lock()
+        self.pending = {}  # request id -> [answered event, move]
+        self.next_id = 0
+        self.alive = True
+        self.timeouts = 0
+        self.malformed = 0
+        self.max_in_flight = 0
+        self.latency = StreamingStat()
+        self.reader = threading.Thread(target=self.read_answers, daemon=True)
+        self.reader.start()
+
+    def read_answers(self):
+        for line in self.process.stdout:
+            try:
+                answer = json.loads(line)
+                request_id = answer["id"]
+            except (ValueError, KeyError, TypeError):
+                self.malformed += 1
+                continue
+            with self.lock:
+                waiter = self.pending.pop(request_id, None)
+            if waiter:
+                waiter[1] = answer.get("move")
+                waiter[0].set()
+        # The bot exited: nobody is going to answer the requests still waiting
+        with self.lock:
+            self.alive = False
+            waiters = list(self.pending.values())
+            self.pending.clear()
+        for waiter in waiters:
+            waiter[0].set()
+
+    def request(self, message):
+        """Send one decision and wait for its answer; None when the bot is late, gone or silent."""
+        waiter = [threading.Event(), None]
+        with self.lock:
+            if not self.alive:
+                return None
+            self.next_id += 1
+            request_id = self.next_id
+            self.pending[request_id] = waiter
+            self.max_in_flight = max(self.max_in_flight, len(self.pending))
+            try:
+                self.process.stdin.write(json.dumps(dict(message, id=request_id)) + '\n')
+                self.process.stdin.flush()
+            except OSError:
+                self.pending.pop(request_id, None)
+                self.alive = False
+                return None
+        started = time.perf_counter()
+        if not waiter[0].wait(self.move_timeout):
+            with self.lock:
+                self.pending.pop(request_id, None)
+                self.timeouts += 1
+            return None  # An answer arriving after this is dropped by read_answers
+        if waiter[1] is None:
+            return None  # Released because the bot exited
+        self.latency.add(time.perf_counter() - started)
+        return waiter[1]
+
+    def close(self):
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=self.move_timeout + 1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+class SubprocessBotPlayer(ExternalPlayer):
+    """A seat whose decisions are made by a SubprocessBot; bad or late answers fall back to the easy strategy."""
+
+    def __init__(self, name, bot, game_id=0):
+        super().__init__(name)
+        self.bot = bot
+        self.game_id = game_id
+        self.fallbacks = 0
+
+    def decide(self, kind, options, hand, top_card, pick_up_stack=0):
+        move = self.bot.request({"game": self.game_id, "player": self.name, "kind": kind, "hand": list(hand),
+                                 "top_card": top_card, "pick_up_stack": pick_up_stack, "options": options})
+        if isinstance(move, int) and not isinstance(move, bool) and 0 <= move < len(options):
+            return move
+        self.fallbacks += 1
+        return None
+
+def _bot_match_game(bot, difficulties, game_index, num_decks, cards_per_player, seed):
+    line_up = seat_difficulties(['external'] + list(difficulties), game_index)
+    ai_difficulties = {f'AI PLAYER {seat + 1}': difficulty for seat, difficulty in enumerate(line_up)}
+    bot_name = f'AI PLAYER {line_up.index("external") + 1}'
+    bot_player = SubprocessBotPlayer(bot_name, bot, game_index)
+    winner, turns, stats = play_game(0, len(line_up), num_decks, cards_per_player, ai_difficulties, seed=seed,
+                                     event_handler=None, max_turns=SIMULATION_MAX_TURNS,
+                                     ai_players={bot_name: bot_player})
+    winning_seat = winner_seat(winner, stats)
+    return line_up, winning_seat, turns, bot_player.fallbacks
+
+def run_bot_match(command, difficulties, games=20, concurrency=8, num_decks=1, cards_per_player=7,
+                  move_timeout=SUBPROCESS_MOVE_TIMEOUT, base_seed=0):
+    """Play a bot program against built-in AIs, ``concurrency`` games at a time through one bot process."""
+    bot = SubprocessBot(command, move_timeout)
+    wins = collections.Counter()
+    turns = StreamingStat()
+    fallbacks = 0
+    no_winner = 0
+    previous_mode = pacing.mode
+    pacing.set_mode('batch')
+    start_time = time.perf_counter()
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), \
+                concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+            futures = [executor.submit(_bot_match_game, bot, difficulties, game_index, num_decks, cards_per_player,
+                                       base_seed + game_index) for game_index in range(games)]
+            for future in concurrent.futures.as_completed(futures):
+                line_up, winning_seat, game_turns, game_fallbacks = future.result()
+                turns.add(game_turns)
+                fallbacks += game_fallbacks
+                if winning_seat is None:
+                    no_winner += 1
+                else:
+                    wins[line_up[winning_seat]] += 1
+    finally:
+        pacing.set_mode(previous_mode)
+        bot.close()
+    return {
+        "command": command, "games": games, "concurrency": concurrency, "wins": dict(wins), "no_winner": no_winner,
+        "mean_turns": turns.mean, "decisions": bot.next_id, "fallbacks": fallbacks, "timeouts": bot.timeouts,
+        "malformed": bot.malformed, "max_in_flight": bot.max_in_flight, "mean_latency": bot.latency.mean,
+        "max_latency": bot.latency.maximum or 0.0, "seconds": time.perf_counter() - start_time,
+        "exit_code": bot.process.returncode,
+    }
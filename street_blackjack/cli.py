@@ -0,0 +1,736 @@
+"""Interactive setup prompts, the command line interface and main()."""
+import random
+import sys
+import time
+import os
+import argparse
+import subprocess
+import contextlib
+import json
+
+from .engine import (
+    DEBUG_FLAGS, DEFAULT_SPECIAL_CARDS, EFFECT_NAMES, pacing, ranks, rebuild_card_effects, sample_special_cards,
+    setup_default_special_cards, special_card_grid, special_cards, suits)
+from .stats import DIFFICULTY_CODES, StatsStore, get_player_key
+from .game import BRANCHING_COUNT_THRESHOLD, BRANCHING_TIME_THRESHOLD, default_consumers, play_game
+from .simulation import (
+    BASELINE_PATH, CHECKPOINT_SECONDS, CORPUS_PATH, DEFAULT_SCALING_TABLES, MAX_REGRESSION_PERCENT, SIMULATION_CORE_COUNTS,
+    SIMULATION_MAX_TURNS, build_position_corpus, run_branching_survey, run_corpus_benchmark, run_duplicate_evaluation,
+    run_position_benchmark, run_scaling_benchmark, run_series, run_simulation_throughput,
+    run_special_card_sweep, run_tournament)
+from .records import GameRecordReader, GameReplay, RECORD_GAME_START, check_keyframes
+from .fuzz import run_move_fuzz
+from .bots import BOT_MOVE_TIMEOUT, BotTableServer, SUBPROCESS_MOVE_TIMEOUT, run_bot_match
+
+def configure_pacing(num_real_players):
+    print("Pacing mode:")
+    print("1. Interactive (press Enter after each turn)")
+    print("2. Spectator (short pause after each turn, no prompts)")
+    print("3. Batch (no waiting at all)")
+    default = '1' if num_real_players else '2'
+    choice = input(f"Enter your choice (default {default}): ").strip() or default
+    print('-' * 73)
+    if choice == '2':
+        while True:
+            delay = input("Seconds to pause after each turn (default 1): ").strip()
+            try:
+                turn_delay = float(delay) if delay else 1.0
+                if turn_delay >= 0:
+                    break
+            except ValueError:
+                pass
+            print("Invalid input. Please enter a non-negative number.")
+        pacing.set_mode('spectator', turn_delay)
+    elif choice == '3':
+        pacing.set_mode('batch')
+    else:
+        pacing.set_mode('interactive')
+    print('-' * 73)
+
+def configure_debugging():
+    current_state = "On" if any(DEBUG_FLAGS.values()) else "Off"
+    
+    while True:
+        print(f"\nConfigure debugging (current state: {current_state})")
+        choice = input("Do you want to change debugging settings? (y/n): ").lower()
+        
+        if choice != 'y':
+            break
+        
+        print("1. All debugging on")
+        print("2. All debugging off")
+        print("3. Player debugging on")
+        print("4. Player debugging off")
+        print("5. Cards debugging on")
+        print("6. Cards debugging off")
+        print("7. Game debugging on")
+        print("8. Game debugging off")
+        
+        debug_choice = input("Enter your choice: ")
+        
+        if debug_choice == '1':
+            DEBUG_FLAGS.update(dict.fromkeys(DEBUG_FLAGS, True))
+        elif debug_choice == '2':
+            DEBUG_FLAGS.update(dict.fromkeys(DEBUG_FLAGS, False))
+        elif debug_choice == '3':
+            DEBUG_FLAGS["player"] = True
+        elif debug_choice == '4':
+            DEBUG_FLAGS["player"] = False
+        elif debug_choice == '5':
+            DEBUG_FLAGS["cards"] = True
+        elif debug_choice == '6':
+            DEBUG_FLAGS["cards"] = False
+        elif debug_choice == '7':
+            DEBUG_FLAGS["game"] = True
+        elif debug_choice == '8':
+            DEBUG_FLAGS["game"] = False
+        else:
+            print("Invalid choice. Please try again.")
+        
+        current_state = "On" if any(DEBUG_FLAGS.values()) else "Off"
+    
+    print("Debug configuration complete.")
+    print('-' * 73)
+
+def configure_special_cards():
+    setup_default_special_cards()  # Start with default assignments
+    
+    effects = {
+        1: "Pick Up Two",
+        2: "Pick Up Five",
+        3: "Miss a Turn",
+        4: "Cover",
+        5: "Cancel",
+        6: "Reverse",
+        7: "Change Suit"
+    }
+    
+    while True:
+        print("\nCurrent Special Card Assignments:")
+        for card, effect in special_cards.items():
+            print(f"{card}: {effects[effect]}")
+        
+        choice = input("\nEnter the name of the card you want to reassign (or 'done' to finish): ")
+        if choice.lower() == 'done':
+            break
+        
+        if choice in special_cards or choice.split()[0] in special_cards:
+            print(f"\nReassigning {choice}")
+            print("Available effects:")
+            for num, effect in effects.items():
+                print(f"{num}. {effect}")
+            
+            while True:
+                effect_choice = input("Enter the number of the new effect: ")
+                if effect_choice.isdigit() and 1 <= int(effect_choice) <= 7:
+                    if ' of ' in choice:  # Full card name
+                        special_cards[choice] = int(effect_choice)
+                    else:  # Just the rank
+                        special_cards[choice.split()[0]] = int(effect_choice)
+                    rebuild_card_effects()
+                    print(f"{choice} has been assigned the effect: {effects[int(effect_choice)]}")
+                    break
+                else:
+                    print("Invalid choice. Please enter a number between 1 and 7.")
+        else:
+            print("Invalid card name. Please try again.")
+
+def tournament_command(args):
+    from .render import display_tournament_report
+    start = time.time()
+    report = run_tournament(args.players, player_counts=args.player_counts, elo_margin=args.elo_margin,
+                            alpha=args.alpha, beta=args.beta, max_games=args.max_games, num_decks=args.decks,
+                            cards_per_player=args.cards, workers=args.workers, base_seed=args.seed,
+                            max_turns=args.max_turns, checkpoint_path=args.checkpoint,
+                            checkpoint_seconds=args.checkpoint_every)
+    display_tournament_report(report)
+    print(f"Finished in {time.time() - start:.1f}s")
+
+def parse_core_counts(text):
+    counts = []
+    for item in text.split(','):
+        if item.strip().lower() == 'all':
+            counts.append(None)
+            continue
+        try:
+            counts.append(int(item))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Expected comma-separated core counts or 'all', got {text!r}")
+    if any(count is not None and count < 1 for count in counts):
+        raise argparse.ArgumentTypeError("Core counts must be at least 1")
+    return counts
+
+def add_stats_arguments(parser):
+    parser.add_argument("--stats", metavar="DIR", default=None,
+                        help="Keep every game's statistics and export them (games and players tables) to DIR")
+    parser.add_argument("--stats-format", choices=("csv", "npy"), default="csv",
+                        help="csv files, or one .npy file per column for numpy.load (default: csv)")
+
+def export_stats(stats_store, directory, stats_format):
+    if stats_format == 'npy':
+        stats_store.export_npy(directory)
+    else:
+        stats_store.export_csv(directory)
+    stats_store.close()
+
+def simulate_command(args):
+    from .render import display_simulation_report, display_statistics_summary
+    stats_store = StatsStore() if args.stats else None
+    report = run_simulation_throughput(args.players, games=args.games, core_counts=args.cores, num_decks=args.decks,
+                                       cards_per_player=args.cards, base_seed=args.seed, max_turns=args.max_turns,
+                                       stats_store=stats_store, record_path=args.record)
+    display_simulation_report(report)
+    if stats_store is not None:
+        display_statistics_summary(stats_store)
+        export_stats(stats_store, args.stats, args.stats_format)
+        print(f"Statistics of {report['runs'][0]['games']} games written to {args.stats}")
+    if args.record:
+        print(f"{report['runs'][0]['games']} games recorded to {args.record}")
+
+def series_command(args):
+    from .render import display_series_report, display_statistics_summary
+    if not special_cards:
+        setup_default_special_cards()
+    stats_store = StatsStore() if args.stats else None
+    report = run_series(args.players, games=args.games, num_decks=args.decks, cards_per_player=args.cards,
+                        base_seed=args.seed, max_turns=args.max_turns, checkpoint_path=args.checkpoint,
+                        checkpoint_seconds=args.checkpoint_every, stats_store=stats_store)
+    display_series_report(report)
+    if stats_store is not None:
+        display_statistics_summary(stats_store)
+        export_stats(stats_store, args.stats, args.stats_format)
+        print(f"Statistics of games {report['resumed_from'] + 1}-{report['games']} written to {args.stats}")
+
+def parse_player_counts(text):
+    try:
+        counts = [int(count) for count in text.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected comma-separated player counts, got {text!r}")
+    if not counts or any(count < 2 for count in counts):
+        raise argparse.ArgumentTypeError("Player counts must be at least 2")
+    return counts
+
+def parse_deals(text):
+    try:
+        deals = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a number of deals, got {text!r}")
+    if deals < 1:
+        raise argparse.ArgumentTypeError("The number of deals must be at least 1")
+    return deals
+
+def duplicate_command(args):
+    from .render import display_duplicate_report
+    start = time.time()
+    report = run_duplicate_evaluation(args.players, deals=args.deals, num_decks=args.decks, cards_per_player=args.cards,
+                                      workers=args.workers, base_seed=args.seed, max_turns=args.max_turns,
+                                      compare_plain=not args.no_plain)
+    display_duplicate_report(report)
+    print(f"Finished in {time.time() - start:.1f}s")
+
+def parse_tables(text):
+    tables = []
+    for item in text.split(','):
+        players, _, decks = item.partition('x')
+        try:
+            tables.append((int(players), int(decks or 1)))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Expected PLAYERSxDECKS[,...], got {text!r}")
+    if any(players < 2 or decks < 1 for players, decks in tables):
+        raise argparse.ArgumentTypeError("Tables need at least 2 players and 1 deck")
+    return tables
+
+def bench_command(args):
+    from .render import display_scaling_report
+    if not special_cards:
+        setup_default_special_cards()
+    display_scaling_report(run_scaling_benchmark(args.tables, games=args.games, cards_per_player=args.cards,
+                                                 base_seed=args.seed, top=args.top))
+
+def branching_command(args):
+    from .render import display_branching_report
+    if not special_cards:
+        setup_default_special_cards()
+    display_branching_report(run_branching_survey(args.players, games=args.games, num_decks=args.decks,
+                                                  cards_per_player=args.cards, base_seed=args.seed, dump_path=args.dump,
+                                                  time_threshold=args.time_threshold,
+                                                  count_threshold=args.count_threshold))
+
+def positions_command(args):
+    from .render import display_position_benchmark
+    display_position_benchmark(run_position_benchmark(args.file, repeats=args.repeats))
+
+def corpus_command(args):
+    if not special_cards:
+        setup_default_special_cards()
+    count = build_position_corpus(args.output, games=args.games, per_group=args.per_group, base_seed=args.seed)
+    print(f"{count} positions written to {args.output}")
+
+def regress_command(args):
+    from .render import display_corpus_benchmark
+    report = run_corpus_benchmark(args.corpus, args.baseline, repeats=args.repeats, max_regression=args.max_regression,
+                                  update_baseline=args.update_baseline)
+    display_corpus_benchmark(report)
+    if report['regressed'] or report['stale']:
+        sys.exit(1)
+
+def replay_command(args):
+    from .render import display_replay_report
+    report = {"path": args.file, "state": None, "check": None}
+    with GameRecordReader(args.file) as reader:
+        report["games"] = sum(1 for _ in reader.records(record_types=(RECORD_GAME_START,)))
+        report["turns"] = reader.count_turns()
+    if args.game is not None:
+        try:
+            with GameReplay(args.file) as replay:
+                report["state"] = replay.seek(args.game, args.turn)
+        except KeyError as error:
+            print(error.args[0])
+            sys.exit(1)
+    if args.check:
+        report["check"] = check_keyframes(args.file)
+    display_replay_report(report)
+    if report["check"] and report["check"][1]:
+        sys.exit(1)
+
+def fuzz_command(args):
+    from .render import display_fuzz_report
+    if not special_cards:
+        setup_default_special_cards()
+    report = run_move_fuzz(args.cases, seed=args.seed, num_decks=args.decks, rules=not args.default_rules)
+    display_fuzz_report(report)
+    if any(result['mismatches'] for result in report['functions']):
+        sys.exit(1)
+
+# Import cost of each part of the package, each measured in a fresh interpreter
+IMPORT_PROBE = """
+import importlib, sys, time
+start = time.perf_counter()
+module = importlib.import_module({module!r})
+seconds = time.perf_counter() - start
+{work}
+try:  # Linux keeps ru_maxrss across exec, so it would report the parent's peak
+    with open('/proc/self/status') as f:
+        rss = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+except OSError:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss / 1024 if sys.platform == 'darwin' else rss
+print(seconds, rss, len(sys.modules), 'street_blackjack.render' in sys.modules)
+"""
+WORKER_PROBE = """
+from street_blackjack.engine import setup_default_special_cards
+setup_default_special_cards()
+module.simulate_game(['hard', 'easy', 'medium', 'adaptive'], seed=0)
+"""
+IMPORT_PROBE_MODULES = ('engine', 'ai', 'game', 'simulation', 'bots', 'render', 'cli')
+
+def measure_import(module, work='', repeats=3):
+    """(seconds, peak RSS in KB, modules loaded, UI loaded) for a fresh interpreter importing ``module``.
+
+    The time is the best of ``repeats`` runs, so it reflects a warm bytecode cache.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', IMPORT_PROBE.format(module=module, work=work)], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.split()
+        results.append((float(output[0]), float(output[1]), int(output[2]), output[3] == 'True'))
+    return min(results)
+
+def measure_imports(repeats=3):
+    rows = [('(interpreter)',) + measure_import('sys', repeats=repeats)]
+    for name in IMPORT_PROBE_MODULES:
+        rows.append((name,) + measure_import('street_blackjack.' + name, repeats=repeats))
+    rows.append(('simulation worker',) + measure_import('street_blackjack.simulation', WORKER_PROBE, repeats))
+    return rows
+
+def imports_command(args):
+    from .render import display_import_report
+    display_import_report(measure_imports(args.repeats))
+
+def serve_command(args):
+    if not special_cards:
+        setup_default_special_cards()
+    pacing.set_mode('batch')
+    server = BotTableServer((args.host, args.port), move_timeout=args.move_timeout)
+    print(f"Bot API listening on http://{args.host}:{server.server_address[1]}", file=sys.stderr)
+    # Table threads print as they play; keep that off the terminal
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+def bots_command(args):
+    from .render import display_bot_match_report
+    if not special_cards:
+        setup_default_special_cards()
+    report = run_bot_match(args.bot, args.opponents, games=args.games,
+                           concurrency=args.concurrency, num_decks=args.decks, cards_per_player=args.cards,
+                           move_timeout=args.move_timeout, base_seed=args.seed)
+    display_bot_match_report(report)
+
+def parse_special_card_variation(text):
+    """Parse 'Jack=2,5' (card or rank = effect numbers, 0 for no effect) from the command line."""
+    key, _, effects = text.partition('=')
+    if not effects:
+        raise argparse.ArgumentTypeError(f"Expected CARD=EFFECT[,EFFECT...], got {text!r}")
+    try:
+        values = [int(effect) for effect in effects.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Effects must be numbers 0-7, got {effects!r}")
+    if any(not 0 <= value <= len(EFFECT_NAMES) for value in values):
+        raise argparse.ArgumentTypeError(f"Effects must be numbers 0-7, got {effects!r}")
+    return key.strip(), values
+
+def parse_difficulties(text, minimum=2):
+    difficulties = [difficulty.strip().lower() for difficulty in text.split(',') if difficulty.strip()]
+    unknown = [difficulty for difficulty in difficulties if difficulty not in DIFFICULTY_CODES or difficulty in ('human', 'external')]
+    if unknown or len(difficulties) < minimum:
+        raise argparse.ArgumentTypeError(f"Give at least {'two AI difficulties' if minimum == 2 else 'one AI difficulty'} "
+                                         f"from easy, medium, hard, adaptive, learning")
+    return difficulties
+
+def parse_opponents(text):
+    return parse_difficulties(text, minimum=1)
+
+def sweep_command(args):
+    from .render import display_sweep_report
+    variations = dict(args.vary)
+    configurations = list(special_card_grid(variations)) if variations else [dict(DEFAULT_SPECIAL_CARDS)]
+    if args.sample:
+        configurations += sample_special_cards(args.sample, random.Random(args.seed), changes=args.changes)
+    start = time.time()
+    summaries = run_special_card_sweep(configurations, args.players, games=args.games, num_decks=args.decks,
+                                       cards_per_player=args.cards, workers=args.workers, cache_path=args.cache,
+                                       base_seed=args.seed, max_turns=args.max_turns, checkpoint_path=args.checkpoint,
+                                       checkpoint_seconds=args.checkpoint_every, stats_dir=args.stats)
+    display_sweep_report(summaries, args.players)
+    print(f"{len(configurations)} configurations x {args.games} games in {time.time() - start:.1f}s")
+    if args.stats:
+        for number, summary in enumerate(summaries, 1):
+            directory = os.path.join(args.stats, f"config-{number}")
+            export_stats(summary["stats"], directory, args.stats_format)
+            with open(os.path.join(directory, "special_cards.json"), 'w') as f:
+                json.dump(dict(summary["special_cards"]), f, indent=2)
+        print(f"Per-game statistics of each configuration written to {args.stats}/config-N")
+
+def build_cli_parser():
+    parser = argparse.ArgumentParser(description="Street Black Jack. Run without arguments to play.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sweep = commands.add_parser("sweep", help="Measure how special card rules change AI-vs-AI games")
+    sweep.add_argument("--players", type=parse_difficulties, default=parse_difficulties("easy,medium,hard,adaptive"),
+                       help="Comma-separated AI difficulties, one per seat (default: easy,medium,hard,adaptive)")
+    sweep.add_argument("--games", type=int, default=200, help="Games per configuration")
+    sweep.add_argument("--decks", type=int, default=1)
+    sweep.add_argument("--cards", type=int, default=7, help="Cards dealt per player")
+    sweep.add_argument("--vary", type=parse_special_card_variation, action="append", default=[],
+                       metavar="CARD=E1,E2", help="Effects to try for a rank or card (0 = none); repeat to build a grid")
+    sweep.add_argument("--sample", type=int, default=0, help="Also try this many random house rules")
+    sweep.add_argument("--changes", type=int, default=2, help="Ranks reassigned per random house rule")
+    sweep.add_argument("--seed", type=int, default=0)
+    sweep.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    sweep.add_argument("--cache", default=None, help="JSON cache of finished configurations, reused by later sweeps")
+    sweep.add_argument("--max-turns", type=int, default=SIMULATION_MAX_TURNS)
+    sweep.add_argument("--checkpoint", default=None,
+                       help="JSON checkpoint of finished chunks; rerun with the same arguments to pick up where it stopped")
+    sweep.add_argument("--checkpoint-every", type=float, default=CHECKPOINT_SECONDS, metavar="SECONDS")
+    add_stats_arguments(sweep)
+    sweep.set_defaults(func=sweep_command)
+
+    simulate = commands.add_parser("simulate", help="Measure AI-vs-AI game throughput on 1, 2, 4 and all cores")
+    simulate.add_argument("--players", type=parse_difficulties, default=parse_difficulties("easy,medium,hard,adaptive"),
+                          help="Comma-separated AI difficulties, one per seat (default: easy,medium,hard,adaptive)")
+    simulate.add_argument("--games", type=int, default=1000, help="Games per core count")
+    simulate.add_argument("--cores", type=parse_core_counts, default=SIMULATION_CORE_COUNTS,
+                          help="Comma-separated worker counts to time, 'all' for every core (default: 1,2,4,all)")
+    simulate.add_argument("--decks", type=int, default=1)
+    simulate.add_argument("--cards", type=int, default=7, help="Cards dealt per player")
+    simulate.add_argument("--seed", type=int, default=0)
+    simulate.add_argument("--max-turns", type=int, default=SIMULATION_MAX_TURNS)
+    simulate.add_argument("--record", metavar="FILE", default=None,
+                          help="Append the games of the first run to this binary record file (and its .idx index)")
+    add_stats_arguments(simulate)
+    simulate.set_defaults(func=simulate_command)
+
+    series = commands.add_parser("series", help="Play a long AI-only series in which the AIs keep what they learn")
+    series.add_argument("--players", type=parse_difficulties, default=parse_difficulties("easy,medium,hard,adaptive"),
+                        help="Comma-separated AI difficulties, one per seat (default: easy,medium,hard,adaptive)")
+    series.add_argument("--games", type=int, default=10000, help="Length of the series (raise it to extend a finished one)")
+    series.add_argument("--decks", type=int, default=1)
+    series.add_argument("--cards", type=int, default=7, help="Cards dealt per player")
+    series.add_argument("--seed", type=int, default=0)
+    series.add_argument("--max-turns", type=int, default=SIMULATION_MAX_TURNS)
+    series.add_argument("--checkpoint", default=None,
+                        help="JSON checkpoint of the series; rerun with the same arguments to resume")
+    series.add_argument("--checkpoint-every", type=float, default=CHECKPOINT_SECONDS, metavar="SECONDS")
+    add_stats_arguments(series)
+    series.set_defaults(func=series_command)
+
+    tournament = commands.add_parser("tournament", help="Rate AI difficulties against each other")
+    tournament.add_argument("--players", type=parse_difficulties,
+                            default=parse_difficulties("easy,medium,hard,adaptive,learning"),
+                            help="Comma-separated AI difficulties to rate")
+    tournament.add_argument("--player-counts", type=parse_player_counts, default=[2, 3, 4],
+                            help="Table sizes to cycle through (default: 2,3,4)")
+    tournament.add_argument("--elo-margin", type=float, default=30, help="Elo difference the SPRT tries to detect")
+    tournament.add_argument("--alpha", type=float, default=0.05)
+    tournament.add_argument("--beta", type=float, default=0.05)
+    tournament.add_argument("--max-games", type=int, default=2000, help="Games per pairing if the SPRT never decides")
+    tournament.add_argument("--decks", type=int, default=1)
+    tournament.add_argument("--cards", type=int, default=7, help="Cards dealt per player")
+    tournament.add_argument("--seed", type=int, default=0)
+    tournament.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    tournament.add_argument("--max-turns", type=int, default=SIMULATION_MAX_TURNS)
+    tournament.add_argument("--checkpoint", default=None,
+                            help="JSON checkpoint of every pairing's progress; rerun with the same arguments to resume")
+    tournament.add_argument("--checkpoint-every", type=float, default=CHECKPOINT_SECONDS, metavar="SECONDS")
+    tournament.set_defaults(func=tournament_command)
+
+    duplicate = commands.add_parser("duplicate", help="Compare AI strategies on duplicate deals")
+    duplicate.add_argument("--players", type=parse_difficulties, default=parse_difficulties("hard,easy"),
+                           help="Comma-separated AI difficulties, one per seat (default: hard,easy)")
+    duplicate.add_argument("--deals", type=parse_deals, default=200, help="Deals to play through every rotation")
+    duplicate.add_argument("--no-plain", action="store_true", help="Skip the plain games used to measure variance reduction")
+    duplicate.add_argument("--decks", type=int, default=1)
+    duplicate.add_argument("--cards", type=int, default=7, help="Cards dealt per player")
+    duplicate.add_argument("--seed", type=int, default=0)
+    duplicate.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    duplicate.add_argument("--max-turns", type=int, default=SIMULATION_MAX_TURNS)
+    duplicate.set_defaults(func=duplicate_command)
+
+    bench = commands.add_parser("bench", help="Measure per-turn latency as tables grow")
+    bench.add_argument("--tables", type=parse_tables, default=DEFAULT_SCALING_TABLES,
+                       help="Comma-separated PLAYERSxDECKS table sizes (default: 4x1,10x2,20x4,40x8)")
+    bench.add_argument("--games", type=int, default=20, help="Games per table size")
+    bench.add_argument("--cards", type=int, default=7, help="Cards dealt per player")
+    bench.add_argument("--seed", type=int, default=0)
+    bench.add_argument("--top", type=int, default=12, help="Hotspots to list for the largest table")
+    bench.set_defaults(func=bench_command)
+
+    branching = commands.add_parser("branching", help="Measure move generation per turn and capture pathological positions")
+    branching.add_argument("--players", type=parse_difficulties, default=parse_difficulties("easy,medium,hard,adaptive"),
+                           help="Comma-separated AI difficulties, one per seat (default: easy,medium,hard,adaptive)")
+    branching.add_argument("--games", type=int, default=100)
+    branching.add_argument("--decks", type=int, default=1)
+    branching.add_argument("--cards", type=int, default=7, help="Cards dealt per player")
+    branching.add_argument("--seed", type=int, default=0)
+    branching.add_argument("--dump", default="pathological_positions.jsonl",
+                           help="File the positions over a threshold are appended to")
+    branching.add_argument("--time-threshold", type=float, default=BRANCHING_TIME_THRESHOLD, metavar="SECONDS",
+                           help="Dump AI positions whose play_turn call takes longer than this")
+    branching.add_argument("--count-threshold", type=int, default=BRANCHING_COUNT_THRESHOLD,
+                           help="Dump positions that generate more runs or Pick Up combinations than this")
+    branching.set_defaults(func=branching_command)
+
+    positions = commands.add_parser("positions", help="Replay dumped positions as standalone benchmark cases")
+    positions.add_argument("file", help="JSON lines written by the branching command")
+    positions.add_argument("--repeats", type=int, default=5, help="Timed repeats per phase (the best counts)")
+    positions.set_defaults(func=positions_command)
+
+    corpus = commands.add_parser("corpus", help="Record AI games and keep a spread of their positions as a benchmark corpus")
+    corpus.add_argument("--output", default=CORPUS_PATH)
+    corpus.add_argument("--games", type=int, default=30, help="Games recorded per shoe size (1 to 4 decks)")
+    corpus.add_argument("--per-group", type=int, default=2,
+                        help="Positions kept per difficulty, shoe size and kind of turn")
+    corpus.add_argument("--seed", type=int, default=0)
+    corpus.set_defaults(func=corpus_command)
+
+    regress = commands.add_parser("regress", help="Time the position corpus and fail on a regression from the baseline")
+    regress.add_argument("--corpus", default=CORPUS_PATH)
+    regress.add_argument("--baseline", default=BASELINE_PATH)
+    regress.add_argument("--max-regression", type=float, default=MAX_REGRESSION_PERCENT, metavar="PERCENT",
+                         help="Fail when a phase is this much slower than the baseline")
+    regress.add_argument("--repeats", type=int, default=7, help="Timed repeats per phase (the best counts)")
+    regress.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    regress.set_defaults(func=regress_command)
+
+    replay = commands.add_parser("replay", help="Summarise a game record file or show the position at any turn of it")
+    replay.add_argument("file", help="Record file written by simulate --record (its .idx index must sit beside it)")
+    replay.add_argument("--game", type=int, default=None, help="Game to seek to (numbered from 0)")
+    replay.add_argument("--turn", type=int, default=0, help="Show the position after this turn (0 is the deal)")
+    replay.add_argument("--check", action="store_true",
+                        help="Replay every game and check that each keyframe matches the replayed position")
+    replay.set_defaults(func=replay_command)
+
+    fuzz = commands.add_parser("fuzz", help="Check the fast move generators against their reference versions")
+    fuzz.add_argument("--cases", type=int, default=2000, help="Random and adversarial hands to try")
+    fuzz.add_argument("--decks", type=int, default=1, help="Decks to deal from (duplicate-card hands use at least 2)")
+    fuzz.add_argument("--seed", type=int, default=0)
+    fuzz.add_argument("--default-rules", action="store_true", help="Only use the default special cards")
+    fuzz.set_defaults(func=fuzz_command)
+
+    imports = commands.add_parser("imports", help="Measure import time and memory of each part of the package")
+    imports.add_argument("--repeats", type=int, default=3, help="Fresh interpreters per module (the fastest counts)")
+    imports.set_defaults(func=imports_command)
+
+    serve = commands.add_parser("serve", help="Run the HTTP/JSON bot API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--move-timeout", type=float, default=BOT_MOVE_TIMEOUT,
+                       help="Seconds a bot may take over one decision before the easy strategy steps in")
+    serve.set_defaults(func=serve_command)
+
+    bots = commands.add_parser("bots", help="Play a bot program over the stdin/stdout line protocol")
+    bots.add_argument("bot", help='Command that starts the bot, e.g. "python sample_bot.py"')
+    bots.add_argument("--opponents", type=parse_opponents, default=parse_opponents("hard"),
+                      help="Comma-separated built-in AI difficulties to seat against the bot (default: hard)")
+    bots.add_argument("--games", type=int, default=20)
+    bots.add_argument("--concurrency", type=int, default=8, help="Games played at once through the one bot process")
+    bots.add_argument("--move-timeout", type=float, default=SUBPROCESS_MOVE_TIMEOUT,
+                      help="Seconds the bot may take over one decision before the easy strategy steps in")
+    bots.add_argument("--decks", type=int, default=1)
+    bots.add_argument("--cards", type=int, default=7)
+    bots.add_argument("--seed", type=int, default=0)
+    bots.set_defaults(func=bots_command)
+    return parser
+
+def run_cli(argv):
+    args = build_cli_parser().parse_args(argv)
+    args.func(args)
+
+MAX_DECKS = 4
+MAX_PLAYERS_PER_KIND = 10  # Real players and AI players each
+LARGE_TABLE_MAX_DECKS = 8
+LARGE_TABLE_MAX_PLAYERS = 40
+
+def main():
+    from .render import (
+        display_final_summary, display_game_start, display_overall_scores, display_round_summary,
+        display_statistics_summary, print_boxed)
+    print_boxed("Welcome to Street Black Jack")
+    setup_default_special_cards()  # Set up default special cards
+    
+    configure_debugging()  # Configure debugging options
+
+    large_table = input(f"Large table mode (up to {LARGE_TABLE_MAX_DECKS} decks and {LARGE_TABLE_MAX_PLAYERS} players)? (y/n): ").lower() == 'y'
+    max_decks = LARGE_TABLE_MAX_DECKS if large_table else MAX_DECKS
+    max_players = LARGE_TABLE_MAX_PLAYERS if large_table else MAX_PLAYERS_PER_KIND
+    while True:
+        try:
+            num_decks = int(input(f"Enter the number of decks (1-{max_decks}): "))
+            if 1 <= num_decks <= max_decks:
+                break
+            else:
+                print(f"Invalid input. Please enter a number between 1 and {max_decks}.")
+        except ValueError:
+            print(f"Invalid input. Please enter a number between 1 and {max_decks}.")
+    
+    while True:
+        try:
+            cards_per_player = int(input("Enter the number of cards in hand (1-10): "))
+            if 1 <= cards_per_player <= 10:
+                break
+            else:
+                print("Invalid input. Please enter a number between 1 and 10.")
+        except ValueError:
+            print("Invalid input. Please enter a valid integer.")
+    
+    configure_special = input("Configure special cards (y/n): ").lower()
+    if configure_special == 'y':
+        configure_special_cards()
+    
+    while True:
+        try:
+            num_real_players = int(input(f"Enter the number of real players (0-{MAX_PLAYERS_PER_KIND}): "))
+            if 0 <= num_real_players <= MAX_PLAYERS_PER_KIND:
+                break
+            else:
+                print(f"Invalid input. Please enter a number between 0 and {MAX_PLAYERS_PER_KIND}.")
+        except ValueError:
+            print("Invalid input. Please enter a valid integer.")
+    
+    max_bots = max_players - num_real_players if large_table else MAX_PLAYERS_PER_KIND
+    # Leave at least the top card and a few cards to draw after the deal
+    max_bots = max(0, min(max_bots, (len(ranks) * len(suits) * num_decks - 19) // cards_per_player - num_real_players))
+    while True:
+        try:
+            num_bot_players = int(input(f"Enter the number of AI players (0-{max_bots}): "))
+            if 0 <= num_bot_players <= max_bots:
+                break
+            else:
+                print(f"Invalid input. Please enter a number between 0 and {max_bots}.")
+        except ValueError:
+            print("Invalid input. Please enter a valid integer.")
+            
+    ai_difficulties = {}
+    for i in range(num_bot_players):
+        print(f"Difficulty level for AI PLAYER {i+1}:")
+        print("1. Easy")
+        print("2. Medium")
+        print("3. Hard")
+        print("4. Adaptive")
+        print("5. Learning")
+        while True:
+            difficulty_choice = input("Enter difficulty level: ")
+            print('-' * 73)
+            if difficulty_choice in ['1', '2', '3', '4', '5']:
+                break
+            print("Invalid input. Please enter 1, 2, 3, 4, or 5.")
+        
+        difficulties = ['easy', 'medium', 'hard', 'adaptive', 'learning']
+        ai_difficulties[f'AI PLAYER {i+1}'] = difficulties[int(difficulty_choice) - 1]
+    
+    configure_pacing(num_real_players)
+    
+    players = [f'PLAYER {i+1}' for i in range(num_real_players)]
+    for i in range(num_bot_players):
+        ai_player_name = f'AI PLAYER {i+1}'
+        difficulty = ai_difficulties[ai_player_name]
+        players.append(f'{ai_player_name}[{difficulty.capitalize()}]')
+
+    overall_scores = {get_player_key(player): 0 for player in players}
+    games_played = 0
+    stats_store = StatsStore()
+    seed_rng = random.Random()
+    
+    while True:
+        games_played += 1
+        display_game_start(games_played)
+        
+        seed = seed_rng.randrange(2**63)
+        winner, turns, stats = play_game(num_real_players, num_bot_players, num_decks, cards_per_player, ai_difficulties, seed=seed,
+                                         consumers=default_consumers())
+        stats_store.append_game(winner, turns, stats, seed=seed, num_decks=num_decks,
+                                cards_per_player=cards_per_player, difficulties=ai_difficulties)
+        
+        winner_key = get_player_key(winner)
+        if winner_key in overall_scores:
+            overall_scores[winner_key] += 1
+        else:
+            print(f"Warning: Winner key '{winner_key}' not found in overall_scores.")
+            overall_scores[winner_key] = 1  # Initialize score if key doesn't exist
+        
+        display_round_summary(winner, turns, stats)
+        display_overall_scores(overall_scores)
+        
+        print('-' * 73)
+        print("Would you like to play another game?")
+        print("1. Yes")
+        print("2. No")
+        while True:
+            choice = input("Enter your choice: ")
+            print('-' * 73)
+            if choice in ['1', '2']:
+                break
+            print("Invalid input. Please enter 1 or 2.")
+            print('-' * 73)
+        
+        if choice == '2':
+            break
+    
+    display_final_summary(games_played, overall_scores)
+    display_statistics_summary(stats_store)
+    stats_store.close()
+
+def run(argv=None):
+    """Run a subcommand, or the interactive game when there are no arguments."""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        run_cli(argv)
+    else:
+        main()
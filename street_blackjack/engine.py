@@ -0,0 +1,788 @@
+"""Cards, special card rules, move generation, card effects, the game state and its event bus."""
+import random
+import collections
+import time
+import itertools
+import math
+import threading
+import json
+import hashlib
+
+# Ranks and suits for a standard deck of cards
+ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
+suits = ['Hearts', 'Diamonds', 'Clubs', 'Spades']
+
+DEBUG_FLAGS = {
+    "all": False,
+    "player": False,
+    "ai": False,
+    "cards": False,
+    "game": False
+}
+
+special_cards = {}
+
+class TurnRing:
+    """Seated players as a circular doubly linked list: stepping, insertion and removal are all O(1)."""
+
+    def __init__(self, players):
+        self.following = {}
+        self.preceding = {}
+        self.version = 0  # Bumped whenever the seating changes
+        for player, next_player in zip(players, list(players[1:]) + list(players[:1])):
+            self.following[player] = next_player
+            self.preceding[next_player] = player
+
+    def __len__(self):
+        return len(self.following)
+
+    def __contains__(self, player):
+        return player in self.following
+
+    def step(self, player, direction=1):
+        return self.following[player] if direction == 1 else self.preceding[player]
+
+    def walk(self, player, direction=1):
+        """Yield every seated player once, starting with ``player`` and moving in ``direction``."""
+        current = player
+        for _ in range(len(self.following)):
+            yield current
+            current = self.step(current, direction)
+
+    def insert_after(self, anchor, player):
+        if not self.following:
+            self.following[player] = self.preceding[player] = player
+        else:
+            next_player = self.following[anchor]
+            self.following[anchor] = player
+            self.following[player] = next_player
+            self.preceding[next_player] = player
+            self.preceding[player] = anchor
+        self.version += 1
+
+    def remove(self, player):
+        previous_player = self.preceding.pop(player)
+        next_player = self.following.pop(player)
+        if previous_player != player:
+            self.following[previous_player] = next_player
+            self.preceding[next_player] = previous_player
+        self.version += 1
+
+class GameState:
+    def __init__(self, players):
+        from .ai import AIPlayer  # The AI builds on the engine, so it can only be imported once both are loaded
+        self.players = players  # Seat order; players only ever join at the end
+        self.seats = {player: seat for seat, player in enumerate(players)}
+        self.ring = TurnRing(players)
+        self.ai_players = {player.name: player for player in players if isinstance(player, AIPlayer)}
+        self.current_player = players[0] if players else None
+        self.direction = 1  # 1 for clockwise, -1 for counter-clockwise
+        self.players_out = set()  # Seated players whose hand is empty
+        self.pick_up_stack = 0
+        self.potential_winner = None
+        self.last_effect = None
+        self.current_suit = None
+        self.player_hands = {}
+        self.missed_turns = {player: 0 for player in players}  # New: track missed turns for each player
+        self.last_played = None  # Cards played during the current play_turn call, in play order
+        self.event_handler = None  # Renders AI turns (play_game sets it); None skips rendering them entirely
+        self.turn_events = []
+        self.bus = EventBus()  # Everything else that happens in the game is published here
+        self.turn = 1
+        self.turn_order_cache = {}
+        self.turn_order_version = self.ring.version
+        self.speculation = None  # Moves worked out ahead for AI turns (see game.SpeculativePlanner)
+
+    @property
+    def current_player_index(self):
+        return self.seats[self.current_player]
+
+    @current_player_index.setter
+    def current_player_index(self, seat):
+        self.current_player = self.players[seat]
+
+    def player_after(self, player, steps=1):
+        for _ in range(steps):
+            player = self.ring.step(player, self.direction)
+        return player
+
+    def add_player(self, player, hand=None, after=None):
+        """Seat ``player`` after ``after`` (by default just before the current player's turn comes round)."""
+        from .ai import AIPlayer
+        if after is None:
+            after = self.current_player
+            if self.ring and self.direction == 1:
+                after = self.ring.step(self.current_player, -1)
+        self.seats[player] = len(self.players)
+        self.players.append(player)
+        self.ring.insert_after(after, player)
+        self.missed_turns[player] = 0
+        self.player_hands[player] = hand if hand is not None else []
+        if isinstance(player, AIPlayer):
+            self.ai_players[player.name] = player
+        self.update_hand_status(player)
+
+    def remove_player(self, player):
+        """Take ``player`` out of the turn order; their seat number stays reserved."""
+        if player == self.current_player:
+            # Step back so the next advance lands on the player who would have followed
+            self.current_player = self.ring.step(player, -self.direction)
+        self.ring.remove(player)
+        self.players_out.discard(player)
+        self.missed_turns[player] = 0
+        if not self.ring:
+            self.current_player = None
+
+    def update_hand_status(self, player):
+        if self.player_hands.get(player):
+            self.players_out.discard(player)
+        elif player in self.ring:
+            self.players_out.add(player)
+
+    def emit(self, event):
+        self.turn_events.append(event)
+        if self.event_handler:
+            self.event_handler(event)
+
+    def next_player(self):
+        while True:
+            self.current_player = current_player = self.ring.step(self.current_player, self.direction)
+            if self.missed_turns[current_player] > 0:
+                self.missed_turns[current_player] -= 1
+                self.bus.publish('miss-turn', self.turn, current_player, value='skip')
+            else:
+                return current_player
+
+    def reverse_direction(self):
+        self.direction *= -1
+
+    def display_turn_order(self):
+        from .ai import AIPlayer
+        if self.turn_order_version != self.ring.version:
+            self.turn_order_cache.clear()
+            self.turn_order_version = self.ring.version
+        key = (self.current_player, self.direction)
+        if key not in self.turn_order_cache:
+            order = []
+            for i, player in enumerate(self.ring.walk(self.current_player, self.direction)):
+                player_name = player.name if isinstance(player, AIPlayer) else str(player)
+                if i == 0:
+                    order.append(f"{player_name} *")
+                elif i == 1:
+                    order.append(f"{player_name} ^")
+                else:
+                    order.append(player_name)
+            direction_name = "clockwise" if self.direction == 1 else "counter-clockwise"
+            self.turn_order_cache[key] = f"TURN ORDER ({direction_name}): {' -> '.join(order)}"
+        print(self.turn_order_cache[key])
+        print('-' * 73)
+
+    def set_potential_winner(self, player):
+        self.potential_winner = player
+
+    def get_potential_winner(self):
+        return self.potential_winner
+
+    def has_potential_winner(self):
+        return self.potential_winner is not None
+
+    def clear_potential_winner(self):
+        self.potential_winner = None
+
+    def declare_winner(self, player):
+        from .render import print_boxed
+        print_boxed(f"{player} wins the game!")
+        return "game_over"
+
+PACING_MODES = ('interactive', 'spectator', 'batch')
+
+class PacingController:
+    """Decides how long the game waits between actions: prompts, a fixed delay or not at all."""
+    def __init__(self, mode='interactive', turn_delay=1.0):
+        self.set_mode(mode, turn_delay)
+
+    def set_mode(self, mode, turn_delay=None):
+        if mode not in PACING_MODES:
+            raise ValueError(f"Unknown pacing mode: {mode}")
+        self.mode = mode
+        if turn_delay is not None:
+            self.turn_delay = turn_delay
+
+    def confirm(self):
+        if self.mode == 'interactive':
+            input("Press Enter to continue...")
+            print('-' * 73)
+
+    def end_turn(self):
+        if self.mode == 'interactive':
+            self.confirm()
+        elif self.mode == 'spectator':
+            time.sleep(self.turn_delay)
+
+    def sleep(self, seconds):
+        if self.mode == 'interactive':
+            time.sleep(seconds)
+        elif self.mode == 'spectator':
+            time.sleep(min(seconds, self.turn_delay))
+
+pacing = PacingController()
+
+class MoveGenerationProbe:
+    """Counts from find_valid_runs for a BranchingProfiler (see game.py); does nothing until it is made active.
+
+    The first call after reset() is the position's own move list. Later
+    calls, like the endgame search's, only add to the search totals.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.reset()
+
+    def reset(self):
+        self.runs_generated = self.runs = None
+        self.search_calls = self.search_runs_generated = 0
+
+    def record_runs(self, generated, unique):
+        if threading.current_thread() is not threading.main_thread():
+            return  # Speculative work for a later turn is not part of this one
+        if self.runs is None:
+            self.runs_generated, self.runs = generated, unique
+        else:
+            self.search_calls += 1
+            self.search_runs_generated += generated
+
+move_probe = MoveGenerationProbe()
+
+def is_pickup_card(card):
+    return card_effect(card) in (PICK_UP_TWO, PICK_UP_FIVE)
+
+PICKUP_COMBINATION_LIMIT = 12  # Beyond this many Pick Up cards with copies, count copies instead of listing every combination
+
+def find_pickup_runs(hand):
+    # card_effects always covers the full deck, so look effects up directly rather than through is_pickup_card
+    pickup_cards = [card for card in hand if card_effects.get(card) in (PICK_UP_TWO, PICK_UP_FIVE)]
+    
+    if len(pickup_cards) < 2:  # Only consider actual runs
+        return []
+
+    # Copies of the same card (from extra decks) are interchangeable, so a
+    # combination is a choice of how many copies of each card to play
+    copies = collections.Counter(pickup_cards)  # Keeps the order cards first appear in the hand
+    runs = []
+    if len(copies) == len(pickup_cards) or len(pickup_cards) <= PICKUP_COMBINATION_LIMIT:
+        # No copies, or few enough cards to list every combination and drop the repeats
+        grouped = [card for card, count in copies.items() for _ in range(count)]
+        for i in range(2, len(grouped) + 1):
+            runs.extend(itertools.combinations(grouped, i))
+        if len(copies) < len(pickup_cards):
+            runs = list(dict.fromkeys(runs))
+    else:
+        for counts in itertools.product(*(range(count + 1) for count in copies.values())):
+            if sum(counts) >= 2:
+                runs.append(tuple(card for card, count in zip(copies, counts) for _ in range(count)))
+    
+    # Sort runs by length (descending) and then alphabetically
+    runs.sort(key=lambda x: (-len(x), x))
+    
+    return runs
+
+def count_pickup_combinations(hand):
+    """(combinations listed, distinct runs) that find_pickup_runs would produce for ``hand``, without listing them."""
+    copies = collections.Counter(card for card in hand if card_effects.get(card) in (PICK_UP_TWO, PICK_UP_FIVE))
+    count = sum(copies.values())
+    if count < 2:
+        return 0, 0
+    distinct = math.prod(copies_of_card + 1 for copies_of_card in copies.values()) - 1 - len(copies)
+    if len(copies) == count or count <= PICKUP_COMBINATION_LIMIT:
+        return 2 ** count - 1 - count, distinct
+    return distinct, distinct
+
+def is_cover_card(card):
+    return card_effect(card) == COVER
+
+def has_pickup_card(hand):
+    return any(is_pickup_card(card) for card in hand)
+
+RANK_INDEX = {rank: index for index, rank in enumerate(ranks)}
+
+def get_special_effect(card):
+    """Return the effect number (1-7) assigned to a card, or 0 if it has none."""
+    if card in special_cards:
+        return special_cards[card]
+    return special_cards.get(card.split(' of ')[0], 0)
+
+def get_special_effect_name(card):
+    parts = card.split(' of ')
+    if len(parts) >= 2:
+        rank = parts[0]
+    else:
+        rank = card
+
+    if card in special_cards:
+        effect = special_cards[card]
+    elif rank in special_cards:
+        effect = special_cards[rank]
+    else:
+        return ""
+
+    effect_names = {
+        1: "Pick Up Two",
+        2: "Pick Up Five",
+        3: "Miss a Turn",
+        4: "Cover",
+        5: "Cancel",
+        6: "Reverse",
+        7: "Change Suit"
+    }
+    return effect_names.get(effect, "")
+
+def create_deck():
+    """Create a standard deck of 52 cards."""
+    deck = [f'{rank} of {suit}' for rank in ranks for suit in suits]
+    return deck
+
+def shuffle_deck(deck):
+    """Shuffle the deck of cards."""
+    random.shuffle(deck)
+    return deck
+
+def derive_seed(seed, stream):
+    """A 64-bit seed for the random stream ``stream`` (a name) of the game seeded with ``seed``.
+
+    Seeding two generators with the same number gives the same sequence, so
+    each stream of a game gets its own seed, hashed from the game's seed and
+    the stream's name. It is the same in every process, unlike hash().
+    """
+    digest = hashlib.sha256(f"{seed}/{stream}".encode()).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+class Shoe:
+    """The cards left to draw, shuffled lazily.
+
+    Instead of shuffling everything up front, each draw picks a uniformly
+    random remaining card and swaps it to the end before popping it (one step
+    of a Fisher-Yates shuffle), so the cost is paid per card drawn and
+    returning discards is a plain append. Pass a seeded ``random.Random`` as
+    ``rng`` for a reproducible card sequence.
+    """
+
+    def __init__(self, cards=(), rng=None):
+        self.cards = list(cards)
+        self.rng = rng or random
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __bool__(self):
+        return bool(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def __contains__(self, card):
+        return card in self.cards
+
+    def draw(self):
+        cards = self.cards
+        index = self.rng.randrange(len(cards))
+        cards[index], cards[-1] = cards[-1], cards[index]
+        return cards.pop()
+
+    def extend(self, cards):
+        """Return cards (e.g. the discard pile) to the shoe."""
+        self.cards.extend(cards)
+
+def deal_cards(deck, players, cards_per_player):
+    """Deal cards to each player."""
+    if isinstance(deck, Shoe):
+        player_hands = {player: [deck.draw() for _ in range(cards_per_player)] for player in players}
+        return player_hands, deck
+    player_hands = {player: deck[i*cards_per_player:(i+1)*cards_per_player] for i, player in enumerate(players)}
+    remaining_deck = deck[len(players)*cards_per_player:]
+    return player_hands, remaining_deck
+
+CARD_SORT_KEYS = {f'{rank} of {suit}': (rank_index, suit_index)
+                  for rank_index, rank in enumerate(ranks) for suit_index, suit in enumerate(suits)}
+
+def sort_cards(cards):
+    return sorted(cards, key=CARD_SORT_KEYS.__getitem__)
+
+CARD_NAMES = [f'{rank} of {suit}' for rank in ranks for suit in suits]
+CARD_IDS = {card: index for index, card in enumerate(CARD_NAMES)}
+
+def card_id(card):
+    return CARD_IDS[card]
+
+def card_name(card_id):
+    return CARD_NAMES[card_id]
+
+# For every top card, the cards that can be played on it: same suit, same rank or an Ace
+PLAYABLE_ON = {top_card: frozenset(card for card, (rank_index, suit_index) in CARD_SORT_KEYS.items()
+                                   if suit_index == top_key[1] or rank_index == top_key[0] or ranks[rank_index] == 'Ace')
+               for top_card, top_key in CARD_SORT_KEYS.items()}
+
+def find_valid_single_cards(hand, top_card):
+    """Find valid single cards that can be played."""
+    playable = PLAYABLE_ON.get(top_card)
+    if playable is None:
+        top_rank, top_suit = top_card.split(' of ')
+        return [card for card in hand if 'Ace' in card or top_suit in card or card.split(' of ')[0] == top_rank]
+    return [card for card in hand if card in playable]
+
+def find_valid_runs(hand, top_card, valid_single_cards):
+    """Find valid runs including consecutive, rank match, and combination runs.
+
+    A run is a path through distinct cards of the hand where each step goes
+    to a card of the same rank or to the next/previous rank of the same
+    suit, starting from a valid single card. The paths are enumerated once
+    with a depth-first search over a per-hand neighbour map, so the cost is
+    proportional to the number of runs rather than to repeated list scans.
+    """
+    if not valid_single_cards:
+        return []
+
+    cards = list(dict.fromkeys(hand))
+    by_rank = collections.defaultdict(list)
+    for card in cards:
+        by_rank[card.split(' of ')[0]].append(card)
+    present = set(cards)
+    neighbours = {}
+    for card in cards:
+        rank, suit = card.split(' of ')
+        rank_index = RANK_INDEX[rank]
+        adjacent = [match for match in by_rank[rank] if match != card]
+        for step in (1, -1):
+            next_card = f"{ranks[(rank_index + step) % len(ranks)]} of {suit}"
+            if next_card in present:
+                adjacent.append(next_card)
+        neighbours[card] = adjacent
+
+    valid_runs = []  # Duplicates (the same run reached from repeated copies) are dropped at the end
+    path = []
+    visited = set()
+
+    def extend():
+        for next_card in neighbours[path[-1]]:
+            if next_card not in visited:
+                path.append(next_card)
+                visited.add(next_card)
+                valid_runs.append(' - '.join(path))
+                extend()
+                visited.discard(next_card)
+                path.pop()
+
+    # With a whole suit in hand a straight can go all the way round, carrying on
+    # through second copies from extra decks for as long as the hand has them
+    copies = collections.Counter(hand)
+    full_suits = set()
+    if len(cards) >= len(ranks):
+        full_suits = {suit for suit in suits if all(f"{rank} of {suit}" in present for rank in ranks)}
+
+    for start_card in dict.fromkeys(valid_single_cards):
+        path.append(start_card)
+        visited.add(start_card)
+        extend()
+        visited.discard(start_card)
+        path.pop()
+
+        rank, suit = start_card.split(' of ')
+        if suit in full_suits:
+            for step in (1, -1):
+                straight = [f"{ranks[(RANK_INDEX[rank] + step * i) % len(ranks)]} of {suit}" for i in range(len(hand))]
+                used = collections.Counter(straight[:len(ranks)])
+                for length in range(len(ranks) + 1, len(hand) + 1):
+                    used[straight[length - 1]] += 1
+                    if used[straight[length - 1]] > copies[straight[length - 1]]:
+                        break
+                    valid_runs.append(' - '.join(straight[:length]))
+
+        # Rank match run: every other card of the rank, including repeated copies from extra decks
+        rank = start_card.split(' of ')[0]
+        rank_matches = [card for card in hand if card.split(' of ')[0] == rank and card != start_card]
+        if rank_matches:
+            valid_runs.append(f"{start_card} - {' - '.join(rank_matches)}")
+
+    unique_runs = sorted(set(valid_runs))
+    if move_probe.active:
+        move_probe.record_runs(len(valid_runs), len(unique_runs))
+    return unique_runs
+
+def add_special_indicator(card):
+    label = card_labels.get(card)
+    if label is None:
+        label = card_labels[card] = build_special_label(card)
+    return label
+
+def build_special_label(card):
+    effect_name = get_special_effect_name(card)
+    if effect_name:
+        return f"{card}[{effect_name}]"
+    return card
+
+DEFAULT_SPECIAL_CARDS = {
+    "2": 1,  # Pick Up Two
+    "Jack of Clubs": 2,  # Pick Up Five
+    "Jack of Spades": 2,  # Pick Up Five
+    "8": 3,  # Miss a Turn
+    "Queen": 4,  # Cover
+    "Jack of Hearts": 5,  # Cancel
+    "Jack of Diamonds": 5,  # Cancel
+    "King": 6,  # Reverse
+    "Ace": 7  # Change Suit
+}
+
+def setup_default_special_cards():
+    set_special_cards(DEFAULT_SPECIAL_CARDS)
+
+def set_special_cards(assignments):
+    """Replace the special card rules in place, so every reference to the dict sees them."""
+    special_cards.clear()
+    special_cards.update(assignments)
+    rebuild_card_effects()
+
+def special_cards_key(assignments):
+    return json.dumps(sorted(assignments.items()))
+
+def assign_special_effect(assignments, key, effect):
+    """Give a rank or card an effect (0 removes it); a rank also replaces its per-card overrides."""
+    if ' of ' not in key:
+        for card in [card for card in assignments if card.startswith(key + ' of ')]:
+            del assignments[card]
+    if effect:
+        assignments[key] = effect
+    else:
+        assignments.pop(key, None)
+
+def special_card_grid(variations, base=None):
+    """Yield every combination of ``variations`` ({card or rank: [effect, ...]}, 0 = no effect) over ``base``."""
+    base = DEFAULT_SPECIAL_CARDS if base is None else base
+    keys = sorted(variations)
+    for effects in itertools.product(*(variations[key] for key in keys)):
+        assignments = dict(base)
+        for key, effect in zip(keys, effects):
+            assign_special_effect(assignments, key, effect)
+        yield assignments
+
+def sample_special_cards(count, rng=None, changes=2, base=None):
+    """Return ``count`` random house rules, each reassigning ``changes`` ranks of ``base``."""
+    rng = rng or random.Random()
+    base = DEFAULT_SPECIAL_CARDS if base is None else base
+    samples = []
+    for _ in range(count):
+        assignments = dict(base)
+        for rank in rng.sample(ranks, changes):
+            assign_special_effect(assignments, rank, rng.randint(0, len(EFFECT_NAMES)))
+        samples.append(assignments)
+    return samples
+
+def describe_special_cards(assignments, base=None):
+    """Summarise how ``assignments`` differ from ``base`` (the default rules)."""
+    base = DEFAULT_SPECIAL_CARDS if base is None else base
+    changes = []
+    for key in sorted(set(base) | set(assignments), key=str):
+        if base.get(key) != assignments.get(key):
+            changes.append(f"{key}: {EFFECT_NAMES.get(assignments.get(key), 'None')}")
+    return ", ".join(changes) or "Default rules"
+
+def debug_print_deck_size(deck, discard_pile):
+    if DEBUG_FLAGS["all"] or DEBUG_FLAGS["game"]:
+        print(f"DEBUG [GAME]: Cards in deck: {len(deck)}, Cards in discard pile: {len(discard_pile)}")
+
+# Effect engine
+#
+# Each of the seven effects is a handler registered in EFFECT_HANDLERS. A
+# handler changes the game state for one card and returns an EffectEvent
+# saying what happened; nothing in the engine prints, and the only input it
+# asks for goes through the suit chooser it is given for Change Suit. Card
+# effects are looked up in card_effects, which is rebuilt whenever the
+# special card rules change, so resolving a run is one pass over effect ids.
+
+PICK_UP_TWO, PICK_UP_FIVE, MISS_A_TURN, COVER, CANCEL, REVERSE, CHANGE_SUIT = range(1, 8)
+
+# value is the new Pick Up stack, the number of turns missed, the Cover
+# card's label, the stack cancelled, the new direction or the new suit
+EffectEvent = collections.namedtuple('EffectEvent', 'effect player card value')
+EFFECT_NAMES = {
+    1: "Pick Up Two",
+    2: "Pick Up Five",
+    3: "Miss a Turn",
+    4: "Cover",
+    5: "Cancel",
+    6: "Reverse",
+    7: "Change Suit"
+}
+
+EFFECT_HANDLERS = {}
+card_effects = {}  # Card name -> effect id for every card, under the current rules
+card_labels = {}  # Card name -> card name with its effect, filled in as they are asked for
+rules_listeners = []  # Called whenever the special card rules change, e.g. to drop cached renderings
+
+def rebuild_card_effects():
+    card_effects.clear()
+    card_effects.update((card, get_special_effect(card)) for card in CARD_SORT_KEYS)
+    card_labels.clear()
+    for listener in rules_listeners:
+        listener()
+
+def card_effect(card):
+    effect = card_effects.get(card)
+    return get_special_effect(card) if effect is None else effect
+
+def register_effect(effect):
+    def register(handler):
+        EFFECT_HANDLERS[effect] = handler
+        return handler
+    return register
+
+@register_effect(PICK_UP_TWO)
+def pick_up_two_effect(game_state, player, card, count, choose_suit):
+    game_state.pick_up_stack += 2 * count
+    game_state.last_effect = PICK_UP_TWO
+    return EffectEvent(PICK_UP_TWO, player, card, game_state.pick_up_stack)
+
+@register_effect(PICK_UP_FIVE)
+def pick_up_five_effect(game_state, player, card, count, choose_suit):
+    game_state.pick_up_stack += 5 * count
+    game_state.last_effect = PICK_UP_FIVE
+    return EffectEvent(PICK_UP_FIVE, player, card, game_state.pick_up_stack)
+
+@register_effect(MISS_A_TURN)
+def miss_a_turn_effect(game_state, player, card, count, choose_suit):
+    apply_miss_turn_effect(game_state, player, count)
+    return EffectEvent(MISS_A_TURN, player, card, count)
+
+@register_effect(COVER)
+def cover_effect(game_state, player, card, count, choose_suit):
+    game_state.last_effect = COVER
+    game_state.cover_card = add_special_indicator(card)
+    return EffectEvent(COVER, player, card, game_state.cover_card)
+
+@register_effect(CANCEL)
+def cancel_effect(game_state, player, card, count, choose_suit):
+    cancelled = 0
+    if game_state.last_effect in (PICK_UP_TWO, PICK_UP_FIVE):
+        cancelled, game_state.pick_up_stack = game_state.pick_up_stack, 0
+    game_state.last_effect = None
+    return EffectEvent(CANCEL, player, card, cancelled)
+
+@register_effect(REVERSE)
+def reverse_effect(game_state, player, card, count, choose_suit):
+    game_state.reverse_direction()
+    return EffectEvent(REVERSE, player, card, game_state.direction)
+
+@register_effect(CHANGE_SUIT)
+def change_suit_effect(game_state, player, card, count, choose_suit):
+    return EffectEvent(CHANGE_SUIT, player, card, choose_suit(player))
+
+def played_effects(cards):
+    """(card, effect id) for the cards of a play whose effects count, in play order.
+
+    Only the trailing cards of the same rank as the last card count, so a
+    single card is just a run of one.
+    """
+    last_rank = CARD_SORT_KEYS[cards[-1]][0]
+    start = len(cards) - 1
+    while start and CARD_SORT_KEYS[cards[start - 1]][0] == last_rank:
+        start -= 1
+    effects = []
+    for card in cards[start:]:
+        effect = card_effect(card)
+        if effect in EFFECT_HANDLERS:
+            effects.append((card, effect))
+    return effects
+
+def resolve_effects(cards, player, game_state, choose_suit):
+    """Apply the effects of a play; returns (final effect id or 0, new top card, events).
+
+    Miss a Turn cards add up into one skip, only the last Change Suit counts
+    and decides the final effect, then Miss a Turn, then the last other effect.
+    """
+    new_top_card = cards[-1]
+    final_effect = 0
+    events = []
+    misses = 0
+    change_suit_card = None
+    for card, effect in played_effects(cards):
+        if effect == MISS_A_TURN:
+            misses += 1
+        elif effect == CHANGE_SUIT:
+            change_suit_card = card
+        else:
+            events.append(EFFECT_HANDLERS[effect](game_state, player, card, 1, choose_suit))
+            final_effect = effect
+    if misses:
+        events.append(EFFECT_HANDLERS[MISS_A_TURN](game_state, player, new_top_card, misses, choose_suit))
+        final_effect = MISS_A_TURN
+    if change_suit_card:
+        event = EFFECT_HANDLERS[CHANGE_SUIT](game_state, player, change_suit_card, 1, choose_suit)
+        events.append(event)
+        new_top_card = f"{ranks[CARD_SORT_KEYS[change_suit_card][0]]} of {event.value}"
+        final_effect = CHANGE_SUIT
+    return final_effect, new_top_card, events
+
+def apply_miss_turn_effect(game_state, current_player, num_miss_cards=1):
+    next_player = current_player
+    for i in range(num_miss_cards):
+        # Each Miss a Turn card skips the player one seat further on
+        next_player = game_state.player_after(next_player)
+
+        # Apply the miss turn effect to the next player
+        game_state.missed_turns[next_player] += 1
+
+def count_active_opponents(game_state):
+    players_out = len(game_state.players_out) - (game_state.current_player in game_state.players_out)
+    return len(game_state.ring) - 1 - players_out
+    
+# Game event bus
+#
+# play_game publishes what happens instead of printing, counting or
+# recording it itself: 'deal', 'turn' (a player's turn starts), 'play',
+# 'draw', 'effect', 'reshuffle', 'miss-turn', 'move' (one play_turn call,
+# summed up), 'round' and 'win' (also published, with no player, when a
+# game ends without a winner). Renderers, statistics, AI models, recorders
+# and profilers subscribe to the kinds they need; a kind with no
+# subscribers costs one dict lookup, so a bare simulation pays for nothing.
+
+GameEvent = collections.namedtuple('GameEvent', 'kind turn player cards top_card value')
+GameSetup = collections.namedtuple('GameSetup', 'game_state stats deck discard_pile seed num_decks cards_per_player')
+Move = collections.namedtuple('Move', 'action played drawn play_again picked_up previous_top_card pick_up_stack')
+EVENT_KINDS = ('deal', 'turn', 'play', 'draw', 'effect', 'reshuffle', 'miss-turn', 'move', 'round', 'win')
+
+class EventBus:
+    def __init__(self):
+        self.consumers = {}
+
+    def subscribe(self, kind, consumer):
+        self.consumers.setdefault(kind, []).append(consumer)
+
+    def wants(self, kind):
+        return kind in self.consumers
+
+    def publish(self, kind, turn, player, cards=(), top_card=None, value=None):
+        consumers = self.consumers.get(kind)
+        if consumers:
+            event = GameEvent(kind, turn, player, cards, top_card, value)
+            for consumer in consumers:
+                consumer(event)
+
+def publish_move(bus, game_state, player, action, play_again, top_card, new_top_card, hand_size_before,
+                 pick_up_stack_before, reshuffled):
+    """Publish the play, reshuffle, draw and move events of one play_turn call."""
+    if not (bus.wants('play') or bus.wants('draw') or bus.wants('move') or reshuffled and bus.wants('reshuffle')):
+        return
+    turn = game_state.turn
+    hand = game_state.player_hands[player]
+    played = tuple(game_state.last_played or ())
+    num_drawn = len(hand) - (hand_size_before - len(played))
+    drawn = tuple(hand[len(hand) - num_drawn:]) if num_drawn > 0 else ()
+    if played:
+        bus.publish('play', turn, player, played, top_card, new_top_card)
+    if reshuffled:
+        bus.publish('reshuffle', turn, player, (), top_card, 'during turn')
+    picked_up = pick_up_stack_before > 0 and not played
+    if drawn:
+        # Why the cards were drawn: a Pick Up stack, nothing playable (or no wish to play), or a last-card rule
+        reason = 'pick up' if picked_up else 'forced' if played else 'pass'
+        bus.publish('draw', turn, player, drawn, top_card, reason)
+    bus.publish('move', turn, player, played, new_top_card or top_card,
+                Move(action, played, drawn, play_again, picked_up, top_card, pick_up_stack_before))
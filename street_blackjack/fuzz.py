@@ -0,0 +1,360 @@
+"""Differential fuzzing of the move generators against frozen reference versions."""
+import random
+import collections
+import time
+import itertools
+
+from .engine import (
+    CANCEL, CARD_NAMES, CHANGE_SUIT, COVER, DEFAULT_SPECIAL_CARDS, GameState, MISS_A_TURN, PICKUP_COMBINATION_LIMIT,
+    PICK_UP_FIVE, PICK_UP_TWO, REVERSE, add_special_indicator, apply_miss_turn_effect, create_deck, find_pickup_runs,
+    find_valid_runs, find_valid_single_cards, get_special_effect_name, is_pickup_card, ranks, sample_special_cards,
+    set_special_cards, special_cards, suits)
+from .ai import AIPlayer
+from .game import apply_run_effect
+
+# Differential move generator fuzzing
+#
+# The move generators and the effect resolver have been rewritten for speed.
+# The reference_* functions are frozen copies of the straightforward versions
+# they replaced (minus the printing), kept so the fast ones can be checked
+# against them: run_move_fuzz builds random and adversarial hands - Ace
+# wildcards, suits running round from King through Ace to 2, hands full of
+# one rank and repeated cards from extra decks - runs both versions over the
+# same cases and reports every mismatch and the speedup.
+#
+# Some differences are intended and counted separately rather than reported
+# as mismatches: the reference's straight runs can go all the way round a
+# suit and on into cards the hand only holds once, it only lists straights
+# that go round the suit backwards when they run on as far as the hand
+# allows (the fast generator lists every length the hand's copies allow),
+# and it lists repeated combinations of Pick Up cards once per copy.
+
+FUZZ_BLOCK_CASES = 200  # Cases played under one set of special card rules
+FUZZ_MAX_HAND = 12
+FUZZ_MAX_SAME_RANK = 7  # The reference walks every ordering of same-rank cards
+FUZZ_MAX_PICKUP_CARDS = PICKUP_COMBINATION_LIMIT + 4  # ...and lists every combination of Pick Up cards
+FUZZ_EXAMPLES = 3  # Mismatches shown per function
+FUZZ_HAND_KINDS = ('random', 'aces', 'wraparound', 'same rank', 'duplicates', 'pick ups')
+REFERENCE_EFFECT_NAMES = {0: None, PICK_UP_TWO: "pick up", PICK_UP_FIVE: "pick up", MISS_A_TURN: "skip", COVER: "cover",
+                          CANCEL: "cancel", REVERSE: "reverse", CHANGE_SUIT: "change suit"}
+
+def reference_find_valid_single_cards(hand, top_card):
+    top_rank, top_suit = top_card.split(' of ')
+    return [card for card in hand if 'Ace' in card or top_suit in card or card.split(' of ')[0] == top_rank]
+
+def reference_find_valid_runs(hand, top_card, valid_single_cards):
+    valid_runs = []
+    max_run_length = len(hand)
+
+    def get_rank(card):
+        return card.split(' of ')[0]
+
+    def get_suit(card):
+        return card.split(' of ')[1]
+
+    def get_next_rank(rank):
+        return ranks[(ranks.index(rank) + 1) % len(ranks)]
+
+    def get_prev_rank(rank):
+        return ranks[(ranks.index(rank) - 1) % len(ranks)]
+
+    def extend_run(start_card, direction):
+        run = [start_card]
+        current_rank = get_rank(start_card)
+        current_suit = get_suit(start_card)
+        while len(run) < max_run_length:
+            next_rank = get_next_rank(current_rank) if direction == 'forward' else get_prev_rank(current_rank)
+            next_card = f"{next_rank} of {current_suit}"
+            if next_card in hand:
+                run.append(next_card)
+                current_rank = next_rank
+            else:
+                break
+        return run
+
+    def build_combination_run(current_run):
+        if len(current_run) > 1:
+            valid_runs.append(' - '.join(current_run))
+            valid_runs.append(' - '.join(reversed(current_run)))
+        if len(current_run) >= max_run_length:
+            return
+        last_card = current_run[-1]
+        for match in [c for c in hand if get_rank(c) == get_rank(last_card) and c != last_card]:
+            if match not in current_run:
+                build_combination_run(current_run + [match])
+        next_card = f"{get_next_rank(get_rank(last_card))} of {get_suit(last_card)}"
+        prev_card = f"{get_prev_rank(get_rank(last_card))} of {get_suit(last_card)}"
+        if next_card in hand and next_card not in current_run:
+            build_combination_run(current_run + [next_card])
+        if prev_card in hand and prev_card not in current_run:
+            build_combination_run(current_run + [prev_card])
+
+    for start_card in valid_single_cards:
+        for direction in ['forward', 'backward']:
+            run = extend_run(start_card, direction)
+            for i in range(2, len(run) + 1):
+                valid_runs.append(' - '.join(run[:i] if direction == 'forward' else run[-i:]))
+        rank_matches = [card for card in hand if get_rank(card) == get_rank(start_card) and card != start_card]
+        if rank_matches:
+            valid_runs.append(f"{start_card} - {' - '.join(rank_matches)}")
+        build_combination_run([start_card])
+
+    valid_runs = [run for run in valid_runs if run.split(' - ')[0] in valid_single_cards]
+    return sorted(list(set(valid_runs)))
+
+def reference_is_pickup_card(card):
+    return any(term in get_special_effect_name(card) for term in ['Pick Up Two', 'Pick Up Five'])
+
+def reference_find_pickup_runs(hand):
+    pickup_cards = [card for card in hand if reference_is_pickup_card(card)]
+    if not pickup_cards:
+        return []
+    runs = []
+    for i in range(2, len(pickup_cards) + 1):
+        runs.extend(itertools.combinations(pickup_cards, i))
+    runs.sort(key=lambda x: (-len(x), x))
+    return runs
+
+def reference_single_card_effect(played_card, current_player, game_state, choose_suit):
+    rank = played_card.split(' of ')[0]
+    if played_card in special_cards:
+        effect = special_cards[played_card]
+    elif rank in special_cards:
+        effect = special_cards[rank]
+    else:
+        return None, played_card
+    if effect in (1, 2):
+        game_state.pick_up_stack += 2 if effect == 1 else 5
+        game_state.last_effect = "pick up"
+        return "pick up", played_card
+    elif effect == 3:
+        apply_miss_turn_effect(game_state, current_player, 1)
+        return "skip", played_card
+    elif effect == 4:
+        game_state.last_effect = "cover"
+        game_state.cover_card = add_special_indicator(played_card)
+        return "cover", played_card
+    elif effect == 5:
+        if game_state.last_effect == "pick up":
+            game_state.pick_up_stack = 0
+        game_state.last_effect = None
+        return "cancel", played_card
+    elif effect == 6:
+        game_state.reverse_direction()
+        return "reverse", played_card
+    elif effect == 7:
+        return "change suit", f"{rank} of {choose_suit(current_player)}"
+    return None, played_card
+
+def reference_apply_run_effect(played_cards, current_player, game_state, choose_suit):
+    new_top_card = played_cards[-1]
+    last_rank = new_top_card.split(' of ')[0]
+    special_effects = []
+    miss_turn_count = 0
+    final_effect = None
+    change_suit_card = None
+    for card in reversed(played_cards):
+        if card.split(' of ')[0] == last_rank:
+            if card in special_cards or last_rank in special_cards:
+                special_effects.insert(0, card)
+        else:
+            break
+    for card in special_effects:
+        effect_name = get_special_effect_name(card)
+        if effect_name == 'Miss a Turn':
+            miss_turn_count += 1
+        elif effect_name == 'Change Suit':
+            change_suit_card = card
+        else:
+            final_effect, _ = reference_single_card_effect(card, current_player, game_state, choose_suit)
+    if miss_turn_count > 0:
+        apply_miss_turn_effect(game_state, current_player, miss_turn_count)
+        final_effect = "skip"
+    if change_suit_card:
+        final_effect, new_top_card = reference_single_card_effect(change_suit_card, current_player, game_state,
+                                                                  choose_suit)
+    return final_effect, new_top_card
+
+def fuzz_hand(rng, kind, num_decks):
+    """A hand of ``kind`` (one of FUZZ_HAND_KINDS) dealt from ``num_decks`` decks."""
+    if kind == 'duplicates':
+        num_decks = max(num_decks, 2)  # Repeated cards need a second deck
+    shoe = create_deck() * num_decks
+    size = rng.randint(1, FUZZ_MAX_HAND)
+    if kind == 'aces':
+        hand = [card for card in shoe if card.startswith('Ace ')]
+        hand = rng.sample(hand, rng.randint(1, len(hand)))
+    elif kind == 'wraparound':
+        # A stretch of one suit across King, Ace and 2, sometimes all thirteen cards and more
+        suit = rng.choice(suits)
+        length = rng.choice([3, 5, len(ranks), len(ranks)])
+        start = rng.randint(len(ranks) - length + 1, len(ranks) - 1) if length < len(ranks) else 0
+        hand = [f"{ranks[(start + i) % len(ranks)]} of {suit}" for i in range(length)]
+        size = max(size, len(hand) + rng.randint(0, 3))
+    elif kind == 'same rank':
+        chosen = rng.sample(ranks, rng.randint(1, 2))
+        hand = [card for card in shoe if card.split(' of ')[0] in chosen]
+        hand = rng.sample(hand, min(len(hand), rng.randint(2, FUZZ_MAX_SAME_RANK)))
+        size = len(hand) + rng.randint(0, 2)
+    elif kind == 'duplicates':
+        hand = [card for card in rng.sample(create_deck(), rng.randint(2, 5)) for _ in range(rng.randint(1, num_decks))]
+    elif kind == 'pick ups':
+        hand = [card for card in shoe if is_pickup_card(card)]
+        hand = rng.sample(hand, min(len(hand), rng.randint(1, FUZZ_MAX_PICKUP_CARDS)))
+    else:
+        hand = []
+    remaining = collections.Counter(shoe)
+    remaining.subtract(hand)
+    rest = list(remaining.elements())
+    hand += rng.sample(rest, min(len(rest), max(0, size - len(hand))))
+    rng.shuffle(hand)
+    return hand
+
+def fuzz_top_card(rng, hand):
+    # Half the time match a card in the hand, so there is something to play on
+    if hand and rng.random() < 0.5:
+        rank, suit = rng.choice(hand).split(' of ')
+        return rng.choice([f"{rank} of {rng.choice(suits)}", f"{rng.choice(ranks)} of {suit}"])
+    return rng.choice(CARD_NAMES)
+
+def fuzz_game_state(players, hands, setup):
+    game_state = GameState(list(players))
+    game_state.player_hands = {player: list(hand) for player, hand in zip(players, hands)}
+    game_state.direction, game_state.pick_up_stack, last_effect, missed = setup
+    game_state.last_effect = {"pick up": PICK_UP_TWO, "cover": COVER}.get(last_effect)
+    game_state.missed_turns.update(zip(players, missed))
+    return game_state
+
+def reference_game_state(players, hands, setup):
+    game_state = fuzz_game_state(players, hands, setup)
+    game_state.last_effect = setup[2]
+    return game_state
+
+def game_state_outcome(game_state, effect, top_card):
+    last_effect = REFERENCE_EFFECT_NAMES.get(game_state.last_effect, game_state.last_effect)
+    return (REFERENCE_EFFECT_NAMES.get(effect, effect), top_card, game_state.pick_up_stack, game_state.direction,
+            last_effect, getattr(game_state, 'cover_card', None),
+            tuple(game_state.missed_turns[player] for player in game_state.players))
+
+def playable_from(run, hand):
+    """Whether the hand holds enough copies of every card in ``run``."""
+    needed = collections.Counter(run.split(' - '))
+    needed.subtract(hand)
+    return max(needed.values()) <= 0
+
+class FuzzCheck:
+    """Timings, mismatches and intended differences for one reference/fast pair."""
+
+    def __init__(self, name):
+        self.name = name
+        self.checked = 0
+        self.mismatches = 0
+        self.known = 0
+        self.reference_seconds = 0.0
+        self.fast_seconds = 0.0
+        self.examples = []
+
+    def run(self, reference, fast, cases):
+        start = time.perf_counter()
+        expected = [reference(*case) for case in cases]
+        self.reference_seconds += time.perf_counter() - start
+        start = time.perf_counter()
+        actual = [fast(*case) for case in cases]
+        self.fast_seconds += time.perf_counter() - start
+        self.checked += len(cases)
+        return zip(cases, expected, actual)
+
+    def mismatch(self, description, expected, actual):
+        self.mismatches += 1
+        if len(self.examples) < FUZZ_EXAMPLES:
+            self.examples.append((description, expected, actual))
+
+    def summary(self):
+        return {'function': self.name, 'checked': self.checked, 'mismatches': self.mismatches, 'known': self.known,
+                'reference_seconds': self.reference_seconds, 'fast_seconds': self.fast_seconds,
+                'speedup': self.reference_seconds / self.fast_seconds if self.fast_seconds else 0.0,
+                'examples': self.examples}
+
+def describe_fuzz_case(hand, top_card):
+    return f"hand {', '.join(hand)} on {top_card}"
+
+def _fuzz_block(rng, cases, num_decks, checks):
+    hands = [fuzz_hand(rng, rng.choice(FUZZ_HAND_KINDS), num_decks) for _ in range(cases)]
+    singles_cases = [(hand, fuzz_top_card(rng, hand)) for hand in hands]
+
+    singles = checks['find_valid_single_cards']
+    for (hand, top_card), expected, actual in singles.run(reference_find_valid_single_cards,
+                                                         find_valid_single_cards, singles_cases):
+        if expected != actual:
+            singles.mismatch(describe_fuzz_case(hand, top_card), expected, actual)
+
+    run_cases = [(hand, top_card, reference_find_valid_single_cards(hand, top_card)) for hand, top_card in singles_cases]
+    runs = checks['find_valid_runs']
+    for (hand, top_card, _), expected, actual in runs.run(reference_find_valid_runs, find_valid_runs, run_cases):
+        unplayable = [run for run in expected if not playable_from(run, hand)]
+        expected = set(expected).difference(unplayable)
+        round_the_suit = [run for run in set(actual) - expected if len(set(run.split(' - '))) == len(ranks)]
+        runs.known += len(unplayable) + len(round_the_suit)
+        actual_runs = set(actual).difference(round_the_suit)
+        if expected != actual_runs or len(actual) != len(set(actual)):
+            runs.mismatch(describe_fuzz_case(hand, top_card), sorted(expected - actual_runs),
+                          sorted(actual_runs - expected))
+
+    pickups = checks['find_pickup_runs']
+    for (hand,), expected, actual in pickups.run(reference_find_pickup_runs, find_pickup_runs,
+                                                 [(hand,) for hand in hands]):
+        expected_runs = {tuple(sorted(run)) for run in expected}
+        actual_runs = [tuple(sorted(run)) for run in actual]
+        pickups.known += len(expected) - len(expected_runs)
+        if expected_runs != set(actual_runs) or len(actual_runs) != len(expected_runs):
+            pickups.mismatch(f"hand {', '.join(hand)}", sorted(expected_runs - set(actual_runs)),
+                             sorted(set(actual_runs) - expected_runs))
+
+    # Play a single card or one of the runs from each hand into a random table position
+    players = [AIPlayer(f"AI PLAYER {seat + 1}", 'medium') for seat in range(rng.randint(2, 5))]
+    effect_cases = []
+    for hand, top_card, valid_single_cards in run_cases:
+        valid_runs = [run.split(' - ') for run in find_valid_runs(hand, top_card, valid_single_cards)]
+        played = rng.choice(valid_runs) if valid_runs and rng.random() < 0.7 else [rng.choice(hand)]
+        seat = rng.randrange(len(players))
+        hands = [hand if i == seat else fuzz_hand(rng, 'random', num_decks) for i in range(len(players))]
+        setup = (rng.choice([1, -1]), rng.choice([0, 0, 2, 5, 7]), rng.choice([None, "pick up", "cover"]),
+                 [rng.randint(0, 1) for _ in players])
+        effect_cases.append((played, players[seat], hands, setup))
+
+    def reference(played, player, hands, setup):
+        game_state = reference_game_state(players, hands, setup)
+        choose = lambda chooser: chooser.choose_suit(game_state.player_hands[chooser])
+        return game_state_outcome(game_state, *reference_apply_run_effect(played, player, game_state, choose))
+
+    def fast(played, player, hands, setup):
+        game_state = fuzz_game_state(players, hands, setup)
+        return game_state_outcome(game_state, *apply_run_effect(played, player, game_state))
+
+    effects = checks['apply_run_effect']
+    for (played, player, hands, setup), expected, actual in effects.run(reference, fast, effect_cases):
+        if expected != actual:
+            effects.mismatch(f"{player} plays {' - '.join(played)} (direction, stack, last effect, missed: {setup})",
+                             expected, actual)
+
+def run_move_fuzz(cases=2000, seed=0, num_decks=1, rules=True):
+    """Compare the move generators and the effect resolver with their reference versions.
+
+    With ``rules`` every block of FUZZ_BLOCK_CASES cases after the first is
+    played under a random house rule as well as the default special cards.
+    """
+    rng = random.Random(seed)
+    checks = {name: FuzzCheck(name) for name in ('find_valid_single_cards', 'find_valid_runs',
+                                                 'find_pickup_runs', 'apply_run_effect')}
+    saved_special_cards = dict(special_cards)
+    try:
+        for block, first_case in enumerate(range(0, cases, FUZZ_BLOCK_CASES)):
+            assignments = DEFAULT_SPECIAL_CARDS
+            if rules and block:
+                assignments = sample_special_cards(1, rng, changes=rng.randint(1, 4))[0]
+            set_special_cards(assignments)
+            _fuzz_block(rng, min(FUZZ_BLOCK_CASES, cases - first_case), num_decks, checks)
+    finally:
+        set_special_cards(saved_special_cards)
+    return {'cases': cases, 'seed': seed, 'decks': num_decks,
+            'functions': [check.summary() for check in checks.values()]}
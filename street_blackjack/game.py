@@ -0,0 +1,968 @@
+"""The turn loop: human and AI turns, event bus consumers and play_game."""
+import random
+import collections
+import time
+import json
+import threading
+
+from .engine import (
+    CANCEL, CARD_IDS, CARD_SORT_KEYS, CHANGE_SUIT, COVER, DEBUG_FLAGS, EVENT_KINDS, GameSetup, GameState, MISS_A_TURN, Shoe, add_special_indicator,
+    card_effect, count_active_opponents, count_pickup_combinations, create_deck, deal_cards, debug_print_deck_size,
+    derive_seed, find_pickup_runs, find_valid_runs, find_valid_single_cards, has_pickup_card, is_cover_card, is_pickup_card,
+    move_probe, pacing, PICK_UP_FIVE, PICK_UP_TWO, publish_move, ranks, resolve_effects, REVERSE, special_cards, suits)
+from .ai import AIPlayer, BELIEF_DIFFICULTIES, BeliefTracker, solve_endgame
+from .stats import StreamingStat
+from .records import RecorderConsumer
+
+def draw_new_card(player, hand, deck):
+    from .render import print_boxed
+    if deck:
+        new_card = deck.draw()
+        hand.append(new_card)
+        
+        if isinstance(player, AIPlayer):
+            print_boxed(f"{player} drew 1 card.")
+        else:
+            print_boxed(f"{player} drew: {new_card}")
+    else:
+        print_boxed("The deck is empty. Cannot draw a new card.")
+
+def choose_new_suit(player, game_state, hand=None):
+    """Ask an AI or a human player which suit a Change Suit card names."""
+    if isinstance(player, AIPlayer):
+        try:
+            return player.choose_suit(game_state.player_hands[player])
+        except Exception as e:
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["cards"]:
+                print(f"DEBUG [CARDS]: Error in AI choose_suit: {str(e)}")
+            return player.rng.choice(suits)  # Choose a random suit as a fallback
+    return choose_suit_human(hand)
+
+def choose_suit_human(hand=None):
+    from .render import render_hand
+    if hand:
+        print(render_hand("CURRENT HAND:", hand))
+    print("Change Suit:")
+    for i, suit in enumerate(suits, 1):
+        print(f"{i}. {suit}")
+    while True:
+        choice = input("Choose suit: ")
+        print('-' * 73)
+        if choice.isdigit() and 1 <= int(choice) <= len(suits):
+            return suits[int(choice) - 1]
+        print("Invalid choice. Please enter a number from the menu.")
+        print('-' * 73)
+
+def apply_special_effect(played_cards, current_player, game_state, hand=None):
+    """Resolve a single card or a run and show what happened; returns (effect id or 0, new top card)."""
+    cards = [played_cards] if isinstance(played_cards, str) else played_cards
+    effect, new_top_card, events = resolve_effects(cards, current_player, game_state,
+                                                   lambda player: choose_new_suit(player, game_state, hand))
+    bus = game_state.bus
+    if bus.wants('effect'):
+        for event in events:
+            bus.publish('effect', game_state.turn, current_player, (event.card,), new_top_card, event)
+    return effect, new_top_card
+
+def apply_run_effect(played_cards, current_player, game_state):
+    return apply_special_effect(list(played_cards), current_player, game_state)
+
+def ai_turn_delay(seconds=3):
+    #print(f"Player turn complete.............")
+    #print('-' * 60)
+    pacing.sleep(seconds)
+        #print_boxed(f"{next_player} will miss {game_state.missed_turns[next_player]} turn(s).")
+        #print('-' * 73)
+    
+def play_turn(player_hands, deck, top_card, current_player, discard_pile, game_state):
+    if DEBUG_FLAGS["all"] or DEBUG_FLAGS["player"] or DEBUG_FLAGS["ai"]:
+        print(f"DEBUG [PLAYER/AI]: Entering play_turn function for {current_player}")
+        print('-' * 73)
+    if isinstance(current_player, AIPlayer):
+        return play_ai_turn(player_hands, deck, top_card, current_player, discard_pile, game_state)
+    from .render import display_player_hand, display_top_card, print_boxed, print_wrapped  # Only human turns need the UI
+    try:    
+        player_name = current_player if isinstance(current_player, str) else current_player.name
+        hand = player_hands[current_player]
+        
+        display_top_card(top_card)
+        display_player_hand(current_player, hand, is_ai=False, title_alignment='left')
+
+        valid_single_cards = find_valid_single_cards(hand, top_card)
+        valid_runs = find_valid_runs(hand, top_card, valid_single_cards)
+
+        if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+            print('-' * 73)
+            print_wrapped(f"DEBUG [PLAYER/AI]: Valid single cards for {current_player}: {valid_single_cards}\n")
+            print_wrapped(f"DEBUG [PLAYER/AI]: Valid runs for {current_player}: {valid_runs}")
+            print('-' * 73)
+
+        if game_state.pick_up_stack > 0:
+            pickup_runs = find_pickup_runs(hand)
+            single_pickup_cards = [card for card in hand if is_pickup_card(card)]
+            cancel_cards = [card for card in hand if card_effect(card) == CANCEL]
+
+            if pickup_runs or single_pickup_cards or cancel_cards:
+                while True:
+                    print(f"You must respond to the Pick Up effect. Current stack: {game_state.pick_up_stack}")
+                    print("1. Draw cards (Pick Up Stack)")
+                    if pickup_runs:
+                        print("2. Play a run of Pick Up cards")
+                    if single_pickup_cards or cancel_cards:
+                        print("3. Play a single Pick Up or Cancel card")
+                    action = input("Enter your choice: ")
+                    print('-' * 73)
+                    if action in ['1', '2', '3'] and (action != '2' or pickup_runs) and (action != '3' or (single_pickup_cards or cancel_cards)):
+                        break
+                    print("Invalid input. Please enter a valid option.")
+                    print('-' * 73)
+            else:
+                action = '1'
+
+            if action == '1':
+                drawn_cards = []
+                for _ in range(game_state.pick_up_stack):
+                    if deck:
+                        card_drawn = deck.draw()
+                        hand.append(card_drawn)
+                        drawn_cards.append(card_drawn)
+                    else:
+                        print("The deck is empty. Cannot pick up more cards.")
+                        break
+                
+                if drawn_cards:
+                    card_list = ", ".join(drawn_cards)
+                    print_boxed(f"{current_player} drew {len(drawn_cards)} cards:\n{card_list}")
+                else:
+                    print_boxed(f"{current_player} couldn't draw any cards.")
+                
+                print('-' * 73)
+                game_state.pick_up_stack = 0
+                return top_card, "draw", False
+
+            elif action == '2':  # Play a run of Pick Up cards
+                while True:
+                    print("Choose a run to play:")
+                    for i, run in enumerate(pickup_runs, 1):
+                        run_str = " -> ".join([add_special_indicator(card) for card in run])
+                        print(f"{i}. {run_str}")
+                    run_choice = input("Enter your choice: ")
+                    print('-' * 73)
+                    if run_choice.isdigit() and 1 <= int(run_choice) <= len(pickup_runs):
+                        chosen_run = pickup_runs[int(run_choice) - 1]
+                        break
+                    print("Invalid choice. Please enter a number from the list.")
+                    print('-' * 73)
+
+                game_state.last_played = list(chosen_run)
+                for card in chosen_run:
+                    hand.remove(card)
+                    effect, new_top_card = apply_special_effect(card, current_player, game_state, hand)
+
+                discard_pile.extend(chosen_run[:-1])  # Only the last card stays on top
+
+                run_str = " -> ".join([add_special_indicator(card) for card in chosen_run])
+                print_boxed(f"{current_player} played a run:\n{run_str}")
+                print("-------------------------------------------------------------------------")
+
+                if len(hand) == 0:
+                    game_state.set_potential_winner(current_player)
+                    print(f"{current_player} played their last card(s). The next player must respond or {current_player} wins.")
+
+                return new_top_card, "run", False
+
+            elif action == '3':  # Play a single Pick Up or Cancel card
+                playable_cards = single_pickup_cards + cancel_cards
+                while True:
+                    print("Choose a card to play:")
+                    for i, card in enumerate(playable_cards, 1):
+                        print(f"{i}. {add_special_indicator(card)}")
+                    card_choice = input("Enter your choice: ")
+                    print('-' * 73)
+                    if card_choice.isdigit() and 1 <= int(card_choice) <= len(playable_cards):
+                        chosen_card = playable_cards[int(card_choice) - 1]
+                        break
+                    print("Invalid choice. Please enter a number from the list.")
+                    print('-' * 73)
+
+                hand.remove(chosen_card)
+                game_state.last_played = [chosen_card]
+                print_boxed(f"{current_player} played:\n{add_special_indicator(chosen_card)}")
+                print("-------------------------------------------------------------------------")
+                effect, new_top_card = apply_special_effect(chosen_card, current_player, game_state, hand)
+
+                if effect == CANCEL:
+                    game_state.pick_up_stack = 0
+                elif len(hand) == 0:
+                    game_state.set_potential_winner(current_player)
+                    print(f"{current_player} played their last card. The next player must respond or {current_player} wins.")
+
+                return new_top_card, "single", False
+
+        while True:  # Main loop for action selection
+            if not valid_single_cards and not valid_runs:
+                if not deck:
+                    print_boxed("The deck is empty. Skipping turn.")
+                    return top_card, "skip", False
+                
+                card_drawn = deck.draw()
+                hand.append(card_drawn)
+                print_boxed("No valid cards or runs to play. You have drawn 1 card.")
+                print("-------------------------------------------------------------------------")
+                print_boxed(f"Card drawn: {card_drawn}")
+                print('-' * 73)
+                return top_card, "draw", False
+
+            print("AVAILABLE ACTIONS:")
+            if valid_single_cards:
+                print("1. Play a single card")
+            if valid_runs:
+                print("2. Play a run")
+            print("3. Draw from the deck")
+            print('-' * 73)
+            action = input("Enter the number of your choice: ")
+            print('-' * 73)
+            if action not in ['1', '2', '3']:
+                print("Invalid action. Please choose a valid option.")
+                print('-' * 73)
+                continue
+
+            if action == '1':
+                if not valid_single_cards:
+                    print_boxed(f"No valid single cards to play. {current_player} will draw a card.")
+                    continue
+                
+                while True:
+                    print("VALID SINGLE CARDS:")
+                    for idx, card in enumerate(valid_single_cards, start=1):
+                        print(f"{idx}. {add_special_indicator(card)}")
+                    print('-' * 73)
+                    choice = input("Choose a card to play (or 0 to go back): ")
+                    print('-' * 73)
+                    if choice == '0':
+                        break
+                    try:
+                        card_index = int(choice) - 1
+                        if 0 <= card_index < len(valid_single_cards):
+                            break
+                        else:
+                            print(f"Invalid card number. Please try again.")
+                            print('-' * 73)
+                    except ValueError:
+                        print("Invalid input. Please enter a number.")
+                
+                if choice == '0':
+                    continue  # Go back to main action selection
+
+                played_card = valid_single_cards[card_index]
+                if played_card not in hand:
+                    print(f"Error: {played_card} not in {current_player}'s hand!")
+                    return top_card, "error", False
+                hand.remove(played_card)
+                game_state.last_played = [played_card]
+                print_boxed(f"{current_player} played:\n {add_special_indicator(played_card)}")
+                print("-------------------------------------------------------------------------")
+                    
+                effect, new_top_card = apply_special_effect(played_card, current_player, game_state, hand)
+                
+                if len(hand) == 0:
+                    if card_effect(played_card) == MISS_A_TURN:
+                        if count_active_opponents(game_state) > 1:
+                            print_boxed(f"{current_player} has won the game!")
+                            pacing.confirm()
+                            return new_top_card, "win", False
+                        else:
+                            draw_new_card(current_player, hand, deck)
+                            print_boxed(f"{current_player} played a 'Miss a Turn' card as their last card, but must draw a new card as only one opponent remains.")
+                            pacing.confirm()
+                            return new_top_card, "continue", False
+                    elif is_pickup_card(played_card):
+                        game_state.set_potential_winner(current_player)
+                        print_boxed(f"{current_player} played their last card (Pick Up). The next player must respond or {current_player} wins.")
+                        pacing.confirm()
+                        return new_top_card, "pick up last", False
+                    elif is_cover_card(played_card):
+                        print_boxed(f"{current_player} played their last card (Cover), but must draw a new card.")
+                        pacing.confirm()
+                        draw_new_card(current_player, hand, deck)
+                        return new_top_card, "single", False
+                    else:
+                        print_boxed(f"{current_player} has won the game!")
+                        pacing.confirm()
+                        return new_top_card, "win", False
+                        
+                return new_top_card, "single", effect == COVER
+
+            elif action == '2':
+                if not valid_runs:
+                    print(f"No valid runs to play.")
+                    print('-' * 73)
+                    continue
+                
+                while True:
+                    print("VALID RUNS:")
+                    for idx, run in enumerate(valid_runs, start=1):
+                        cards_in_run = run.split(' - ')
+                        cards_with_indicators = [add_special_indicator(card) for card in cards_in_run]
+                        print(f"{idx}. {' -> '.join(cards_with_indicators)}")
+                    print('-' * 73)
+                    choice = input("Choose a run to play (or 0 to go back): ")
+                    print('-' * 73)
+                    if choice == '0':
+                        break
+                    try:
+                        run_index = int(choice) - 1
+                        if 0 <= run_index < len(valid_runs):
+                            break
+                        else:
+                            print(f"Invalid run number. Please try again.")
+                    except ValueError:
+                        print("Invalid input. Please enter a number.")
+                
+                if choice == '0':
+                    continue  # Go back to main action selection
+
+                played_run = valid_runs[run_index].split(' - ')
+
+                missing_cards = [card for card in played_run if card not in hand]
+                if missing_cards:
+                    print(f"Error: The following cards are not in your hand: {', '.join(missing_cards)}")
+                    print("Please try again.")
+                    print('-' * 73)
+                    continue
+                
+                for card in played_run:
+                    hand.remove(card)
+                game_state.last_played = played_run
+                    
+                played_run_with_indicators = ' - '.join([add_special_indicator(card) for card in played_run])
+                print_boxed(f"{current_player} played:\n {played_run_with_indicators}")
+                print("-------------------------------------------------------------------------")
+                
+                # Add all cards in the run (except the last card) to the discard pile
+                discard_pile.extend(played_run[:-1])
+                
+                last_card = played_run[-1]
+                effect, new_top_card = apply_special_effect(played_run, current_player, game_state)
+                
+                if len(hand) == 0:
+                    print_boxed(f"{current_player} has won the game!")
+                    pacing.confirm()
+                    return new_top_card, "win", False
+                
+                return new_top_card, "run", effect == COVER
+
+            elif action == '3':
+                if not deck:
+                    print_boxed("The deck is empty. Reshuffling discarded cards.")
+                    if not discard_pile:
+                        print("No cards to reshuffle. Skipping draw.")
+                        return top_card, "skip", False
+                    deck.extend(discard_pile)  # The shoe draws at random, so no shuffle is needed
+                    discard_pile.clear()
+
+                if deck:
+                    card_drawn = deck.draw()
+                    hand.append(card_drawn)
+                    message = f"{current_player} drew 1 card from deck. - {card_drawn}"
+                else:
+                    message = f"{current_player} attempted to draw, but the deck is empty."
+            
+                print_boxed(message)
+                print('-' * 73)
+                    
+                return top_card, "draw", False
+
+        # This part should never be reached, but just in case:
+        print("Unexpected end of turn reached.")
+        return top_card, "error", False
+
+    except Exception as e:
+        print(f"An error occurred in play_turn: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return top_card, "error", False
+    
+TurnEvent = collections.namedtuple('TurnEvent', 'kind player cards count top_card')
+
+def play_ai_turn(player_hands, deck, top_card, ai_player, discard_pile, game_state):
+    """AI counterpart of play_turn: decides on card ids and emits TurnEvents instead of printing."""
+    hand = player_hands[ai_player]
+    emit = game_state.emit
+    emit(TurnEvent('turn', ai_player, (), len(hand), top_card))
+
+    if game_state.pick_up_stack > 0:
+        pickup_cards = [card for card in hand if is_pickup_card(card)]
+        cancel_cards = [card for card in hand if card_effect(card) == CANCEL]
+        response, chosen = ai_player.respond_to_pick_up(hand, game_state.pick_up_stack, pickup_cards, cancel_cards)
+        if response == 'run':
+            chosen_run = list(chosen)
+            game_state.last_played = list(chosen_run)
+            for card in chosen_run:
+                hand.remove(card)
+                ai_player.update_card_count(card)
+                effect, new_top_card = apply_special_effect(card, ai_player, game_state, hand)
+            discard_pile.extend(chosen_run[:-1])  # Only the last card stays on top
+            emit(TurnEvent('run', ai_player, tuple(CARD_IDS[card] for card in chosen_run), len(hand), new_top_card))
+            if not hand:
+                game_state.set_potential_winner(ai_player)
+                emit(TurnEvent('pick up last', ai_player, (), 0, new_top_card))
+            return new_top_card, "run", False
+
+        if response == 'single':
+            chosen_card = chosen
+            hand.remove(chosen_card)
+            ai_player.update_card_count(chosen_card)
+            game_state.last_played = [chosen_card]
+            emit(TurnEvent('single', ai_player, (CARD_IDS[chosen_card],), len(hand), top_card))
+            effect, new_top_card = apply_special_effect(chosen_card, ai_player, game_state, hand)
+            if effect == CANCEL:
+                game_state.pick_up_stack = 0
+            elif not hand:
+                game_state.set_potential_winner(ai_player)
+                emit(TurnEvent('pick up last', ai_player, (), 0, new_top_card))
+            return new_top_card, "single", False
+
+        drawn_cards = [deck.draw() for _ in range(min(game_state.pick_up_stack, len(deck)))]
+        hand.extend(drawn_cards)
+        emit(TurnEvent('pick up', ai_player, tuple(CARD_IDS[card] for card in drawn_cards), len(drawn_cards), top_card))
+        game_state.pick_up_stack = 0
+        return top_card, "draw", False
+
+    planned = game_state.speculation.take(ai_player, hand, top_card) if game_state.speculation else None
+    if planned:
+        valid_single_cards, valid_runs = planned
+    else:
+        valid_single_cards = find_valid_single_cards(hand, top_card)
+        valid_runs = find_valid_runs(hand, top_card, valid_single_cards)
+    action, choice = ai_player.play_turn(hand, top_card, valid_single_cards, valid_runs,
+                                         num_opponents=count_active_opponents(game_state))
+    if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+        print(f"DEBUG [AI]: {ai_player} chose action {action} with choice {choice}")
+
+    if action == 1 and valid_single_cards:
+        played_card = valid_single_cards[choice - 1]
+        hand.remove(played_card)
+        ai_player.update_card_count(played_card)
+        game_state.last_played = [played_card]
+        emit(TurnEvent('single', ai_player, (CARD_IDS[played_card],), len(hand), top_card))
+        effect, new_top_card = apply_special_effect(played_card, ai_player, game_state, hand)
+
+        if hand:
+            return new_top_card, "single", effect == COVER
+        played_effect = card_effect(played_card)
+        if played_effect == MISS_A_TURN and count_active_opponents(game_state) <= 1 or played_effect == COVER:
+            drawn = (deck.draw(),) if deck else ()
+            hand.extend(drawn)
+            emit(TurnEvent('last card draw', ai_player, tuple(CARD_IDS[card] for card in drawn), len(drawn), new_top_card))
+            return new_top_card, ("continue" if played_effect == MISS_A_TURN else "single"), False
+        if is_pickup_card(played_card):
+            game_state.set_potential_winner(ai_player)
+            emit(TurnEvent('pick up last', ai_player, (), 0, new_top_card))
+            return new_top_card, "pick up last", False
+        emit(TurnEvent('win', ai_player, (), 0, new_top_card))
+        return new_top_card, "win", False
+
+    if action == 2 and valid_runs:
+        played_run = valid_runs[choice - 1].split(' - ')
+        for card in played_run:
+            hand.remove(card)
+            ai_player.update_card_count(card)
+        game_state.last_played = played_run
+        emit(TurnEvent('run', ai_player, tuple(CARD_IDS[card] for card in played_run), len(hand), top_card))
+        discard_pile.extend(played_run[:-1])
+        effect, new_top_card = apply_special_effect(played_run, ai_player, game_state)
+        if not hand:
+            emit(TurnEvent('win', ai_player, (), 0, new_top_card))
+            return new_top_card, "win", False
+        return new_top_card, "run", effect == COVER
+
+    if not deck:
+        if not discard_pile:
+            emit(TurnEvent('skip', ai_player, (), 0, top_card))
+            return top_card, "skip", False
+        emit(TurnEvent('reshuffle', ai_player, (), len(discard_pile), top_card))
+        deck.extend(discard_pile)
+        discard_pile.clear()
+    card_drawn = deck.draw()
+    hand.append(card_drawn)
+    emit(TurnEvent('draw', ai_player, (CARD_IDS[card_drawn],), 1, top_card))
+    return top_card, "draw", False
+
+class StatsCollector:
+    """Fills play_game's per-player stats: cards drawn, single cards and runs played, and the longest run."""
+
+    def subscribe(self, bus):
+        bus.subscribe('deal', self.on_deal)
+        bus.subscribe('move', self.on_move)
+
+    def on_deal(self, event):
+        self.stats = event.value.stats
+
+    def on_move(self, event):
+        player_stats = self.stats[event.player]
+        move = event.value
+        if move.action == "draw":
+            player_stats["cards_drawn"] += 1
+        elif move.action == "single":
+            player_stats["single_cards_played"] += 1
+        elif move.action == "run":
+            player_stats["runs_played"] += 1
+        if len(move.played) > 1:  # Winning runs and Pick Up runs count towards the longest run too
+            player_stats["longest_run"] = max(player_stats["longest_run"], len(move.played))
+
+class OpponentModelKeeper:
+    """Updates the opponent model the AIs of a game share, once per move."""
+
+    def subscribe(self, bus):
+        bus.subscribe('deal', self.on_deal)
+        bus.subscribe('move', self.on_move)
+
+    def on_deal(self, event):
+        self.keeper = next(iter(event.value.game_state.ai_players.values()), None)
+        self.hands = event.value.game_state.player_hands
+
+    def on_move(self, event):
+        if self.keeper and event.value.action not in ("win", "pick up last"):
+            self.keeper.update_player_model(event.player, event.value.action, len(self.hands[event.player]))
+
+class DifficultyAdjuster:
+    """Lets every AI of a game adjust its difficulty once the game has a winner."""
+
+    def subscribe(self, bus):
+        bus.subscribe('deal', self.on_deal)
+        bus.subscribe('win', self.on_win)
+
+    def on_deal(self, event):
+        self.ai_players = list(event.value.game_state.ai_players.values())
+
+    def on_win(self, event):
+        if event.player is not None:
+            for ai in self.ai_players:
+                ai.adjust_difficulty('lose' if ai != event.player else 'win')
+
+class BeliefKeeper:
+    """Gives every hard and adaptive AI of a game a BeliefTracker over its opponents' hands.
+
+    The trackers cost many times what the rest of a hard AI's turn does, so
+    games only keep them when asked to: interactive games do, through
+    default_consumers, while series, sweeps and simulations play hard AIs on
+    their heuristics alone. Each tracker samples from a generator of its own,
+    seeded from the game's seed and the AI's name.
+    """
+
+    def subscribe(self, bus):
+        self.bus = bus
+        bus.subscribe('deal', self.on_deal)
+
+    def on_deal(self, event):
+        setup = event.value
+        game_state = setup.game_state
+        for ai_player in game_state.ai_players.values():
+            if ai_player.difficulty in BELIEF_DIFFICULTIES:
+                rng = random.Random(derive_seed(game_state.seed, ai_player.name) if game_state.seed is not None else None)
+                ai_player.beliefs = BeliefTracker(ai_player, game_state, game_state.player_hands[ai_player],
+                                                  event.top_card, len(setup.deck), setup.num_decks, rng=rng)
+                ai_player.beliefs.subscribe(self.bus)
+
+class EventProfiler:
+    """Counts events by kind and times each play_turn call, from its 'turn' or previous 'move' event."""
+
+    def __init__(self, kinds=EVENT_KINDS):
+        self.kinds = kinds
+        self.counts = collections.Counter()
+        self.move_seconds = StreamingStat()
+        self.started = None
+
+    def subscribe(self, bus):
+        for kind in self.kinds:
+            bus.subscribe(kind, self.on_event)
+
+    def on_event(self, event):
+        self.counts[event.kind] += 1
+        if event.kind == 'turn':
+            self.started = time.perf_counter()
+        elif event.kind == 'move' and self.started is not None:
+            now = time.perf_counter()
+            self.move_seconds.add(now - self.started)
+            self.started = now
+
+BRANCHING_TIME_THRESHOLD = 0.5  # Seconds an AI may spend on one play_turn call before its position is dumped
+BRANCHING_COUNT_THRESHOLD = 5000  # Runs generated or Pick Up combinations listed before a position is dumped
+BRANCHING_METRICS = ['hand_size', 'single_cards', 'runs_generated', 'runs', 'pickup_combinations', 'pickup_runs',
+                     'search_runs_generated', 'milliseconds']
+
+class BranchingProfiler:
+    """Measures every play_turn call: hand size, valid single cards, runs generated before and after dedup,
+    Pick Up combinations, the runs generated by look-ahead (the endgame search) and the time taken.
+
+    ``game`` holds this game's histograms (complete once the game is won)
+    and ``totals`` those of every game so far. Positions that take longer
+    than ``time_threshold`` seconds (AI turns only, as a human turn includes
+    thinking time) or generate more than ``count_threshold`` runs or Pick
+    Up combinations are appended to ``dump_path`` as JSON lines, each a
+    standalone case for simulation.run_position_benchmark.
+    """
+
+    def __init__(self, dump_path=None, time_threshold=BRANCHING_TIME_THRESHOLD, count_threshold=BRANCHING_COUNT_THRESHOLD):
+        self.dump_path = dump_path
+        self.time_threshold = time_threshold
+        self.count_threshold = count_threshold
+        self.totals = {metric: StreamingStat(bin_width=0.1 if metric == 'milliseconds' else 1) for metric in BRANCHING_METRICS}
+        self.game = None
+        self.dumped = []
+        self.dumped_positions = set()
+
+    def subscribe(self, bus):
+        bus.subscribe('deal', self.on_deal)
+        bus.subscribe('turn', self.on_turn)
+        bus.subscribe('move', self.on_move)
+        bus.subscribe('win', self.on_win)
+
+    def on_deal(self, event):
+        setup = event.value
+        self.game_state, self.num_decks, self.seed = setup.game_state, setup.num_decks, setup.seed
+        self.game = {metric: StreamingStat(bin_width=stat.bin_width) for metric, stat in self.totals.items()}
+        move_probe.active = True
+
+    def on_turn(self, event):
+        self.start(event.player, event.top_card)
+
+    def start(self, player, top_card):
+        self.hand = list(self.game_state.player_hands[player])
+        self.top_card = top_card
+        self.pick_up_stack = self.game_state.pick_up_stack
+        self.num_opponents = count_active_opponents(self.game_state)
+        move_probe.reset()
+        self.started = time.perf_counter()
+
+    def on_move(self, event):
+        seconds = time.perf_counter() - self.started
+        pickup_combinations, pickup_runs = count_pickup_combinations(self.hand) if self.pick_up_stack else (0, 0)
+        measured = {
+            'hand_size': len(self.hand),
+            'single_cards': len(find_valid_single_cards(self.hand, self.top_card)),
+            'runs_generated': move_probe.runs_generated or 0,
+            'runs': move_probe.runs or 0,
+            'pickup_combinations': pickup_combinations,
+            'pickup_runs': pickup_runs,
+            'search_runs_generated': move_probe.search_runs_generated,
+            'milliseconds': seconds * 1000,
+        }
+        for metric, value in measured.items():
+            self.game[metric].add(value)
+
+        is_ai = isinstance(event.player, AIPlayer)
+        reasons = []
+        if is_ai and seconds > self.time_threshold:
+            reasons.append(f"took {seconds:.2f}s")
+        if max(measured['runs_generated'], pickup_combinations) > self.count_threshold:
+            reasons.append(f"generated {max(measured['runs_generated'], pickup_combinations)} moves")
+        if reasons:
+            self.dump(event, reasons, measured, event.player.difficulty if is_ai else 'human')
+        if event.value.play_again:
+            self.start(event.player, event.top_card)
+
+    def dump(self, event, reasons, measured, difficulty):
+        position = (difficulty, tuple(sorted(self.hand)), self.top_card, self.pick_up_stack)
+        if position in self.dumped_positions:
+            return
+        self.dumped_positions.add(position)
+        case = {"reason": ", ".join(reasons), "difficulty": difficulty, "hand": self.hand, "top_card": self.top_card,
+                "pick_up_stack": self.pick_up_stack, "num_opponents": self.num_opponents, "num_decks": self.num_decks,
+                "special_cards": dict(special_cards), "seed": self.seed, "turn": event.turn, "measured": measured}
+        self.dumped.append(case)
+        if self.dump_path:
+            with open(self.dump_path, 'a') as f:
+                f.write(json.dumps(case) + '\n')
+
+    def on_win(self, event):
+        move_probe.active = False
+        for metric, stat in self.game.items():
+            self.totals[metric].merge(stat)
+
+class SpeculativePlanner:
+    """Works out the next AI's moves on a background thread while a human is deciding.
+
+    When a human's turn starts, every top card the human could leave (the
+    current one after a draw, each playable card, the last card of each
+    run, every suit a Change Suit card could name) is paired with the AI
+    seat that would move next after it (a Reverse or Miss a Turn card moves
+    that seat). For each pair the thread lists the AI's valid single cards
+    and runs and, for an AI in its endgame, solves the position into the
+    shared endgame table. Positions that would hand the AI a Pick Up stack
+    or let the human play again are left out. play_ai_turn takes the lists
+    when the real position matches and AIPlayer.play_turn finds the solved
+    decision in the table; anything else is worked out as usual. The thread
+    only reads the snapshots it was given and never draws from the game's
+    random generator, so games play out exactly as they would without it.
+    """
+
+    def __init__(self):
+        self.thread = None
+        self.cancelled = threading.Event()
+        self.moves = {}
+        self.working_on = None
+
+    def subscribe(self, bus):
+        bus.subscribe('deal', self.on_deal)
+        bus.subscribe('turn', self.on_turn)
+        bus.subscribe('move', self.on_move)
+        bus.subscribe('win', self.on_win)
+
+    def on_deal(self, event):
+        self.game_state = event.value.game_state
+        self.game_state.speculation = self
+        self.moves = {}
+
+    def on_turn(self, event):
+        human = event.player
+        game_state = self.game_state
+        if isinstance(human, AIPlayer) or not game_state.ai_players:
+            return
+        self.stop()
+        next_seats = {None: game_state.player_after(human), REVERSE: game_state.ring.step(human, -game_state.direction),
+                      MISS_A_TURN: game_state.player_after(human, 2)}
+        # Snapshots taken on this thread, so the background thread never reads live game state
+        seats = {effect: (player, tuple(game_state.player_hands[player])) for effect, player in next_seats.items()
+                 if isinstance(player, AIPlayer) and not game_state.missed_turns[player]}
+        if not seats:
+            return
+        self.moves = {}
+        self.cancelled.clear()
+        self.thread = threading.Thread(target=self.speculate, daemon=True,
+                                       args=(tuple(game_state.player_hands[human]), event.top_card, seats,
+                                             count_active_opponents(game_state)))
+        self.thread.start()
+
+    def on_move(self, event):
+        if not isinstance(event.player, AIPlayer):
+            self.cancelled.set()  # The human has decided; whatever is finished stays usable
+
+    def on_win(self, event):
+        self.stop()
+        self.moves = {}
+
+    def stop(self):
+        self.cancelled.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+
+    def outcomes(self, human_hand, top_card):
+        """(top card the human leaves, effect that decides who moves next), most likely first."""
+        singles = find_valid_single_cards(list(human_hand), top_card)
+        plays = [top_card] + singles + [run.split(' - ')[-1] for run in find_valid_runs(list(human_hand), top_card, singles)]
+        for card in dict.fromkeys(plays):
+            effect = card_effect(card) if card != top_card else 0
+            if effect in (PICK_UP_TWO, PICK_UP_FIVE, COVER):
+                continue
+            if effect == CHANGE_SUIT:
+                rank = ranks[CARD_SORT_KEYS[card][0]]
+                for suit in suits:
+                    yield f"{rank} of {suit}", None
+            else:
+                yield card, effect if effect in (REVERSE, MISS_A_TURN) else None
+
+    def speculate(self, human_hand, top_card, seats, num_opponents):
+        try:
+            for new_top_card, effect in self.outcomes(human_hand, top_card):
+                if effect not in seats:
+                    continue
+                ai_player, hand = seats[effect]
+                key = (ai_player.name, hand, new_top_card)
+                if self.cancelled.is_set():
+                    return
+                if key in self.moves:
+                    continue
+                self.working_on = key
+                valid_single_cards = find_valid_single_cards(list(hand), new_top_card)
+                valid_runs = find_valid_runs(list(hand), new_top_card, valid_single_cards)
+                if ai_player.solves_endgame(hand) and (valid_single_cards or valid_runs):
+                    solve_endgame(list(hand), new_top_card, valid_single_cards, valid_runs, num_opponents)
+                self.moves[key] = (valid_single_cards, valid_runs)
+        except Exception as e:
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                print(f"DEBUG [AI]: Speculative move generation failed: {str(e)}")
+        finally:
+            self.working_on = None
+
+    def take(self, ai_player, hand, top_card):
+        """The (valid single cards, valid runs) worked out for this exact position, or None."""
+        key = (ai_player.name, tuple(hand), top_card)
+        thread = self.thread
+        if key not in self.moves and thread and self.working_on == key:
+            thread.join()  # Already cancelled, so it stops as soon as this position is done
+        return self.moves.pop(key, None)
+
+def default_consumers(beliefs=True):
+    """What an interactive game subscribes on top of the table renderer; batch runs leave out the belief trackers."""
+    consumers = [StatsCollector(), OpponentModelKeeper(), DifficultyAdjuster(), SpeculativePlanner()]
+    if beliefs:
+        consumers.append(BeliefKeeper())
+    return consumers
+
+def show_turn_event(event):
+    """The default event_handler: render an AI turn, loading the terminal UI on first use."""
+    from .render import display_turn_event
+    display_turn_event(event)
+
+def play_game(num_real_players, num_bot_players, num_decks, cards_per_player, ai_difficulties, seed=None, recorder=None,
+              event_handler=show_turn_event, max_turns=None, ai_players=None, consumers=()):
+    """Play one game; returns (winner or None, turns, per-player stats).
+
+    Only the consumers asked for subscribe to the game's event bus: the table
+    renderer when there is an event_handler, the recorder, and ``consumers``
+    (StatsCollector, BeliefKeeper and friends). The stats dict is filled in
+    only when a StatsCollector is among them.
+
+    The game draws every random number from generators of its own, seeded
+    from ``seed`` (one for the AIs' decisions, one for the cards), and never
+    from the global ``random`` module, so games run side by side in threads
+    are each reproducible.
+    """
+    rng = random.Random(seed)  # The AIs' decisions
+    # The cards come from a stream of their own, so AI choices don't change them
+    deck_rng = random.Random(derive_seed(seed, 'deck') if seed is not None else None)
+    deck = Shoe(create_deck() * num_decks, rng=deck_rng)
+    num_players = num_real_players + num_bot_players
+    
+    players = [f'PLAYER {i+1}' for i in range(num_real_players)]
+    prebuilt_players = ai_players or {}  # e.g. external bots, keyed by seat name
+    ai_players = {}
+    for i in range(num_bot_players):
+        ai_player_name = f'AI PLAYER {i+1}'
+        ai_player = prebuilt_players.get(ai_player_name)
+        if ai_player is None:
+            ai_player = AIPlayer(ai_player_name, ai_difficulties[ai_player_name])
+        ai_player.rng = rng
+        ai_players[ai_player_name] = ai_player
+        players.append(ai_player)  # Append the AIPlayer object, not a string
+    # Every AI sees the same public actions, so they share one opponent model
+    # and the per-turn update costs the same at any table size
+    shared_model = collections.defaultdict(lambda: collections.defaultdict(int))
+    for ai_player in ai_players.values():
+        ai_player.player_model = shared_model
+    
+    player_hands, deck = deal_cards(deck, players, cards_per_player)
+    top_card = deck.draw()
+    discard_pile = []
+    
+    game_state = GameState(players)
+    game_state.player_hands = player_hands
+    game_state.event_handler = event_handler
+    game_state.seed = seed
+    bus = game_state.bus
+    if event_handler:
+        from .render import TableRenderer
+        TableRenderer().subscribe(bus)
+    if recorder:
+        RecorderConsumer(recorder).subscribe(bus)
+    for ai_player in ai_players.values():
+        ai_player.beliefs = None  # A BeliefKeeper among the consumers sets them up at the deal
+    for consumer in consumers:
+        consumer.subscribe(bus)
+    
+    turn_count = 1
+    stats = {player: {"cards_drawn": 0, "runs_played": 0, "single_cards_played": 0, "longest_run": 0} for player in players}
+    bus.publish('deal', turn_count, None, top_card=top_card,
+                value=GameSetup(game_state, stats, deck, discard_pile, seed or 0, num_decks, cards_per_player))
+    
+    while True:
+        for _ in range(num_players):
+            # Check if the deck needs reshuffling (and there is anything to put back)
+            if len(deck) <= 18 and discard_pile:
+                reshuffled = tuple(discard_pile)
+                deck.extend(discard_pile)  # The top card is never in the discard pile, so it stays out
+                discard_pile.clear()
+                bus.publish('reshuffle', turn_count, None, reshuffled, top_card, 'between turns')
+                if DEBUG_FLAGS["all"] or DEBUG_FLAGS["game"]:
+                    print(f"DEBUG [GAME]: Reshuffled. New deck size: {len(deck)}")
+                    print('-' * 73)
+
+            current_player = game_state.current_player
+            is_ai_player = isinstance(current_player, AIPlayer)
+
+            # Check for pending Pick Up win condition
+            if game_state.has_potential_winner():
+                potential_winner = game_state.get_potential_winner()
+                if current_player == potential_winner:
+                    bus.publish('win', turn_count, potential_winner, top_card=top_card, value='pick up last')
+                    return potential_winner, turn_count, stats
+                elif not has_pickup_card(player_hands[current_player]):
+                    bus.publish('miss-turn', turn_count, current_player, top_card=top_card, value='no pick up')
+                    game_state.next_player()
+                    continue
+                else:
+                    game_state.clear_potential_winner()
+            
+            bus.publish('turn', turn_count, current_player, top_card=top_card)
+            
+            if DEBUG_FLAGS["all"] or DEBUG_FLAGS["game"]:
+                debug_print_deck_size(deck, discard_pile)
+            
+            play_again = True
+            while play_again:
+                if DEBUG_FLAGS["all"] or DEBUG_FLAGS["ai"]:
+                    print(f"DEBUG [AI]: Current player: {current_player}, Is AI: {is_ai_player}")
+                
+                hand_size_before = len(player_hands[current_player])
+                pick_up_stack_before = game_state.pick_up_stack
+                discard_size_before = len(discard_pile)
+                game_state.last_played = None
+                game_state.turn_events.clear()
+                result = play_turn(
+                    player_hands, 
+                    deck, 
+                    top_card, 
+                    current_player, 
+                    discard_pile, 
+                    game_state
+                )
+                
+                if result is None:
+                    print(f"DEBUG: play_turn returned None for {current_player}")
+                    continue
+
+                new_top_card, action_taken, play_again = result
+                game_state.update_hand_status(current_player)
+                publish_move(bus, game_state, current_player, action_taken, play_again, top_card, new_top_card,
+                             hand_size_before, pick_up_stack_before, len(discard_pile) < discard_size_before)
+
+                if action_taken == "win":
+                    bus.publish('win', turn_count, current_player, top_card=new_top_card or top_card, value='win')
+                    return current_player, turn_count, stats
+
+                if new_top_card is None:
+                    bus.publish('win', turn_count, None, top_card=top_card, value='no cards')
+                    return None, turn_count, stats
+                
+                if new_top_card != top_card:
+                    discard_pile.append(top_card)
+                    top_card = new_top_card
+
+                if action_taken == "pick up last":
+                    game_state.set_potential_winner(current_player)
+                    break  # Exit the play_again loop to move to the next player
+
+                if action_taken == "cover":
+                    play_again = True
+                    continue
+                
+                # Check for win condition
+                if len(player_hands[current_player]) == 0:
+                    bus.publish('win', turn_count, current_player, top_card=top_card, value='win')
+                    return current_player, turn_count, stats
+            
+            if not play_again:
+                pacing.end_turn()  # Prompt, wait or carry straight on, depending on the pacing mode
+                game_state.next_player()
+                turn_count += 1
+                game_state.turn = turn_count
+                if max_turns and turn_count > max_turns:
+                    bus.publish('win', max_turns, None, top_card=top_card, value='turn limit')
+                    return None, max_turns, stats
+        
+        bus.publish('round', turn_count, None, top_card=top_card)
+
+    return None, turn_count, stats
@@ -0,0 +1,699 @@
+"""The terminal UI: boxed text, hands, turn events and reports."""
+import sys
+import collections
+
+from .engine import (
+    CANCEL, CHANGE_SUIT, DEBUG_FLAGS, EFFECT_NAMES, PICK_UP_FIVE, PICK_UP_TWO, REVERSE, add_special_indicator,
+    card_name, describe_special_cards, pacing, rules_listeners, sort_cards)
+from .stats import PLAYER_STAT_FIELDS
+
+        
+def slow_print(text, delay=0.5):
+    if pacing.mode == 'batch':
+        print(text)
+        return
+    for char in text:
+        sys.stdout.write(char)
+        sys.stdout.flush()
+        pacing.sleep(delay)
+    print()  # Print a newline at the end of the text
+        #print('-' * 73)
+
+RENDER_CACHE_LIMIT = 4096  # Rendered layouts kept before the cache starts over
+
+class RenderCache:
+    """Memoized rendered text layouts.
+
+    Layouts are keyed by their full content and width, and dropped whenever
+    the special card rules change (hands are keyed by their cards, not their
+    labels); the whole cache is cleared once it reaches ``limit`` entries so
+    long sessions stay bounded.
+    """
+
+    def __init__(self, limit=RENDER_CACHE_LIMIT):
+        self.limit = limit
+        self.rules_version = 0
+        self.layouts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def rules_changed(self):
+        self.rules_version += 1
+        self.layouts.clear()
+
+    def layout(self, key, build):
+        layout = self.layouts.get(key)
+        if layout is None:
+            self.misses += 1
+            if len(self.layouts) >= self.limit:
+                self.layouts.clear()
+            layout = self.layouts[key] = build()
+        else:
+            self.hits += 1
+        return layout
+
+render_cache = RenderCache()
+rules_listeners.append(render_cache.rules_changed)
+
+def print_centered(text, width=73, fill_char=' '):
+    print(f"{text.center(width, fill_char)}")
+
+def print_wrapped(text, width=73, indent=0, is_card_run=False):
+    def wrap_card_run(cards, max_width):
+        lines = []
+        current_line = []
+        current_length = 0
+        for card in cards:
+            if current_length == 0 or current_length + len(card) + 4 <= max_width:  # +4 for " -> " separator
+                current_line.append(card)
+                current_length += len(card) + (4 if current_length > 0 else 0)
+            else:
+                lines.append(current_line)
+                current_line = [card]
+                current_length = len(card)
+        if current_line:
+            lines.append(current_line)
+        return lines
+
+    if is_card_run:
+        cards = text.split(' - ')
+        wrapped_lines = wrap_card_run(cards, width - indent)
+        for line in wrapped_lines:
+            print(' ' * indent + ' -> '.join(line))
+    else:
+        # Split the input text into lines
+        lines = text.split('\n')
+        
+        for line in lines:
+            # Preserve leading spaces
+            leading_spaces = len(line) - len(line.lstrip())
+            line = line.strip()
+            
+            # If the line is empty, print a blank line
+            if not line:
+                print()
+                continue
+            
+            # Initialize the current line
+            current_line = ' ' * (indent + leading_spaces)
+            
+            # Split the line into words
+            words = line.split()
+            
+            for word in words:
+                # If adding the word doesn't exceed the width, add it to the current line
+                if len(current_line) + len(word) + 1 <= width:
+                    if current_line.strip():
+                        current_line += ' '
+                    current_line += word
+                else:
+                    # Print the current line and start a new one
+                    print(current_line)
+                    current_line = ' ' * (indent + leading_spaces) + word
+            
+            # Print any remaining text
+            if current_line.strip():
+                print(current_line)
+
+def print_boxed(text, width=73, alignments=None):
+    key = ('boxed', text, width, tuple(alignments) if isinstance(alignments, list) else alignments)
+    print(render_cache.layout(key, lambda: render_boxed(text, width, alignments)))
+
+def render_boxed(text, width=73, alignments=None):
+    def wrap_text(text, max_width):
+        words = text.split()
+        lines = []
+        current_line = []
+        current_length = 0
+        for word in words:
+            if current_length + len(word) + len(current_line) <= max_width:
+                current_line.append(word)
+                current_length += len(word)
+            else:
+                lines.append(' '.join(current_line))
+                current_line = [word]
+                current_length = len(word)
+        if current_line:
+            lines.append(' '.join(current_line))
+        return lines
+
+    def wrap_card_run(cards, max_width):
+        lines = []
+        current_line = []
+        current_length = 0
+        for card in cards:
+            if current_length == 0 or current_length + len(card) + 4 <= max_width:  # +4 for " -> " separator
+                current_line.append(card)
+                current_length += len(card) + (4 if current_length > 0 else 0)
+            else:
+                lines.append(current_line)
+                current_line = [card]
+                current_length = len(card)
+        if current_line:
+            lines.append(current_line)
+        return lines
+
+    def align_text(line, align, max_width):
+        if align == 'left':
+            return line.ljust(max_width)
+        elif align == 'right':
+            return line.rjust(max_width)
+        else:  # center
+            return line.center(max_width)
+
+    output = ['┌' + '─' * (width - 2) + '┐']
+    
+    # Split the text into lines
+    text_lines = text.split('\n')
+    
+    # If alignments are not specified, default to center alignment for all lines
+    if alignments is None:
+        alignments = ['center'] * len(text_lines)
+    # If alignments is a string, apply it to all lines
+    elif isinstance(alignments, str):
+        alignments = [alignments] * len(text_lines)
+    # Ensure we have an alignment for each line
+    alignments = alignments + ['left'] * (len(text_lines) - len(alignments))
+
+    # Process each line
+    for line_index, (line, align) in enumerate(zip(text_lines, alignments)):
+        if line_index == 1 and ' - ' in line:  # Assume second line is card run if it contains ' - '
+            cards = line.split(' - ')
+            wrapped_cards = wrap_card_run(cards, width - 6)  # -6 for "│  " and "  │" on each side
+            for card_line in wrapped_cards:
+                card_text = " -> ".join(card_line)
+                centered_text = card_text.center(width-6)
+                output.append(f"│  {centered_text}  │")
+        else:
+            wrapped_lines = wrap_text(line, width - 4)
+            for wrapped_line in wrapped_lines:
+                aligned_line = align_text(wrapped_line, align, width - 4)
+                output.append(f"│ {aligned_line} │")
+
+    output.append('└' + '─' * (width - 2) + '┘')
+    return '\n'.join(output)
+
+def print_dashed_box(text, width=73, title_alignment='center'):
+    print(render_cache.layout(('dashed', text, width, title_alignment),
+                              lambda: render_dashed_box(text, width, title_alignment)))
+
+def render_dashed_box(text, width=73, title_alignment='center'):
+    def wrap_cards(cards, max_width):
+        lines = []
+        current_line = []
+        current_length = 0
+        for card in cards:
+            if current_length == 0 or current_length + len(card) + 3 <= max_width:  # +3 for " | " separator
+                current_line.append(card)
+                current_length += len(card) + (3 if current_length > 0 else 0)
+            else:
+                lines.append(current_line)
+                current_line = [card]
+                current_length = len(card)
+        if current_line:
+            lines.append(current_line)
+        return lines
+
+    output = ['-' * width]
+    
+    # Split the text into lines
+    text_lines = text.split('\n')
+    
+    # Handle the title (first line)
+    title = text_lines[0]
+    if title_alignment == 'left':
+        output.append(f"| {title.ljust(width-4)} |")
+    elif title_alignment == 'right':
+        output.append(f"| {title.rjust(width-4)} |")
+    else:  # center
+        output.append(f"|{title.center(width-2)}|")
+    
+    # Handle additional lines if present
+    if len(text_lines) > 1:
+        for line in text_lines[1:]:
+            cards = line.split(', ')
+            wrapped_cards = wrap_cards(cards, width - 4)  # -4 for "| |" on each side
+            
+            for card_line in wrapped_cards:
+                card_text = " | ".join(card_line)
+                output.append(f"| {card_text.ljust(width-4)} |")
+    
+    output.append('-' * width)
+    return '\n'.join(output)
+
+def display_game_stats(deck, discard_pile, top_card, player_hands):
+    print_boxed("Round Statistics")
+    print(f"Number of cards in the deck: {len(deck)}")
+    print(f"Number of cards in the discard pile: {len(discard_pile)}")
+    print(f"Top card: {top_card}")
+    print("Player hands:")
+    for player, hand in player_hands.items():
+        print(f"{player}: {len(hand)} cards")
+    print('-' * 73)
+    pacing.confirm()
+
+# Example usage in the game loop:
+# display_game_stats(deck, discard_pile, top_card, player_hands)
+
+def display_game_start(game_number):
+    start_text = (f"Starting Game {game_number}")
+    print_boxed(start_text)
+    print(' >< ' * 18)
+
+def display_turn_header(current_player, turn_count):
+    #print('-' * 60)
+    print_boxed(f"{current_player}'s Turn (Turn {turn_count})")
+    print('-' * 73)
+
+def display_top_card(top_card):
+    print_centered(f"──── TOP CARD: {add_special_indicator(top_card)} ────")
+    #print('-' * 73)
+
+def display_player_hand(player, hand, is_ai=False, title_alignment='left'):
+    if is_ai:
+        print('-' * 73)
+        print(f"{player}'s HAND: {len(hand)} cards")
+        print('-' * 73)
+    else:
+        print(render_hand(f"{player}'s HAND:", hand, title_alignment=title_alignment))
+        #print('-' * 60)
+
+def render_hand(title, hand, width=73, title_alignment='left'):
+    """Render a sorted, labelled hand in a dashed box; an unchanged hand is a single cache lookup."""
+    def build():
+        hand_with_indicators = [add_special_indicator(card) for card in sort_cards(hand)]
+        return render_dashed_box(f"{title}\n" + ", ".join(hand_with_indicators), width, title_alignment)
+    return render_cache.layout(('hand', title, tuple(hand), width, title_alignment), build)
+
+def display_effect_event(event, game_state):
+    if DEBUG_FLAGS["all"] or DEBUG_FLAGS["cards"]:
+        print(f"DEBUG [CARDS]: {event.player} resolved {EFFECT_NAMES[event.effect]} for {event.card} ({event.value})")
+        print('-' * 73)
+    if event.effect in (PICK_UP_TWO, PICK_UP_FIVE):
+        print_boxed(f"The Pick Up Stack is now {event.value}")
+        print('-' * 73)
+    elif event.effect == CANCEL and event.value:
+        print_centered(f"The Pick Up is canceled. Pick Up stack is now 0.")
+        print('-' * 73)
+    elif event.effect == REVERSE:
+        print(f"Direction changed to {'clockwise' if event.value == 1 else 'counter-clockwise'}")
+        print('-' * 73)
+        game_state.display_turn_order()
+    elif event.effect == CHANGE_SUIT:
+        print_boxed(f"{event.player} changes the suit to {event.value}!")
+        print('-' * 73)
+
+def display_turn_event(event):
+    """Renders a TurnEvent the way play_turn prints the same action for a human."""
+    player = event.player
+    cards = [card_name(card) for card in event.cards]
+    if event.kind == 'turn':
+        display_top_card(event.top_card)
+        print('-' * 73)
+        print(f"{player}'s HAND: {event.count} cards")
+        print('-' * 73)
+        return
+    if event.kind == 'single':
+        print_boxed(f"{player} played:\n {add_special_indicator(cards[0])}")
+    elif event.kind == 'run':
+        print_boxed(f"{player} played:\n {' - '.join(add_special_indicator(card) for card in cards)}")
+    elif event.kind == 'pick up':
+        print_boxed(f"{player} drew {event.count} cards." if event.count else f"{player} couldn't draw any cards.")
+    elif event.kind == 'draw':
+        print_boxed(f"{player} drew 1 card from deck.")
+    elif event.kind == 'reshuffle':
+        print_boxed("The deck is empty. Reshuffling discarded cards.")
+    elif event.kind == 'skip':
+        print_boxed("The deck is empty. Skipping turn.")
+    elif event.kind == 'last card draw':
+        print_boxed(f"{player} played their last card, but must draw a new card.")
+        pacing.confirm()
+        return
+    elif event.kind == 'pick up last':
+        print_boxed(f"{player} played their last card (Pick Up). The next player must respond or {player} wins.")
+        pacing.confirm()
+        return
+    elif event.kind == 'win':
+        print_boxed(f"{player} has won the game!")
+        pacing.confirm()
+        return
+    print('-' * 73)
+
+class TableRenderer:
+    """Prints the table for people watching: turn headers, effects, skips, reshuffles and round statistics."""
+
+    def subscribe(self, bus):
+        for kind in ('deal', 'turn', 'effect', 'reshuffle', 'miss-turn', 'move', 'round', 'win'):
+            bus.subscribe(kind, getattr(self, 'on_' + kind.replace('-', '_')))
+
+    def on_deal(self, event):
+        self.setup = event.value
+
+    def on_turn(self, event):
+        display_turn_header(event.player, event.turn)
+        self.setup.game_state.display_turn_order()
+
+    def on_effect(self, event):
+        display_effect_event(event.value, self.setup.game_state)
+
+    def on_reshuffle(self, event):
+        if event.value == 'between turns':  # AI turns show their own reshuffles
+            print_boxed("Reshuffling the deck with the discard pile.")
+            pacing.confirm()
+
+    def on_miss_turn(self, event):
+        if event.value == 'skip':
+            print_boxed(f"{event.player} misses this turn.")
+            print('-' * 73)
+            pacing.confirm()
+        else:
+            print_boxed(f"{event.player} couldn't respond with a Pick Up card.")
+            print('-' * 73)
+
+    def on_move(self, event):
+        if event.value.action == "pick up last":
+            print(f"{event.player} played their last card (Pick Up). The next player must respond or {event.player} wins.")
+        elif event.value.action == "cover":
+            print(f"{event.player} gets another turn due to Cover effect!")
+            print('-' * 73)
+
+    def on_round(self, event):
+        display_game_stats(self.setup.deck, self.setup.discard_pile, event.top_card, self.setup.game_state.player_hands)
+
+    def on_win(self, event):
+        if event.value == 'pick up last':
+            print_boxed(f"{event.player} wins! No player could respond with a Pick Up card.")
+        elif event.value == 'no cards':
+            print("Game ended due to no more playable cards.")
+
+def get_longest_run_players(stats):
+    max_run = max(player_stats['longest_run'] for player_stats in stats.values())
+    return [player for player, player_stats in stats.items() if player_stats['longest_run'] == max_run]
+        
+def display_round_summary(winner, turns, stats):
+    print_boxed("Game Summary")
+    print('-' * 73)
+    print(f"Winner: {winner}")
+    print(f"Total turns played: {turns}")
+    print('-' * 73)
+    print("Player Statistics:")
+    for player, player_stats in stats.items():
+        print('-' * 73)
+        print(f"{player}:")
+        print(f"Cards drawn: {player_stats['cards_drawn']}")
+        print(f"Single cards played: {player_stats['single_cards_played']}")
+        print(f"Runs played: {player_stats['runs_played']}")
+        print(f"Longest run: {player_stats['longest_run']} cards")
+    print('-' * 73)
+
+    longest_run_players = get_longest_run_players(stats)
+    max_run_length = stats[longest_run_players[0]]['longest_run']
+    
+    print('-' * 73)
+    if len(longest_run_players) == 1:
+        print(f"Longest run of the game: {max_run_length} cards by {longest_run_players[0]}")
+    else:
+        print(f"Longest run of the game: {max_run_length} cards")
+        print(f"Players with the longest run: {', '.join(longest_run_players)}")
+    print('-' * 73)
+
+def display_overall_scores(overall_scores):
+    print_boxed("Overall Scores (Games Won)")
+    print('-' * 73)
+    for player, score in overall_scores.items():
+        print(f"{player}: {score}")
+
+def display_final_summary(games_played, overall_scores):
+    print_boxed("Final Game Summary")
+    print('-' * 73)
+    print(f"Total games played: {games_played}")
+    print("\nFinal Scores (Games Won):")
+    for player, score in overall_scores.items():
+        print(f"{player}: {score}")
+    winner = max(overall_scores, key=overall_scores.get)
+    print(f"\nOverall Winner: {winner}")
+    print("\nThank you for playing!")
+    print('-' * 73)
+
+def display_statistics_summary(stats_store):
+    summary = stats_store.summary()
+    print_boxed("Statistics Summary")
+    print('-' * 73)
+    turns = summary["turns"]
+    print(f"Games recorded: {summary['games']}")
+    print(f"Turns per game: mean {turns['mean']:.1f}, median {turns['p50']}, 90th percentile {turns['p90']}, max {turns['max']}")
+    for field in PLAYER_STAT_FIELDS:
+        field_summary = summary[field]
+        label = field.replace('_', ' ').capitalize()
+        print(f"{label} per player: mean {field_summary['mean']:.1f}, max {field_summary['max']}")
+    print('-' * 73)
+
+def display_sweep_report(summaries, difficulties):
+    print_boxed("Special Card Balance Sweep")
+    print('-' * 73)
+    for summary in summaries:
+        turns = summary["turns"]
+        stack = summary["max_pick_up_stack"]
+        print_wrapped(describe_special_cards(dict(summary["special_cards"])))
+        print(f"  Turns: mean {turns['mean']:.1f}, p10 {turns['p10']}, median {turns['p50']}, p90 {turns['p90']}, "
+              f"p99 {turns['p99']}, max {turns['max']}")
+        print(f"  Largest Pick Up stack per game: mean {stack['mean']:.1f}, p90 {stack['p90']}, max {stack['max']}")
+        print(f"  Cards drawn per Pick Up: mean {summary['pick_up_drawn']['mean']:.1f} over {summary['pick_up_drawn']['count']} pick ups")
+        seats = ", ".join(f"{seat + 1}: {rate:.1%}" for seat, rate in enumerate(summary["win_rate_by_seat"]))
+        print(f"  Win rate by seat: {seats}")
+        skills = ", ".join(f"{difficulty}: {rate:.1%}" for difficulty, rate in summary["win_rate_by_difficulty"].items())
+        print(f"  Win rate by difficulty: {skills}")
+        if summary["no_winner"]:
+            print(f"  Games stopped without a winner: {summary['no_winner']} of {summary['games']}")
+        print('-' * 73)
+
+def display_simulation_report(report):
+    print_boxed("Parallel Simulation Throughput")
+    print('-' * 73)
+    base = report["runs"][0]["games_per_second"]
+    print(f"{'Workers':>7} {'Games':>6} {'Seconds':>8} {'Games/s':>8} {'Speedup':>8}")
+    for run in report["runs"]:
+        note = "  more workers than cores" if run['workers'] > report['cores'] else ""
+        print(f"{run['workers']:>7} {run['games']:>6} {run['seconds']:>8.2f} {run['games_per_second']:>8.1f} "
+              f"{run['games_per_second'] / base:>7.2f}x{note}")
+    print(f"{report['cores']} core(s) available; totals "
+          f"{'agree across runs' if report['consistent'] else 'DIFFER between runs'}")
+    print('-' * 73)
+    result = report["runs"][-1]
+    turns = result["turns"]
+    print(f"Turns: mean {turns['mean']:.1f}, median {turns['p50']}, p90 {turns['p90']}, max {turns['max']}")
+    seats = ", ".join(f"{seat + 1}: {rate:.1%}" for seat, rate in enumerate(result["win_rate_by_seat"]))
+    print(f"Win rate by seat: {seats}")
+    if result["no_winner"]:
+        print(f"Games stopped without a winner: {result['no_winner']} of {result['games']}")
+    print('-' * 73)
+    print(f"{'Difficulty':<10} {'Win rate':>8}" + "".join(f" {field.replace('_', ' '):>20}" for field in PLAYER_STAT_FIELDS))
+    for difficulty, rate in result["win_rate_by_difficulty"].items():
+        fields = "".join(f" {stat['mean']:>12.2f} (max {stat['max']:>2})"
+                         for stat in result["player_stats"][difficulty].values())
+        print(f"{difficulty:<10} {rate:>8.1%}{fields}")
+    print('-' * 73)
+
+def display_series_report(report):
+    print_boxed("AI Series")
+    print('-' * 73)
+    if report["resumed_from"]:
+        print(f"Resumed from a checkpoint after {report['resumed_from']} games")
+    print(f"{report['games'] - report['resumed_from']} games played in {report['seconds']:.1f}s")
+    display_final_summary(report["games"], report["overall_scores"])
+    turns = report["turns"]
+    print(f"Turns: mean {turns['mean']:.1f}, median {turns['p50']}, p90 {turns['p90']}, max {turns['max']}")
+    seats = ", ".join(f"{seat + 1}: {rate:.1%}" for seat, rate in enumerate(report["win_rate_by_seat"]))
+    print(f"Win rate by seat: {seats}")
+    if report["no_winner"]:
+        print(f"Games stopped without a winner: {report['no_winner']} of {report['games']}")
+    for field, stat in report["player_stats"].items():
+        print(f"{field.replace('_', ' ').capitalize()} per player: mean {stat['mean']:.2f}, max {stat['max']}")
+    print("Difficulty now: " + ", ".join(f"{label}: {difficulty}" for label, difficulty in report["difficulties"].items()))
+    print('-' * 73)
+
+def display_tournament_report(report):
+    print_boxed("Rating Tournament")
+    print('-' * 73)
+    lower, upper = report["bounds"]
+    print(f"SPRT: H1 first AI +{report['elo_margin']} Elo vs H0 second AI +{report['elo_margin']} Elo, "
+          f"bounds [{lower:.2f}, {upper:.2f}]")
+    print('-' * 73)
+    played = 0
+    for pairing in report["pairings"]:
+        games = pairing["wins"] + pairing["losses"] + pairing["no_winner"]
+        played += games
+        verdict = f"{pairing['decision']} is stronger" if pairing["decision"] else "undecided"
+        print(f"{pairing['first']} vs {pairing['second']}: {pairing['wins']}-{pairing['losses']} in {games} games, "
+              f"{pairing['elo']:+.0f} Elo [{pairing['elo_low']:+.0f}, {pairing['elo_high']:+.0f}], "
+              f"LLR {pairing['llr']:.2f}, {verdict}")
+    print('-' * 73)
+    print("Bradley-Terry ratings (95% confidence):")
+    for name, rating in sorted(report["ratings"].items(), key=lambda item: -item[1]):
+        print(f"  {name:<10} {rating:+7.1f} +/- {1.96 * report['errors'][name]:.1f}")
+    fixed = report["max_games"] * len(report["pairings"])
+    print('-' * 73)
+    print(f"Games played: {played} (a fixed-N run of {report['max_games']} per pairing would need {fixed})")
+    print('-' * 73)
+
+def display_duplicate_report(report):
+    print_boxed("Duplicate Deal Evaluation")
+    print('-' * 73)
+    print(f"Line-up: {', '.join(report['line_up'])}")
+    print(f"{report['deals']} deals x {len(report['line_up'])} rotations = {report['games']} games")
+    print("Score = share of wins above the fair share for the seats held (+/- 95% confidence)")
+    print('-' * 73)
+    for result in report["results"]:
+        line = f"{result['strategy']:<10} duplicate {result['mean']:+.3f} +/- {1.96 * result['stderr']:.3f}"
+        if "plain_mean" in result:
+            line += (f" | plain {result['plain_mean']:+.3f} +/- {1.96 * result['plain_stderr']:.3f}"
+                     f" | variance reduction x{result['variance_reduction']:.1f}")
+        print(line)
+    if report["plain_games"]:
+        print('-' * 73)
+        print(f"Plain games for comparison: {report['plain_games']} on fresh deals. A variance reduction of xN means")
+        print("plain games would need N times as many games for the same confidence.")
+    print('-' * 73)
+
+def display_scaling_report(report):
+    from .simulation import SUPERLINEAR_GROWTH
+    print_boxed("Large Table Scaling Benchmark")
+    print('-' * 73)
+    base = report["rows"][0]["us_per_turn"]
+    print(f"{'Players':>7} {'Decks':>5} {'Games':>5} {'Turns':>7} {'us/turn':>9} {'vs first':>8} {'worst move':>11}")
+    for row in report["rows"]:
+        print(f"{row['players']:>7} {row['decks']:>5} {row['games']:>5} {row['turns']:>7} "
+              f"{row['us_per_turn']:>9.1f} {row['us_per_turn'] / base:>7.2f}x {row['worst_move_ms']:>8.2f} ms")
+    print('-' * 73)
+    print("Largest table, exclusive time per turn:")
+    for function, cost in report["hotspots"]:
+        print(f"  {cost * 1e6:9.2f} us {cost / report['large_total']:6.1%}  {function}")
+    print('-' * 73)
+    if report["growth"]:
+        print(f"Paths whose per-turn cost grew more than {SUPERLINEAR_GROWTH:.0f}x from the smallest table:")
+        for function, small, large, ratio in report["growth"]:
+            print(f"  {small * 1e6:9.2f} -> {large * 1e6:9.2f} us ({ratio:.1f}x)  {function}")
+    else:
+        print(f"No function's per-turn cost grew more than {SUPERLINEAR_GROWTH:.0f}x from the smallest table.")
+    print('-' * 73)
+
+def power_of_two_buckets(stat):
+    """Histogram of a StreamingStat regrouped into 0, 1, 2-3, 4-7, ... buckets."""
+    buckets = collections.Counter()
+    for value, count in stat.histogram_items():
+        buckets[0 if value < 1 else int(value).bit_length()] += count
+    labels = {0: "0", 1: "1"}
+    return [(labels.get(bucket, f"{2 ** (bucket - 1)}-{2 ** bucket - 1}"), count) for bucket, count in sorted(buckets.items())]
+
+def display_branching_report(report):
+    print_boxed(f"Branching factors over {report['games']} games ({report['seconds']:.1f}s)")
+    print(f"{'Per play_turn call':<22} {'Calls':>7} {'Mean':>9} {'p50':>7} {'p90':>7} {'p99':>8} {'Max':>9}")
+    for metric, stat in report["metrics"].items():
+        print(f"{metric.replace('_', ' '):<22} {stat.count:>7} {stat.mean:>9.2f} {stat.percentile(50):>7.4g} "
+              f"{stat.percentile(90):>7.4g} {stat.percentile(99):>8.4g} {stat.maximum:>9.4g}")
+    print('-' * 73)
+    for metric in ('runs_generated', 'pickup_combinations', 'milliseconds'):
+        buckets = ", ".join(f"{label}: {count}" for label, count in power_of_two_buckets(report["metrics"][metric]))
+        print_wrapped(f"{metric.replace('_', ' ').capitalize()}: {buckets}")
+    print('-' * 73)
+    print(f"Positions over {report['time_threshold']}s (AI turns) or {report['count_threshold']} generated moves: "
+          f"{len(report['dumped'])}" + (f", appended to {report['dump_path']}" if report['dump_path'] and report['dumped'] else ""))
+    for case in report["dumped"][:10]:
+        print_wrapped(f"  {case['difficulty']} with {len(case['hand'])} cards on {case['top_card']}: {case['reason']}")
+    print('-' * 73)
+
+def display_position_benchmark(rows):
+    print_boxed("Dumped positions replayed as benchmarks (best time)")
+    print(f"{'#':>3} {'Player':<9} {'Cards':>5} {'Stack':>5} {'Runs':>7} {'Singles':>9} {'Runs':>10} {'Pick Ups':>10} {'Decision':>10}")
+    for number, row in enumerate(rows, 1):
+        case, timings = row["case"], row["timings"]
+        cells = [f"{timings[phase] * 1000:>8.2f}ms" if phase in timings else f"{'-':>10}"
+                 for phase in ("runs", "pickup_runs", "decision")]
+        print(f"{number:>3} {case['difficulty']:<9} {len(case['hand']):>5} {case['pick_up_stack']:>5} {row['runs']:>7} "
+              f"{timings['single_cards'] * 1e6:>7.1f}us " + " ".join(cells))
+    print('-' * 73)
+
+def display_corpus_benchmark(report):
+    print_boxed(f"Position corpus benchmark: {report['cases']} positions, best of {report['repeats']}")
+    print(f"{'Category':<10} " + " ".join(f"{phase.replace('_', ' ').title():>16}" for phase in report['phases']))
+    for category, phases in sorted(report['by_category'].items()):
+        print(f"{category:<10} " + " ".join(f"{seconds * 1000:>14.2f}ms" for seconds in phases.values()))
+    print('-' * 73)
+    decks = sorted({num_decks for _, num_decks in report['coverage']})
+    print("Positions per category and shoe: " + ", ".join(
+        f"{category} " + "/".join(str(report['coverage'][category, num_decks]) for num_decks in decks)
+        for category in sorted(report['by_category'])) + f" ({'/'.join(map(str, decks))} decks)")
+    print('-' * 73)
+    baseline = report['baseline']
+    if report['stale']:
+        print_wrapped(f"FAILED: {report['baseline_path']} was not taken on this corpus ({baseline['cases']} positions "
+                      f"then, {report['cases']} now); rebuild it with --update-baseline.")
+    elif report['comparison']:
+        print(f"{'Phase':<16} {'Now':>12} {'Baseline':>12} {'Change':>9}  Status (limit {report['max_regression']:+g}%)")
+        for phase, seconds in report['phases'].items():
+            result = report['comparison'][phase]
+            status = "REGRESSED" if result['regressed'] else "ok"
+            print(f"{phase.replace('_', ' ').title():<16} {seconds * 1000:>10.2f}ms {result['baseline'] * 1000:>10.2f}ms "
+                  f"{result['change']:>+8.1f}%  {status}")
+        print_wrapped(f"Baseline from Python {baseline['python']} on {baseline['machine']}; "
+                      "timings only compare on the machine that took them.")
+    if report['baseline_written']:
+        print_wrapped(f"Baseline written to {report['baseline_path']}")
+    print('-' * 73)
+
+def display_fuzz_report(report):
+    print_boxed(f"Move generator fuzzing: {report['cases']} cases, seed {report['seed']}, {report['decks']} deck(s)")
+    print(f"{'Function':<24} {'Checked':>8} {'Mismatch':>9} {'Known':>7} {'Reference':>10} {'Fast':>9} {'Speedup':>8}")
+    for result in report['functions']:
+        print(f"{result['function']:<24} {result['checked']:>8} {result['mismatches']:>9} {result['known']:>7} "
+              f"{result['reference_seconds']:>9.3f}s {result['fast_seconds']:>8.3f}s {result['speedup']:>7.1f}x")
+    print('-' * 73)
+    print("Known: runs round a whole suit that only one side lists, and repeated Pick Up combinations.")
+    print('-' * 73)
+    for result in report['functions']:
+        for description, expected, actual in result['examples']:
+            print_wrapped(f"{result['function']} MISMATCH: {description}")
+            print_wrapped(f"  reference only: {expected}")
+            print_wrapped(f"  fast only:      {actual}")
+            print('-' * 73)
+
+def display_replay_report(report):
+    print_boxed(f"{report['path']}: {report['games']} games, {sum(report['turns'].values())} turns")
+    print(', '.join(f"{action}: {count}" for action, count in sorted(report['turns'].items())))
+    print('-' * 73)
+    if report['state'] is not None:
+        print(report['state'].describe())
+        print('-' * 73)
+    if report['check'] is not None:
+        checked, mismatches = report['check']
+        print(f"Keyframes checked against the replay: {checked}, mismatched: {len(mismatches)}")
+        for game_id, turn in mismatches[:20]:
+            print(f"  game {game_id}, turn {turn}")
+        print('-' * 73)
+
+def display_import_report(rows):
+    print_boxed("Import cost by module (fresh interpreter each)")
+    print(f"{'Module':<20} {'Import':>9} {'Peak RSS':>10} {'Modules':>8}  UI loaded")
+    for name, seconds, rss_kb, modules, ui_loaded in rows:
+        print(f"{name:<20} {seconds * 1000:>7.1f}ms {rss_kb / 1024:>8.1f}MB {modules:>8}  {'yes' if ui_loaded else 'no'}")
+    print('-' * 73)
+    print("The simulation worker row also plays one four-AI game, as a process-pool worker would.")
+    print('-' * 73)
+
+def display_bot_match_report(report):
+    print('-' * 73)
+    print(f"Bot {report['command']!r}: {report['games']} games, {report['concurrency']} at a time, "
+          f"{report['seconds']:.2f}s")
+    print('-' * 73)
+    for name, count in sorted(report['wins'].items(), key=lambda item: -item[1]):
+        print(f"{name:>10}: {count:5d} wins ({count / report['games']:.1%})")
+    if report['no_winner']:
+        print(f"{'no winner':>10}: {report['no_winner']:5d}")
+    print('-' * 73)
+    print(f"Decisions: {report['decisions']}, up to {report['max_in_flight']} in flight, "
+          f"mean {report['mean_latency'] * 1000:.2f} ms, max {report['max_latency'] * 1000:.2f} ms")
+    print(f"Fell back to the easy strategy {report['fallbacks']} times "
+          f"({report['timeouts']} timeouts, {report['malformed']} malformed answers)")
+    if report['exit_code']:
+        print(f"Bot exited with code {report['exit_code']}")
+    print('-' * 73)
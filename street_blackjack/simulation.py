@@ -0,0 +1,1118 @@
+"""AI-vs-AI simulation: special card sweeps, parallel runs, rating tournaments, duplicate deals and benchmarks."""
+import collections
+import time
+import itertools
+import math
+import os
+import contextlib
+import json
+import multiprocessing
+import random
+import tempfile
+import shutil
+import platform
+import hashlib
+
+from .engine import (
+    CANCEL, DEFAULT_SPECIAL_CARDS, GameState, card_effect, card_name, find_pickup_runs, find_valid_runs,
+    find_valid_single_cards, is_pickup_card, pacing, resolve_effects, set_special_cards, special_cards, special_cards_key,
+    suits)
+from .stats import PLAYER_STAT_FIELDS, StatsStore, StreamingStat, winner_seat
+from .ai import AIPlayer, clear_endgame_table
+from .records import (
+    ACTION_PASS, GameRecorder, GameRecordReader, GameStartRecord, KeyframeRecord, ReplayState, ReshuffleRecord,
+    TURN_FLAG_PLAY_AGAIN, TurnRecord, merge_record_files)
+from .game import (
+    BRANCHING_COUNT_THRESHOLD, BRANCHING_TIME_THRESHOLD, BranchingProfiler, EventProfiler, StatsCollector,
+    default_consumers, play_game)
+
+# Simulation and special card balance sweeps
+
+SIMULATION_MAX_TURNS = 1000  # Simulated games that run this long are recorded as having no winner
+SWEEP_CHUNK_GAMES = 50  # Games per task handed to a sweep worker
+CHECKPOINT_SECONDS = 60  # How often long jobs with a checkpoint file save their progress
+
+def simulate_game(difficulties, num_decks=1, cards_per_player=7, seed=None, recorder=None, max_turns=SIMULATION_MAX_TURNS,
+                  consumers=(), ai_players=None):
+    """Play one AI-only game with no output and no waiting; difficulties are listed in seat order."""
+    ai_difficulties = {f'AI PLAYER {i+1}': difficulty for i, difficulty in enumerate(difficulties)}
+    previous_mode = pacing.mode
+    pacing.set_mode('batch')
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            return play_game(0, len(difficulties), num_decks, cards_per_player, ai_difficulties, seed=seed,
+                             recorder=recorder, event_handler=None, max_turns=max_turns, ai_players=ai_players,
+                             consumers=consumers)
+    finally:
+        pacing.set_mode(previous_mode)
+
+def line_up_difficulties(line_up):
+    """The ai_difficulties mapping simulate_game plays ``line_up`` with, as StatsStore.append_game wants it."""
+    return {f'AI PLAYER {i+1}': difficulty for i, difficulty in enumerate(line_up)}
+
+def iter_tasks(worker, tasks, workers=None):
+    """Map ``worker`` over ``tasks`` on a process pool (in this process when one worker is enough), yielding
+    each output as soon as it is ready."""
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with multiprocessing.Pool(workers) as pool:
+            yield from pool.imap_unordered(worker, tasks)
+    else:
+        for task in tasks:
+            yield worker(task)
+
+def run_tasks(worker, tasks, workers=None):
+    """Map ``worker`` over ``tasks`` on a process pool (in this process when one worker is enough)."""
+    return list(iter_tasks(worker, tasks, workers))
+
+def seat_difficulties(difficulties, game_index):
+    """Rotate the difficulty line-up by one seat per game so seat and skill effects can be told apart."""
+    shift = game_index % len(difficulties)
+    return list(difficulties[shift:]) + list(difficulties[:shift])
+
+class Checkpointer:
+    """Periodic, atomic JSON checkpoints of a long job.
+
+    A checkpoint is written to a temporary file, flushed to disk and then
+    renamed over ``path``, so a crash leaves either the previous checkpoint
+    or the new one. ``settings`` (a string) is stored with every checkpoint
+    and load() refuses a checkpoint written for other settings. Without a
+    path nothing is ever saved.
+    """
+
+    def __init__(self, path, settings, interval=CHECKPOINT_SECONDS):
+        self.path = path
+        self.settings = settings
+        self.interval = interval
+        self.last_save = time.monotonic()
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            state = json.load(f)
+        if state.get("settings") != self.settings:
+            raise ValueError(f"{self.path} is the checkpoint of a different job; remove it or choose another file")
+        return state
+
+    def due(self):
+        return bool(self.path) and time.monotonic() - self.last_save >= self.interval
+
+    def save(self, state):
+        if not self.path:
+            return
+        state = dict(state, settings=self.settings)
+        with open(self.path + '.tmp', 'w') as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.path + '.tmp', self.path)
+        self.last_save = time.monotonic()
+
+class PickUpCollector:
+    """Recorder-compatible collector of Pick Up stack sizes for play_game."""
+
+    def __init__(self):
+        self.max_stack = StreamingStat()
+        self.picked_up = StreamingStat()
+        self.game_max_stack = 0
+
+    def start_game(self, game_state, top_card, **kwargs):
+        self.game_max_stack = 0
+
+    def record_turn(self, game_state, player, turn, played, drawn, top_card, picked_up=False, **kwargs):
+        self.game_max_stack = max(self.game_max_stack, game_state.pick_up_stack)
+        if picked_up:
+            self.picked_up.add(len(drawn))
+
+    def end_game(self, game_state, winner, turns):
+        self.max_stack.add(self.game_max_stack)
+
+def _sweep_worker(task):
+    assignments, difficulties, num_decks, cards_per_player, max_turns, first_game, games, base_seed, stats_dir = task
+    set_special_cards(assignments)
+    store = None
+    if stats_dir:
+        shutil.rmtree(stats_dir, ignore_errors=True)  # Rows of an attempt cut short by an interruption
+        store = StatsStore(spill_dir=stats_dir)
+    collector = PickUpCollector()
+    turns = StreamingStat()
+    wins_by_seat = collections.Counter()
+    wins_by_difficulty = collections.Counter()
+    no_winner = 0
+    for game_index in range(first_game, first_game + games):
+        line_up = seat_difficulties(difficulties, game_index)
+        winner, turn_count, stats = simulate_game(line_up, num_decks, cards_per_player, seed=base_seed + game_index,
+                                                  recorder=collector, max_turns=max_turns)
+        if store is not None:
+            store.append_game(winner, turn_count, stats, seed=base_seed + game_index, num_decks=num_decks,
+                              cards_per_player=cards_per_player, difficulties=line_up_difficulties(line_up))
+        turns.add(turn_count)
+        seat = winner_seat(winner, stats)
+        if seat is None:
+            no_winner += 1
+            continue
+        wins_by_seat[seat] += 1
+        wins_by_difficulty[line_up[seat]] += 1
+    if store is not None:
+        store.flush()
+    return (special_cards_key(assignments), first_game, turns, collector.max_stack, collector.picked_up, wins_by_seat,
+            wins_by_difficulty, no_winner)
+
+def _sweep_totals_state(total):
+    turns, max_stack, picked_up, wins_by_seat, wins_by_difficulty, no_winner = total
+    return [turns.state(), max_stack.state(), picked_up.state(), sorted(wins_by_seat.items()),
+            sorted(wins_by_difficulty.items()), no_winner]
+
+def _load_sweep_totals(state):
+    turns, max_stack, picked_up, wins_by_seat, wins_by_difficulty, no_winner = state
+    return [StreamingStat().load_state(turns), StreamingStat().load_state(max_stack), StreamingStat().load_state(picked_up),
+            collections.Counter(dict(wins_by_seat)), collections.Counter(dict(wins_by_difficulty)), no_winner]
+
+def _sweep_summary(assignments, difficulties, games, turns, max_stack, picked_up, wins_by_seat, wins_by_difficulty, no_winner):
+    # Every difficulty sits in every seat equally often thanks to seat_difficulties
+    games_by_difficulty = collections.Counter(difficulties)
+    return {
+        "special_cards": sorted(assignments.items()),
+        "games": games,
+        "no_winner": no_winner,
+        "turns": {"mean": turns.mean, "stdev": turns.stdev, "p10": turns.percentile(10), "p50": turns.percentile(50),
+                  "p90": turns.percentile(90), "p99": turns.percentile(99), "max": turns.maximum},
+        "max_pick_up_stack": {"mean": max_stack.mean, "p90": max_stack.percentile(90), "max": max_stack.maximum},
+        "pick_up_drawn": {"count": picked_up.count, "mean": picked_up.mean, "max": picked_up.maximum},
+        "win_rate_by_seat": [wins_by_seat[seat] / games for seat in range(len(difficulties))],
+        "win_rate_by_difficulty": {difficulty: wins_by_difficulty[difficulty] / (games * count)
+                                   for difficulty, count in sorted(games_by_difficulty.items())},
+    }
+
+def run_special_card_sweep(configurations, difficulties, games=100, num_decks=1, cards_per_player=7, workers=None,
+                           cache_path=None, base_seed=0, max_turns=SIMULATION_MAX_TURNS, checkpoint_path=None,
+                           checkpoint_seconds=CHECKPOINT_SECONDS, stats_dir=None):
+    """Run ``games`` AI-only games for each special card configuration across a process pool.
+
+    Game ``i`` of every configuration uses seed ``base_seed + i``, so all
+    configurations see the same deals where the rules allow. Summaries are
+    cached in ``cache_path`` (JSON) keyed by the configuration and the sweep
+    parameters, and cached configurations are not run again. While the
+    sweep runs, the totals of finished chunks are checkpointed to
+    ``checkpoint_path``; a sweep restarted with the same arguments skips
+    those chunks.
+
+    With ``stats_dir`` every game also goes into a StatsStore per
+    configuration, returned as the summaries' "stats"; the cache is not
+    read then, since it has no per-game rows. Chunks spill their rows under
+    ``stats_dir``, so a resumed sweep still has the rows of chunks finished
+    before the interruption.
+    """
+    cache = {}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            cache = json.load(f)
+    settings = json.dumps([list(difficulties), games, num_decks, cards_per_player, base_seed, max_turns])
+
+    results = {}
+    pending = {}
+    for assignments in configurations:
+        key = special_cards_key(assignments)
+        if settings + key in cache and not stats_dir:
+            results[key] = cache[settings + key]
+        else:
+            pending[key] = assignments
+
+    totals = {key: [StreamingStat(), StreamingStat(), StreamingStat(), collections.Counter(), collections.Counter(), 0]
+              for key in pending}
+    checkpointer = Checkpointer(checkpoint_path, settings + json.dumps([sorted(pending), bool(stats_dir)]),
+                                checkpoint_seconds)
+    finished = set()
+    checkpoint = checkpointer.load() if pending else None
+    if checkpoint:
+        finished = {(key, first_game) for key, first_game in checkpoint["finished"]}
+        totals.update((key, _load_sweep_totals(total)) for key, total in checkpoint["totals"].items())
+    chunk_starts = range(0, games, SWEEP_CHUNK_GAMES)
+    chunk_dirs = {key: [os.path.join(stats_dir, 'chunks', f"{number}-{first_game}") if stats_dir else None
+                        for first_game in chunk_starts]
+                  for number, key in enumerate(sorted(pending))}
+    tasks = [(assignments, list(difficulties), num_decks, cards_per_player, max_turns, first_game,
+              min(SWEEP_CHUNK_GAMES, games - first_game), base_seed, chunk_dirs[key][chunk])
+             for key, assignments in pending.items() for chunk, first_game in enumerate(chunk_starts)
+             if (key, first_game) not in finished]
+
+    def save_checkpoint():
+        checkpointer.save({"finished": sorted(finished),
+                           "totals": {key: _sweep_totals_state(total) for key, total in totals.items()}})
+
+    if tasks:
+        saved_special_cards = dict(special_cards)
+        try:
+            for key, first_game, turns, max_stack, picked_up, wins_by_seat, wins_by_difficulty, no_winner in \
+                    iter_tasks(_sweep_worker, tasks, workers):
+                total = totals[key]
+                total[0].merge(turns)
+                total[1].merge(max_stack)
+                total[2].merge(picked_up)
+                total[3].update(wins_by_seat)
+                total[4].update(wins_by_difficulty)
+                total[5] += no_winner
+                finished.add((key, first_game))
+                if checkpointer.due():
+                    save_checkpoint()
+        except KeyboardInterrupt:
+            save_checkpoint()
+            raise
+        finally:
+            set_special_cards(saved_special_cards)
+        save_checkpoint()
+
+    for key, assignments in pending.items():
+        results[key] = cache[settings + key] = _sweep_summary(assignments, difficulties, games, *totals[key])
+    if stats_dir:
+        for key in pending:
+            store = StatsStore()
+            for chunk_dir in chunk_dirs[key]:
+                store.merge_spilled([chunk_dir])
+            results[key] = dict(results[key], stats=store)
+        shutil.rmtree(os.path.join(stats_dir, 'chunks'), ignore_errors=True)
+
+    if cache_path and pending:
+        with open(cache_path + '.tmp', 'w') as f:
+            json.dump(cache, f)
+        os.replace(cache_path + '.tmp', cache_path)
+    return [results[special_cards_key(assignments)] for assignments in configurations]
+
+# Parallel simulation with shared-memory totals
+#
+# Each worker process plays every ``workers``-th game of the run and adds its
+# results into its own slot of one shared array of 64-bit counters, so no
+# per-game result is pickled back to the parent. The parent adds the slots up
+# once, after every worker has finished.
+
+SIMULATION_CORE_COUNTS = [1, 2, 4, None]  # None stands for all cores
+
+class SimulationTotals:
+    """Layout of one worker's slot in the shared counters of run_parallel_simulation.
+
+    A slot holds the games played and the games with no winner, wins by
+    seat, wins by difficulty, a histogram of game lengths (one bin per turn
+    count up to max_turns), and for every difficulty and per-player stats
+    field a (sum, maximum) pair.
+    """
+
+    GAMES = 0
+    NO_WINNER = 1
+
+    def __init__(self, difficulties, max_turns):
+        self.difficulties = list(dict.fromkeys(difficulties))
+        self.max_turns = max_turns
+        self.wins_by_seat = 2
+        self.wins_by_difficulty = self.wins_by_seat + len(difficulties)
+        self.turn_histogram = self.wins_by_difficulty + len(self.difficulties)
+        self.player_stats = self.turn_histogram + max_turns + 1
+        self.size = self.player_stats + 2 * len(self.difficulties) * len(PLAYER_STAT_FIELDS)
+
+    def stat_offset(self, difficulty_index, field_index):
+        return self.player_stats + 2 * (difficulty_index * len(PLAYER_STAT_FIELDS) + field_index)
+
+    def is_maximum(self, offset):
+        return offset >= self.player_stats and (offset - self.player_stats) % 2 == 1
+
+    def add_game(self, slot, line_up, winner, turns, stats):
+        """Add one game's result to ``slot``, a list laid out like a slot of the shared counters."""
+        slot[self.GAMES] += 1
+        slot[self.turn_histogram + min(turns, self.max_turns)] += 1
+        seat = winner_seat(winner, stats)
+        if seat is None:
+            slot[self.NO_WINNER] += 1
+        else:
+            slot[self.wins_by_seat + seat] += 1
+            slot[self.wins_by_difficulty + self.difficulties.index(line_up[seat])] += 1
+        for difficulty, player_stats in zip(line_up, stats.values()):
+            difficulty_index = self.difficulties.index(difficulty)
+            for field_index, field in enumerate(PLAYER_STAT_FIELDS):
+                offset = self.stat_offset(difficulty_index, field_index)
+                slot[offset] += player_stats[field]
+                slot[offset + 1] = max(slot[offset + 1], player_stats[field])
+
+    def reduce(self, counters, workers):
+        """Combine the slots of every worker: counts and sums add up, maxima take the largest."""
+        total = [0] * self.size
+        for worker in range(workers):
+            slot = counters[worker * self.size:(worker + 1) * self.size]
+            for offset, value in enumerate(slot):
+                total[offset] = max(total[offset], value) if self.is_maximum(offset) else total[offset] + value
+        return total
+
+def _simulation_worker(counters, worker, workers, layout, difficulties, games, settings):
+    set_special_cards(settings["special_cards"])
+    collector = StatsCollector()
+    store = StatsStore(spill_dir=settings["stats_dirs"][worker]) if settings["stats_dirs"] else None
+    recorder = GameRecorder(settings["record_paths"][worker]) if settings["record_paths"] else None
+    slot = [0] * layout.size
+    for game_index in range(worker, games, workers):
+        line_up = seat_difficulties(difficulties, game_index)
+        seed = settings["base_seed"] + game_index
+        winner, turns, stats = simulate_game(line_up, settings["num_decks"], settings["cards_per_player"], seed=seed,
+                                             recorder=recorder, max_turns=settings["max_turns"], consumers=[collector])
+        layout.add_game(slot, line_up, winner, turns, stats)
+        if store is not None:
+            store.append_game(winner, turns, stats, seed=seed, num_decks=settings["num_decks"],
+                              cards_per_player=settings["cards_per_player"], difficulties=line_up_difficulties(line_up))
+    if store is not None:
+        store.flush()
+    if recorder is not None:
+        recorder.close()
+    counters[worker * layout.size:(worker + 1) * layout.size] = slot
+
+def histogram_percentile(histogram, percent):
+    """Smallest bin index at or below which ``percent`` of the histogram's entries fall."""
+    target = sum(histogram) * percent / 100
+    seen = 0
+    for value, count in enumerate(histogram):
+        seen += count
+        if count and seen >= target:
+            return value
+    return 0
+
+def run_parallel_simulation(difficulties, games=1000, num_decks=1, cards_per_player=7, workers=None, base_seed=0,
+                            max_turns=SIMULATION_MAX_TURNS, stats_store=None, record_path=None):
+    """Play ``games`` AI-only games on ``workers`` processes that total their results in shared memory.
+
+    Game ``i`` uses seed ``base_seed + i`` and the line-up rotated by
+    seat_difficulties, whichever worker plays it, so the totals do not
+    depend on the number of workers. Every game is also appended to the
+    StatsStore ``stats_store`` and the record file ``record_path``, if
+    given: each worker writes to files of its own, merged in game order
+    once the workers are done.
+    """
+    workers = min(workers or os.cpu_count() or 1, max(games, 1))
+    layout = SimulationTotals(difficulties, max_turns)
+    counters = multiprocessing.RawArray('q', layout.size * workers)
+    parts_dir = tempfile.mkdtemp(prefix="blackjack-simulation-") if stats_store is not None or record_path else None
+    settings = {"special_cards": dict(special_cards or DEFAULT_SPECIAL_CARDS), "num_decks": num_decks,
+                "cards_per_player": cards_per_player, "max_turns": max_turns, "base_seed": base_seed,
+                "stats_dirs": [os.path.join(parts_dir, f"stats-{worker}") for worker in range(workers)]
+                if stats_store is not None else None,
+                "record_paths": [os.path.join(parts_dir, f"games-{worker}.bjrec") for worker in range(workers)]
+                if record_path else None}
+    start = time.perf_counter()
+    # Even a single worker gets its own process, so no run inherits the endgame table warmed up by another
+    processes = [multiprocessing.Process(target=_simulation_worker,
+                                         args=(counters, worker, workers, layout, list(difficulties), games, settings))
+                 for worker in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    seconds = time.perf_counter() - start
+    try:
+        if any(process.exitcode for process in processes):
+            raise RuntimeError("A simulation worker failed")
+        if stats_store is not None:
+            stats_store.merge_spilled(settings["stats_dirs"])
+        if record_path:
+            merge_record_files(settings["record_paths"], record_path)
+    finally:
+        if parts_dir:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+    total = layout.reduce(counters, workers)
+
+    seats_by_difficulty = collections.Counter(difficulties)
+    histogram = total[layout.turn_histogram:layout.player_stats]
+    player_stats = {}
+    for difficulty_index, difficulty in enumerate(layout.difficulties):
+        players = games * seats_by_difficulty[difficulty]
+        player_stats[difficulty] = {}
+        for field_index, field in enumerate(PLAYER_STAT_FIELDS):
+            offset = layout.stat_offset(difficulty_index, field_index)
+            player_stats[difficulty][field] = {"mean": total[offset] / players if players else 0.0,
+                                               "max": total[offset + 1]}
+    return {
+        "games": total[layout.GAMES],
+        "no_winner": total[layout.NO_WINNER],
+        "workers": workers,
+        "seconds": seconds,
+        "games_per_second": games / seconds if seconds else math.inf,
+        "turns": {"mean": sum(turns * count for turns, count in enumerate(histogram)) / games if games else 0.0,
+                  "p50": histogram_percentile(histogram, 50), "p90": histogram_percentile(histogram, 90),
+                  "max": max((turns for turns, count in enumerate(histogram) if count), default=0)},
+        "win_rate_by_seat": [total[layout.wins_by_seat + seat] / games for seat in range(len(difficulties))],
+        "win_rate_by_difficulty": {difficulty: total[layout.wins_by_difficulty + i] / (games * seats_by_difficulty[difficulty])
+                                   for i, difficulty in enumerate(layout.difficulties)},
+        "player_stats": player_stats,
+        "totals": total,
+    }
+
+def run_simulation_throughput(difficulties, games=1000, core_counts=SIMULATION_CORE_COUNTS, stats_store=None,
+                              record_path=None, **kwargs):
+    """Run the same parallel simulation once per core count and report games per second for each.
+
+    None means all cores. Counts above os.cpu_count() still run, which
+    shows the process overhead on small machines. Every run plays the same
+    seeded games, so their totals must agree, and only the first run fills
+    the StatsStore ``stats_store`` and records its games to ``record_path``.
+    """
+    cores = os.cpu_count() or 1
+    counts = sorted({count or cores for count in core_counts})
+    runs = [run_parallel_simulation(difficulties, games, workers=count,
+                                    stats_store=stats_store if index == 0 else None,
+                                    record_path=record_path if index == 0 else None, **kwargs)
+            for index, count in enumerate(counts)]
+    return {"cores": cores, "runs": runs, "consistent": all(run["totals"] == runs[0]["totals"] for run in runs)}
+
+
+# Long series with AIs that keep what they learn
+
+def run_series(difficulties, games=1000, num_decks=1, cards_per_player=7, base_seed=0, max_turns=SIMULATION_MAX_TURNS,
+               checkpoint_path=None, checkpoint_seconds=CHECKPOINT_SECONDS, stats_store=None):
+    """Play a series of AI-only games with the same AIs throughout, like an interactive session without humans.
+
+    The AIs play with the interactive consumers, so what the
+    DifficultyAdjuster changes carries from one game to the next. Game seeds
+    are drawn from one stream seeded with ``base_seed``. The games played,
+    overall scores, aggregated stats, the seed stream's position and every
+    AI's learned state are checkpointed to ``checkpoint_path`` between
+    games; a series restarted with the same arguments (``games`` may grow)
+    resumes after the last checkpointed game and ends exactly as an
+    uninterrupted series would. The games played by this call are also
+    appended to the StatsStore ``stats_store``, if given.
+    """
+    ai_difficulties = {f'AI PLAYER {i+1}': difficulty for i, difficulty in enumerate(difficulties)}
+    ai_players = {name: AIPlayer(name, difficulty) for name, difficulty in ai_difficulties.items()}
+    labels = {name: f"{name}[{difficulty.capitalize()}]" for name, difficulty in ai_difficulties.items()}
+    overall_scores = {label: 0 for label in labels.values()}
+    turns = StreamingStat()
+    player_stats = {field: StreamingStat() for field in PLAYER_STAT_FIELDS}
+    wins_by_seat = collections.Counter()
+    no_winner = games_played = 0
+    seed_rng = random.Random(base_seed)
+
+    checkpointer = Checkpointer(checkpoint_path, json.dumps([list(difficulties), num_decks, cards_per_player, base_seed,
+                                                            max_turns, special_cards_key(special_cards)]),
+                                checkpoint_seconds)
+    checkpoint = checkpointer.load()
+    if checkpoint:
+        games_played = checkpoint["games_played"]
+        overall_scores.update(checkpoint["overall_scores"])
+        turns.load_state(checkpoint["turns"])
+        for field, state in checkpoint["player_stats"].items():
+            player_stats[field].load_state(state)
+        wins_by_seat.update(dict(checkpoint["wins_by_seat"]))
+        no_winner = checkpoint["no_winner"]
+        version, internal, gauss = checkpoint["seed_rng"]
+        seed_rng.setstate((version, tuple(internal), gauss))
+        for name, state in checkpoint["ai_players"].items():
+            ai_players[name].restore_learned_state(state)
+    resumed_from = games_played
+
+    def save_checkpoint():
+        checkpointer.save({
+            "games_played": games_played, "overall_scores": overall_scores, "turns": turns.state(),
+            "player_stats": {field: stat.state() for field, stat in player_stats.items()},
+            "wins_by_seat": sorted(wins_by_seat.items()), "no_winner": no_winner, "seed_rng": seed_rng.getstate(),
+            "ai_players": {name: ai_player.learned_state() for name, ai_player in ai_players.items()},
+        })
+
+    consumers = default_consumers(beliefs=False)
+    start = time.perf_counter()
+    while games_played < games:
+        seed_state = seed_rng.getstate()
+        learned_states = {name: ai_player.learned_state() for name, ai_player in ai_players.items()}
+        seed = seed_rng.randrange(2**63)
+        try:
+            winner, turn_count, stats = simulate_game(difficulties, num_decks, cards_per_player, seed=seed,
+                                                      max_turns=max_turns, consumers=consumers, ai_players=ai_players)
+        except KeyboardInterrupt:
+            # Checkpoint the series as it stood after the last finished game, so a resume replays this one
+            seed_rng.setstate(seed_state)
+            for name, state in learned_states.items():
+                ai_players[name].restore_learned_state(state)
+            save_checkpoint()
+            raise
+        if stats_store is not None:
+            stats_store.append_game(winner, turn_count, stats, seed=seed, num_decks=num_decks,
+                                    cards_per_player=cards_per_player, difficulties=ai_difficulties)
+        games_played += 1
+        turns.add(turn_count)
+        for player_stat in stats.values():
+            for field in PLAYER_STAT_FIELDS:
+                player_stats[field].add(player_stat[field])
+        seat = winner_seat(winner, stats)
+        if seat is None:
+            no_winner += 1
+        else:
+            wins_by_seat[seat] += 1
+            overall_scores[labels[winner.name]] += 1
+        if checkpointer.due():
+            save_checkpoint()
+    save_checkpoint()
+
+    return {
+        "games": games_played, "resumed_from": resumed_from, "seconds": time.perf_counter() - start,
+        "overall_scores": overall_scores, "no_winner": no_winner,
+        "turns": {"mean": turns.mean, "p50": turns.percentile(50), "p90": turns.percentile(90), "max": turns.maximum},
+        "win_rate_by_seat": [wins_by_seat[seat] / games_played if games_played else 0.0 for seat in range(len(difficulties))],
+        "player_stats": {field: {"mean": stat.mean, "max": stat.maximum} for field, stat in player_stats.items()},
+        "difficulties": {labels[name]: ai_player.difficulty for name, ai_player in ai_players.items()},
+    }
+
+# Rating tournaments
+
+ELO_SCALE = 400 / math.log(10)  # Elo points per unit of Bradley-Terry log-strength
+TOURNAMENT_PRIOR_GAMES = 0.5  # Virtual win each way per pairing, so unbeaten AIs still get a finite rating
+TOURNAMENT_SEGMENT_GAMES = 200  # Games a pairing plays per task, so an interrupted tournament loses at most this many
+
+def elo_to_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def score_to_elo(score):
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def sprt_bounds(alpha=0.05, beta=0.05):
+    """Log-likelihood ratio bounds (accept H0 below, H1 above) for Wald's SPRT."""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def sprt_llr(wins, losses, elo0, elo1):
+    """Log-likelihood ratio of H1 (Elo difference elo1) over H0 (elo0) after ``wins`` and ``losses``."""
+    p0, p1 = elo_to_score(elo0), elo_to_score(elo1)
+    return wins * math.log(p1 / p0) + losses * math.log((1 - p1) / (1 - p0))
+
+def pairing_line_up(first, second, player_counts, game_index):
+    """Seats for game ``game_index`` of a pairing, cycling player counts and alternating who sits first."""
+    num_players = player_counts[game_index % len(player_counts)]
+    start = (game_index // len(player_counts)) % 2
+    return [first if (seat + start) % 2 == 0 else second for seat in range(num_players)]
+
+def _pairing_worker(task):
+    first, second, player_counts, elo_margin, alpha, beta, max_games, base_seed, settings, progress = task
+    set_special_cards(settings["special_cards"])
+    lower, upper = sprt_bounds(alpha, beta)
+    next_game, wins, losses, no_winner = progress
+    llr = sprt_llr(wins, losses, -elo_margin, elo_margin)
+    decision = None
+    for game_index in range(next_game, min(max_games, next_game + TOURNAMENT_SEGMENT_GAMES)):
+        next_game = game_index + 1
+        line_up = pairing_line_up(first, second, player_counts, game_index)
+        winner, _, stats = simulate_game(line_up, settings["num_decks"], settings["cards_per_player"],
+                                         seed=base_seed + game_index, max_turns=settings["max_turns"])
+        seat = winner_seat(winner, stats)
+        if seat is None:
+            no_winner += 1
+            continue
+        if line_up[seat] == first:
+            wins += 1
+        else:
+            losses += 1
+        llr = sprt_llr(wins, losses, -elo_margin, elo_margin)
+        if llr >= upper:
+            decision = first
+            break
+        if llr <= lower:
+            decision = second
+            break
+    return first, second, next_game, wins, losses, no_winner, llr, decision
+
+def fit_bradley_terry(names, wins, prior=TOURNAMENT_PRIOR_GAMES, iterations=1000, tolerance=1e-10):
+    """Fit Bradley-Terry strengths to ``wins[(a, b)]`` (games a beat b) and return Elo ratings and standard errors.
+
+    Strengths are found with Hunter's MM iteration. Ratings are centred on
+    zero; standard errors come from the pseudo-inverse of the Fisher
+    information, which has the all-equal direction as its null space.
+    """
+    count = len(names)
+    index = {name: i for i, name in enumerate(names)}
+    won = [[0.0] * count for _ in range(count)]
+    for (winner, loser), games in wins.items():
+        won[index[winner]][index[loser]] += games
+    met = [[i != j and bool(won[i][j] or won[j][i]) for j in range(count)] for i in range(count)]
+    # The prior adds the same pseudo-wins to both sides of every pair that met, before any totals are taken
+    for i in range(count):
+        for j in range(count):
+            if met[i][j]:
+                won[i][j] += prior
+    played = [[won[i][j] + won[j][i] if met[i][j] else 0.0 for j in range(count)] for i in range(count)]
+
+    strength = [1.0] * count
+    for _ in range(iterations):
+        updated = []
+        for i in range(count):
+            denominator = sum(played[i][j] / (strength[i] + strength[j]) for j in range(count) if played[i][j])
+            updated.append(sum(won[i]) / denominator if denominator else strength[i])
+        scale = math.exp(sum(math.log(value) for value in updated) / count)
+        updated = [value / scale for value in updated]
+        change = max(abs(a - b) for a, b in zip(updated, strength))
+        strength = updated
+        if change < tolerance:
+            break
+    theta = [math.log(value) for value in strength]
+
+    information = [[0.0] * count for _ in range(count)]
+    for i in range(count):
+        for j in range(count):
+            if i != j and played[i][j]:
+                p = strength[i] / (strength[i] + strength[j])
+                weight = played[i][j] * p * (1 - p)
+                information[i][i] += weight
+                information[i][j] -= weight
+    shifted = [[information[i][j] + 1 / count for j in range(count)] for i in range(count)]
+    covariance = invert_matrix(shifted)
+    ratings = {name: theta[i] * ELO_SCALE for name, i in index.items()}
+    errors = {name: math.sqrt(max(covariance[i][i] - 1 / count, 0.0)) * ELO_SCALE for name, i in index.items()}
+    return ratings, errors
+
+def invert_matrix(matrix):
+    """Gauss-Jordan inverse of a small square matrix given as a list of rows."""
+    size = len(matrix)
+    rows = [list(row) + [1.0 if i == j else 0.0 for j in range(size)] for i, row in enumerate(matrix)]
+    for column in range(size):
+        pivot = max(range(column, size), key=lambda row: abs(rows[row][column]))
+        if abs(rows[pivot][column]) < 1e-12:
+            raise ValueError("Matrix is singular")
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        factor = rows[column][column]
+        rows[column] = [value / factor for value in rows[column]]
+        for row in range(size):
+            if row != column and rows[row][column]:
+                factor = rows[row][column]
+                rows[row] = [value - factor * pivot_value for value, pivot_value in zip(rows[row], rows[column])]
+    return [row[size:] for row in rows]
+
+def run_tournament(difficulties, player_counts=(2, 3, 4), elo_margin=30, alpha=0.05, beta=0.05, max_games=2000,
+                   num_decks=1, cards_per_player=7, workers=None, base_seed=0, max_turns=SIMULATION_MAX_TURNS,
+                   checkpoint_path=None, checkpoint_seconds=CHECKPOINT_SECONDS):
+    """Play every pairing of ``difficulties`` until its SPRT decides (or ``max_games``), then fit ratings.
+
+    Each pairing tests H0 "the second AI is ``elo_margin`` stronger" against
+    H1 "the first AI is ``elo_margin`` stronger". Pairings run in parallel on
+    a process pool, TOURNAMENT_SEGMENT_GAMES games per task; the games of
+    one pairing run in order so the test can stop as soon as the
+    log-likelihood ratio leaves its bounds. The progress of every pairing
+    is checkpointed to ``checkpoint_path``, and a tournament restarted with
+    the same arguments carries on from the last finished segments.
+    """
+    settings = {"special_cards": dict(special_cards or DEFAULT_SPECIAL_CARDS), "num_decks": num_decks,
+                "cards_per_player": cards_per_player, "max_turns": max_turns}
+    pairs = list(itertools.combinations(difficulties, 2))
+    checkpointer = Checkpointer(checkpoint_path, json.dumps([list(difficulties), list(player_counts), elo_margin, alpha,
+                                                            beta, max_games, base_seed, settings], sort_keys=True),
+                                checkpoint_seconds)
+    checkpoint = checkpointer.load()
+    # Per pairing: next game, first's wins, second's wins, games with no winner, llr and decision
+    progress = {pair: [0, 0, 0, 0, 0.0, None] for pair in pairs}
+    if checkpoint:
+        progress.update((tuple(entry[:2]), entry[2:]) for entry in checkpoint["pairings"])
+
+    def save_checkpoint():
+        checkpointer.save({"pairings": [list(pair) + entry for pair, entry in progress.items()]})
+
+    def unfinished():
+        return [(first, second, list(player_counts), elo_margin, alpha, beta, max_games, base_seed, settings,
+                 progress[first, second][:4])
+                for first, second in pairs
+                if progress[first, second][5] is None and progress[first, second][0] < max_games]
+
+    saved_special_cards = dict(special_cards)
+    try:
+        tasks = unfinished()
+        while tasks:
+            for first, second, *entry in iter_tasks(_pairing_worker, tasks, workers):
+                progress[first, second] = entry
+                if checkpointer.due():
+                    save_checkpoint()
+            tasks = unfinished()
+    except KeyboardInterrupt:
+        save_checkpoint()
+        raise
+    finally:
+        set_special_cards(saved_special_cards)
+    save_checkpoint()
+
+    pairings = []
+    wins = collections.Counter()
+    for (first, second), (_, first_wins, second_wins, no_winner, llr, decision) in progress.items():
+        games = first_wins + second_wins
+        score = first_wins / games if games else 0.5
+        margin = 1.96 * math.sqrt(score * (1 - score) / games) if games else 0.5
+        pairings.append({
+            "first": first, "second": second, "wins": first_wins, "losses": second_wins, "no_winner": no_winner,
+            "llr": llr, "decision": decision, "elo": score_to_elo(score),
+            "elo_low": score_to_elo(score - margin), "elo_high": score_to_elo(score + margin),
+        })
+        wins[(first, second)] += first_wins
+        wins[(second, first)] += second_wins
+    ratings, errors = fit_bradley_terry(list(difficulties), wins)
+    return {"pairings": pairings, "ratings": ratings, "errors": errors, "max_games": max_games,
+            "bounds": sprt_bounds(alpha, beta), "elo_margin": elo_margin}
+
+# Duplicate-deal evaluation
+
+PLAIN_SEED_OFFSET = 1 << 32  # Plain games use seeds that no duplicate deal uses
+
+def duplicate_rotations(line_up):
+    """Every rotation of a seat line-up, so each strategy plays each seat of a deal once."""
+    return [list(line_up[shift:]) + list(line_up[:shift]) for shift in range(len(line_up))]
+
+def relative_scores(line_up, seat, strategies):
+    """Score of each strategy in one game relative to its fair share of wins (0 for everyone with no winner)."""
+    if seat is None:
+        return [0.0] * len(strategies)
+    seats_held = collections.Counter(line_up)
+    return [(1 / seats_held[strategy] if line_up[seat] == strategy else 0.0) - seats_held[strategy] / len(line_up)
+            for strategy in strategies]
+
+def _duplicate_worker(task):
+    line_up, strategies, first_deal, deals, base_seed, duplicate, settings = task
+    set_special_cards(settings["special_cards"])
+    samples = []
+    for deal in range(first_deal, first_deal + deals):
+        if duplicate:
+            # Same seed, so the same shoe order and deal for every rotation
+            rotations = duplicate_rotations(line_up)
+            seeds = [base_seed + deal] * len(rotations)
+        else:
+            rotations = [duplicate_rotations(line_up)[deal % len(line_up)]]
+            seeds = [base_seed + PLAIN_SEED_OFFSET + deal]
+        totals = [0.0] * len(strategies)
+        for rotation, seed in zip(rotations, seeds):
+            winner, _, stats = simulate_game(rotation, settings["num_decks"], settings["cards_per_player"], seed=seed,
+                                             max_turns=settings["max_turns"])
+            for i, score in enumerate(relative_scores(rotation, winner_seat(winner, stats), strategies)):
+                totals[i] += score
+        samples.append([total / len(rotations) for total in totals])
+    return duplicate, samples
+
+def run_duplicate_evaluation(line_up, deals=200, num_decks=1, cards_per_player=7, workers=None, base_seed=0,
+                             max_turns=SIMULATION_MAX_TURNS, compare_plain=True):
+    """Score the strategies in ``line_up`` on duplicate deals, optionally against the same number of plain games.
+
+    Each deal is played once per rotation of ``line_up``. A strategy's deal
+    score is its average win share above its fair share, so luck of the
+    deal largely cancels. With ``compare_plain`` the same number of games is
+    also played on fresh deals (one rotation each) and the variance
+    reduction is measured as the ratio of games needed for equal error.
+    """
+    if deals < 1:
+        raise ValueError("deals must be at least 1")
+    strategies = list(dict.fromkeys(line_up))
+    settings = {"special_cards": dict(special_cards or DEFAULT_SPECIAL_CARDS), "num_decks": num_decks,
+                "cards_per_player": cards_per_player, "max_turns": max_turns}
+    plain_games = deals * len(line_up) if compare_plain else 0
+    tasks = [(list(line_up), strategies, first, min(SWEEP_CHUNK_GAMES, deals - first), base_seed, True, settings)
+             for first in range(0, deals, SWEEP_CHUNK_GAMES)]
+    tasks += [(list(line_up), strategies, first, min(SWEEP_CHUNK_GAMES, plain_games - first), base_seed, False, settings)
+              for first in range(0, plain_games, SWEEP_CHUNK_GAMES)]
+    saved_special_cards = dict(special_cards)
+    try:
+        outputs = run_tasks(_duplicate_worker, tasks, workers)
+    finally:
+        set_special_cards(saved_special_cards)
+
+    duplicate_stats = [StreamingStat(bin_width=0.01) for _ in strategies]
+    plain_stats = [StreamingStat(bin_width=0.01) for _ in strategies]
+    for duplicate, samples in outputs:
+        target = duplicate_stats if duplicate else plain_stats
+        for sample in samples:
+            for stat, score in zip(target, sample):
+                stat.add(score)
+
+    results = []
+    for strategy, duplicate_stat, plain_stat in zip(strategies, duplicate_stats, plain_stats):
+        result = {"strategy": strategy, "seats": line_up.count(strategy), "mean": duplicate_stat.mean,
+                  "stderr": duplicate_stat.stdev / math.sqrt(duplicate_stat.count)}
+        if plain_stat.count:
+            result["plain_mean"] = plain_stat.mean
+            result["plain_stderr"] = plain_stat.stdev / math.sqrt(plain_stat.count)
+            result["variance_reduction"] = (result["plain_stderr"] / result["stderr"]) ** 2 if result["stderr"] else math.inf
+        results.append(result)
+    return {"line_up": list(line_up), "deals": deals, "games": deals * len(line_up), "plain_games": plain_games,
+            "results": results}
+
+# Large-table scaling benchmark
+
+DEFAULT_SCALING_TABLES = [(4, 1), (10, 2), (20, 4), (40, 8)]  # (players, decks)
+BENCHMARK_DIFFICULTIES = ['easy', 'medium', 'hard', 'adaptive', 'learning']
+SUPERLINEAR_GROWTH = 2.0  # Per-turn cost growth (largest vs smallest table) that counts as not flat
+SUPERLINEAR_MIN_SHARE = 0.01  # Ignore functions below this share of the largest table's per-turn time
+
+def benchmark_table(num_players, num_decks, games, cards_per_player=7, base_seed=0, profile=None, consumers=()):
+    """Play ``games`` silent AI games at one table size and return (turns, seconds)."""
+    line_up = [BENCHMARK_DIFFICULTIES[seat % len(BENCHMARK_DIFFICULTIES)] for seat in range(num_players)]
+    total_turns = 0
+    start = time.perf_counter()
+    if profile:
+        profile.enable()
+    for game in range(games):
+        _, turns, _ = simulate_game(line_up, num_decks, cards_per_player, seed=base_seed + game, consumers=consumers)
+        total_turns += turns
+    if profile:
+        profile.disable()
+    return total_turns, time.perf_counter() - start
+
+def per_turn_function_times(profile, turns):
+    """Map each profiled function to its own (exclusive) time per game turn."""
+    import pstats  # Only the benchmark profiles, so sweep workers don't pay for importing it
+    stats = pstats.Stats(profile).stats
+    return {f"{os.path.basename(filename)}:{line}({name})": entry[2] / turns
+            for (filename, line, name), entry in stats.items()}
+
+def run_scaling_benchmark(tables=DEFAULT_SCALING_TABLES, games=20, cards_per_player=7, base_seed=0, top=12):
+    """Time AI turns at growing table sizes, then profile the smallest and largest tables.
+
+    Functions whose exclusive time per turn grows by more than
+    SUPERLINEAR_GROWTH from the smallest to the largest table are reported
+    as the paths that still scale with the number of players or decks.
+    """
+    rows = []
+    for num_players, num_decks in tables:
+        turns, seconds = benchmark_table(num_players, num_decks, games, cards_per_player, base_seed)
+        events = EventProfiler(kinds=('turn', 'move'))  # A second pass, so the timing above stays unobserved
+        benchmark_table(num_players, num_decks, games, cards_per_player, base_seed, consumers=[events])
+        rows.append({"players": num_players, "decks": num_decks, "games": games, "turns": turns,
+                     "us_per_turn": seconds / max(turns, 1) * 1e6,
+                     "worst_move_ms": (events.move_seconds.maximum or 0.0) * 1000})
+
+    import cProfile
+    profiles = []
+    for num_players, num_decks in (tables[0], tables[-1]):
+        profile = cProfile.Profile()
+        turns, _ = benchmark_table(num_players, num_decks, games, cards_per_player, base_seed, profile=profile)
+        profiles.append((profile, max(turns, 1)))
+    small = per_turn_function_times(*profiles[0])
+    large = per_turn_function_times(*profiles[-1])
+    large_total = sum(large.values())
+    hotspots = sorted(large.items(), key=lambda item: -item[1])[:top]
+    growth = []
+    for function, cost in large.items():
+        if cost < large_total * SUPERLINEAR_MIN_SHARE:
+            continue
+        ratio = cost / small[function] if small.get(function) else math.inf
+        if ratio > SUPERLINEAR_GROWTH:
+            growth.append((function, small.get(function, 0.0), cost, ratio))
+    growth.sort(key=lambda item: -item[2])
+    return {"rows": rows, "hotspots": hotspots, "growth": growth, "large_total": large_total}
+
+# Branching factors and pathological positions
+
+def run_branching_survey(difficulties, games=100, num_decks=1, cards_per_player=7, base_seed=0, dump_path=None,
+                         time_threshold=BRANCHING_TIME_THRESHOLD, count_threshold=BRANCHING_COUNT_THRESHOLD,
+                         max_turns=SIMULATION_MAX_TURNS):
+    """Play silent AI games under a BranchingProfiler and return its histograms and the positions it dumped."""
+    profiler = BranchingProfiler(dump_path, time_threshold, count_threshold)
+    start = time.perf_counter()
+    for game_index in range(games):
+        simulate_game(seat_difficulties(difficulties, game_index), num_decks, cards_per_player,
+                      seed=base_seed + game_index, max_turns=max_turns, consumers=[profiler])
+    return {"games": games, "seconds": time.perf_counter() - start, "metrics": profiler.totals, "dumped": profiler.dumped,
+            "dump_path": dump_path, "time_threshold": time_threshold, "count_threshold": count_threshold}
+
+def load_position_cases(path):
+    """Read the positions a BranchingProfiler dumped, one JSON object per line."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def time_best(function, repeats, before=None):
+    """Best of ``repeats`` timed calls (``before`` runs untimed ahead of each); returns (seconds, last result)."""
+    best = math.inf
+    result = None
+    for _ in range(repeats):
+        if before:
+            before()
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def benchmark_position(case, repeats=5):
+    """Time move generation, the AI's decision and (when the case says what was played) effect resolution on one
+    dumped position, under the rules it was dumped with.
+
+    The endgame table is emptied before every timed decision, so each
+    repeat solves the position from scratch as it did in the game.
+    """
+    set_special_cards(case["special_cards"])
+    hand, top_card, pick_up_stack = list(case["hand"]), case["top_card"], case["pick_up_stack"]
+    timings = {}
+    timings["single_cards"], single_cards = time_best(lambda: find_valid_single_cards(hand, top_card), repeats)
+    timings["runs"], runs = time_best(lambda: find_valid_runs(hand, top_card, single_cards), repeats)
+    if pick_up_stack:
+        timings["pickup_runs"], _ = time_best(lambda: find_pickup_runs(hand), repeats)
+    if case["difficulty"] != 'human':
+        ai_player = AIPlayer('AI PLAYER 1', case["difficulty"])
+        if pick_up_stack:
+            pickup_cards = [card for card in hand if is_pickup_card(card)]
+            cancel_cards = [card for card in hand if card_effect(card) == CANCEL]
+            decide = lambda: ai_player.respond_to_pick_up(list(hand), pick_up_stack, pickup_cards, cancel_cards)
+        else:
+            decide = lambda: ai_player.play_turn(list(hand), top_card, single_cards, runs, case["num_opponents"])
+
+        def reset():
+            clear_endgame_table()
+            random.seed(case.get("seed", 0))
+        timings["decision"], _ = time_best(decide, repeats, before=reset)
+    if case.get("played"):
+        players = [AIPlayer('AI PLAYER 1', case["difficulty"])] + [f'PLAYER {seat + 2}' for seat in range(case["num_opponents"])]
+        game_states = []
+
+        def new_game_state():
+            game_state = GameState(players)
+            game_state.pick_up_stack = pick_up_stack
+            game_states[:] = [game_state]
+        timings["effects"], _ = time_best(lambda: resolve_effects(case["played"], players[0], game_states[0],
+                                                                  lambda player: suits[0]),
+                                          repeats, before=new_game_state)
+    return {"case": case, "runs": len(runs), "timings": timings}
+
+def run_position_benchmark(path, repeats=5):
+    """Replay every position dumped to ``path`` as a standalone benchmark case."""
+    saved_special_cards = dict(special_cards)
+    try:
+        return [benchmark_position(case, repeats) for case in load_position_cases(path)]
+    finally:
+        set_special_cards(saved_special_cards)
+
+# Position corpus and performance regression checks
+#
+# The corpus is a JSON-lines file of positions taken from recorded AI games
+# (the same case format BranchingProfiler dumps), chosen to cover every
+# difficulty, Pick Up responses, Cover chains, endgames and 1-4 deck shoes.
+# run_corpus_benchmark times three phases over it and compares them with a
+# baseline JSON file kept next to it.
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+CORPUS_PATH = os.path.join(BENCHMARK_DIR, 'position_corpus.jsonl')
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, 'position_baseline.json')
+CORPUS_DECKS = [1, 2, 3, 4]
+CORPUS_CATEGORIES = ['turn', 'pick up', 'cover', 'endgame']
+BENCHMARK_PHASES = {"move_generation": ("single_cards", "runs", "pickup_runs"), "decision": ("decision",),
+                    "effects": ("effects",)}
+MAX_REGRESSION_PERCENT = 25.0
+
+def corpus_line_up(num_decks, game_index, cards_per_player=7):
+    """Rotate through every benchmark difficulty with as many seats as the shoe can deal to."""
+    seats = min(len(BENCHMARK_DIFFICULTIES), (52 * num_decks - 19) // cards_per_player)
+    return seat_difficulties(BENCHMARK_DIFFICULTIES, game_index)[:seats]
+
+def recorded_positions(record_path, line_ups, rules):
+    """Yield the position in front of every turn of a record file, as benchmark cases.
+
+    ``line_ups`` maps each game id to the difficulties in seat order. A
+    case is a 'pick up' when the player faced a Pick Up stack, 'cover' when
+    they were playing again on their own Cover card, 'endgame' when their
+    AI would hand the position to its endgame search, and 'turn' otherwise.
+    """
+    state = start = previous = None
+    with GameRecordReader(record_path) as reader:
+        for record in reader:
+            if isinstance(record, GameStartRecord):
+                start, previous = record, None
+            elif isinstance(record, KeyframeRecord):
+                state = ReplayState(record)
+            elif isinstance(record, TurnRecord) and state is not None:
+                hand = [card_name(card) for card in state.hands[record.seat]]
+                difficulty = line_ups[record.game_id][record.seat]
+                if record.action != ACTION_PASS and hand:
+                    if state.pick_up_stack:
+                        category = 'pick up'
+                    elif previous and previous.seat == record.seat and previous.flags & TURN_FLAG_PLAY_AGAIN:
+                        category = 'cover'
+                    elif AIPlayer(f'AI PLAYER {record.seat + 1}', difficulty).solves_endgame(hand):
+                        category = 'endgame'
+                    else:
+                        category = 'turn'
+                    yield {"category": category, "difficulty": difficulty, "hand": hand,
+                           "top_card": card_name(state.top_card), "pick_up_stack": state.pick_up_stack,
+                           "num_opponents": sum(1 for seat, cards in enumerate(state.hands) if cards and seat != record.seat),
+                           "num_decks": start.num_decks, "special_cards": rules, "seed": start.seed,
+                           "turn": record.turn, "played": [card_name(card) for card in record.played]}
+                state.apply_turn(record)
+                previous = record
+            elif isinstance(record, ReshuffleRecord) and state is not None:
+                state.apply_reshuffle(record)
+
+def build_position_corpus(path=CORPUS_PATH, games=30, per_group=2, cards_per_player=7, base_seed=0):
+    """Record ``games`` AI games per shoe size and keep ``per_group`` positions per (difficulty, decks, category).
+
+    Returns the number of positions written.
+    """
+    rules = dict(special_cards or DEFAULT_SPECIAL_CARDS)
+    saved_special_cards = dict(special_cards)
+    set_special_cards(rules)
+    groups = collections.defaultdict(list)
+    directory = tempfile.mkdtemp(prefix="blackjack-corpus-")
+    try:
+        for num_decks in CORPUS_DECKS:
+            record_path = os.path.join(directory, f"decks{num_decks}.bjrec")
+            line_ups = {}
+            with GameRecorder(record_path) as recorder:
+                for game_index in range(games):
+                    line_ups[game_index] = corpus_line_up(num_decks, game_index, cards_per_player)
+                    simulate_game(line_ups[game_index], num_decks, cards_per_player, recorder=recorder,
+                                  seed=base_seed + num_decks * games + game_index)
+            for case in recorded_positions(record_path, line_ups, rules):
+                groups[case["difficulty"], num_decks, case["category"]].append(case)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+        set_special_cards(saved_special_cards)
+
+    rng = random.Random(base_seed)
+    cases = []
+    for key in sorted(groups):
+        cases.extend(rng.sample(groups[key], min(per_group, len(groups[key]))))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + '.tmp', 'w') as f:
+        for case in cases:
+            f.write(json.dumps(case) + '\n')
+    os.replace(path + '.tmp', path)
+    return len(cases)
+
+def run_corpus_benchmark(corpus_path=CORPUS_PATH, baseline_path=BASELINE_PATH, repeats=7,
+                         max_regression=MAX_REGRESSION_PERCENT, update_baseline=False):
+    """Time every phase over the corpus and compare the totals with the baseline.
+
+    Each case contributes its best of ``repeats`` timings, so a phase total
+    is the sum over the corpus. A phase regresses when its total is more
+    than ``max_regression`` percent above the baseline's. With
+    ``update_baseline`` (or no baseline yet) the totals become the new
+    baseline instead. The baseline records a digest of the corpus; one taken
+    on a different corpus is not compared with, and the report is "stale"
+    until the baseline is rebuilt.
+    """
+    cases = load_position_cases(corpus_path)
+    with open(corpus_path, 'rb') as f:
+        corpus_digest = hashlib.sha256(f.read()).hexdigest()
+    saved_special_cards = dict(special_cards)
+    try:
+        rows = [benchmark_position(case, repeats) for case in cases]
+    finally:
+        set_special_cards(saved_special_cards)
+
+    phases = dict.fromkeys(BENCHMARK_PHASES, 0.0)
+    by_category = collections.defaultdict(lambda: dict.fromkeys(BENCHMARK_PHASES, 0.0))
+    for row in rows:
+        for phase, parts in BENCHMARK_PHASES.items():
+            seconds = sum(row["timings"].get(part, 0.0) for part in parts)
+            phases[phase] += seconds
+            by_category[row["case"]["category"]][phase] += seconds
+    coverage = collections.Counter((row["case"]["category"], row["case"]["num_decks"]) for row in rows)
+
+    baseline = None
+    if os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+    comparison = {}
+    stale = baseline is not None and (baseline["cases"] != len(cases) or baseline.get("corpus") != corpus_digest)
+    if baseline is not None and not stale:
+        for phase, seconds in phases.items():
+            base = baseline["phases"].get(phase)
+            change = (seconds / base - 1) * 100 if base else 0.0
+            comparison[phase] = {"baseline": base, "change": change, "regressed": change > max_regression}
+    written = update_baseline or baseline is None
+    if written:
+        with open(baseline_path + '.tmp', 'w') as f:
+            json.dump({"cases": len(cases), "corpus": corpus_digest, "repeats": repeats, "phases": phases,
+                       "python": platform.python_version(), "machine": platform.machine()}, f, indent=2)
+            f.write('\n')
+        os.replace(baseline_path + '.tmp', baseline_path)
+    return {"cases": len(cases), "repeats": repeats, "phases": phases, "by_category": dict(by_category),
+            "coverage": coverage, "baseline": baseline, "comparison": comparison, "max_regression": max_regression,
+            "baseline_written": written, "baseline_path": baseline_path, "stale": stale and not written,
+            "regressed": [phase for phase, result in comparison.items() if result["regressed"]]}
@@ -0,0 +1,358 @@
+"""Per-game statistics: streaming summaries and the columnar statistics store."""
+import collections
+import sys
+import array
+import csv
+import math
+import os
+import shutil
+import tempfile
+
+from .ai import AIPlayer
+
+def get_player_key(player):
+    if isinstance(player, AIPlayer):
+        return f"{player.name}[{player.difficulty.capitalize()}]"
+    return player
+
+def winner_seat(winner, stats):
+    """Seat index of ``winner`` in a play_game result, or None when the game had no winner."""
+    return list(stats).index(winner) if winner is not None else None
+
+DIFFICULTY_CODES = {'human': 0, 'easy': 1, 'medium': 2, 'hard': 3, 'adaptive': 4, 'learning': 5, 'external': 6}
+DIFFICULTY_NAMES = {code: name for name, code in DIFFICULTY_CODES.items()}
+
+# Column layouts for the statistics store: (column name, array typecode)
+GAME_COLUMNS = [
+    ("game_id", 'q'),
+    ("seed", 'Q'),
+    ("winner_seat", 'b'),  # -1 when the game ended without a winner
+    ("turns", 'i'),
+    ("num_players", 'B'),
+    ("num_decks", 'B'),
+    ("cards_per_player", 'B'),
+]
+
+PLAYER_COLUMNS = [
+    ("game_id", 'q'),
+    ("seat", 'B'),
+    ("difficulty", 'B'),  # See DIFFICULTY_CODES
+    ("won", 'B'),
+    ("cards_drawn", 'i'),
+    ("runs_played", 'i'),
+    ("single_cards_played", 'i'),
+    ("longest_run", 'i'),
+]
+
+PLAYER_STAT_FIELDS = ["cards_drawn", "runs_played", "single_cards_played", "longest_run"]
+
+NPY_DESCR = {'b': 'i1', 'B': 'u1', 'i': 'i4', 'I': 'u4', 'q': 'i8', 'Q': 'u8', 'd': 'f8'}
+
+class StreamingStat:
+    """Running mean/variance (Welford) plus an integer histogram for percentiles."""
+
+    def __init__(self, bin_width=1):
+        self.bin_width = bin_width
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.histogram = collections.Counter()
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        self.histogram[int(value // self.bin_width)] += 1
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.minimum, self.maximum = other.minimum, other.maximum
+        else:
+            total = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / total
+            self.m2 += other.m2 + delta * delta * self.count * other.count / total
+            self.count = total
+            self.minimum = min(self.minimum, other.minimum)
+            self.maximum = max(self.maximum, other.maximum)
+        self.histogram.update(other.histogram)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        return math.sqrt(self.variance)
+
+    def percentile(self, q):
+        """Return the q-th percentile (0-100) from the histogram (bin lower edge)."""
+        if self.count == 0:
+            return None
+        target = max(1, math.ceil(self.count * q / 100))
+        seen = 0
+        for bucket in sorted(self.histogram):
+            seen += self.histogram[bucket]
+            if seen >= target:
+                return bucket * self.bin_width
+        return self.maximum
+
+    def histogram_items(self):
+        return [(bucket * self.bin_width, self.histogram[bucket]) for bucket in sorted(self.histogram)]
+
+    def state(self):
+        """JSON-friendly copy of the running totals, for checkpoints."""
+        return {"bin_width": self.bin_width, "count": self.count, "mean": self.mean, "m2": self.m2,
+                "minimum": self.minimum, "maximum": self.maximum, "histogram": sorted(self.histogram.items())}
+
+    def load_state(self, state):
+        """Replace the running totals with ones saved by state(); returns self."""
+        self.bin_width = state["bin_width"]
+        self.count, self.mean, self.m2 = state["count"], state["mean"], state["m2"]
+        self.minimum, self.maximum = state["minimum"], state["maximum"]
+        self.histogram = collections.Counter(dict((bucket, count) for bucket, count in state["histogram"]))
+        return self
+
+class _ColumnTable:
+    """A set of typed columns that spill to disk once the in-memory chunk fills up."""
+
+    def __init__(self, name, columns, spill_dir, chunk_rows):
+        self.name = name
+        self.columns = columns
+        self.spill_dir = spill_dir
+        self.chunk_rows = chunk_rows
+        self.buffers = {column: array.array(typecode) for column, typecode in columns}
+        self.spilled_rows = 0
+
+    def __len__(self):
+        return self.spilled_rows + len(self.buffers[self.columns[0][0]])
+
+    def spill_path(self, column):
+        return os.path.join(self.spill_dir, f"{self.name}.{column}.bin")
+
+    def adopt_spilled(self):
+        """Take over the rows another table with this name already spilled into ``spill_dir``."""
+        column, typecode = self.columns[0]
+        path = self.spill_path(column)
+        self.spilled_rows = os.path.getsize(path) // array.array(typecode).itemsize if os.path.exists(path) else 0
+
+    def append(self, row):
+        for column, _ in self.columns:
+            self.buffers[column].append(row[column])
+        if len(self.buffers[self.columns[0][0]]) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        rows = len(self.buffers[self.columns[0][0]])
+        if rows == 0:
+            return
+        for column, typecode in self.columns:
+            with open(self.spill_path(column), 'ab') as f:
+                self.buffers[column].tofile(f)
+            self.buffers[column] = array.array(typecode)
+        self.spilled_rows += rows
+
+    def iter_column_chunks(self, column):
+        """Yield the column as a sequence of typed arrays, oldest rows first."""
+        typecode = dict(self.columns)[column]
+        path = self.spill_path(column)
+        if self.spilled_rows:
+            with open(path, 'rb') as f:
+                remaining = self.spilled_rows
+                while remaining:
+                    chunk = array.array(typecode)
+                    count = min(remaining, self.chunk_rows)
+                    chunk.fromfile(f, count)
+                    remaining -= count
+                    yield chunk
+        if self.buffers[column]:
+            yield self.buffers[column]
+
+    def column(self, column):
+        result = array.array(dict(self.columns)[column])
+        for chunk in self.iter_column_chunks(column):
+            result.extend(chunk)
+        return result
+
+    def iter_rows(self):
+        names = [column for column, _ in self.columns]
+        chunk_iters = [self.iter_column_chunks(column) for column in names]
+        for chunks in zip(*chunk_iters):
+            for values in zip(*chunks):
+                yield dict(zip(names, values))
+
+class StatsStore:
+    """Columnar store of per-game and per-player statistics.
+
+    Rows are appended into typed arrays and spilled to ``spill_dir`` every
+    ``chunk_rows`` rows, so memory stays bounded however many games are
+    recorded. Aggregates (means, histograms, percentiles, win counts) are
+    updated as rows arrive and never need a second pass over the data.
+    """
+
+    def __init__(self, spill_dir=None, chunk_rows=65536):
+        self.owns_spill_dir = spill_dir is None
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="blackjack-stats-")
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self.games = _ColumnTable("games", GAME_COLUMNS, self.spill_dir, chunk_rows)
+        self.players = _ColumnTable("players", PLAYER_COLUMNS, self.spill_dir, chunk_rows)
+        self.turns = StreamingStat()
+        self.player_stats = {field: StreamingStat() for field in PLAYER_STAT_FIELDS}
+        self.wins_by_seat = collections.Counter()
+        self.wins_by_difficulty = collections.Counter()
+        self.games_by_difficulty = collections.Counter()
+        self.no_winner_games = 0
+
+    def __len__(self):
+        return len(self.games)
+
+    def append_game(self, winner, turns, stats, seed=0, num_decks=1, cards_per_player=0, difficulties=None):
+        """Record one finished game.
+
+        ``stats`` is the per-player dict returned by ``play_game`` (in seat
+        order) and ``difficulties`` maps AI player names to their configured
+        difficulty; players not in it are recorded as human.
+        """
+        difficulties = difficulties or {}
+        seats = list(stats)
+        winner_seat = seats.index(winner) if winner in seats else -1
+        game = {"seed": seed, "winner_seat": winner_seat, "turns": turns, "num_players": len(seats),
+                "num_decks": num_decks, "cards_per_player": cards_per_player}
+        players = []
+        for seat, player in enumerate(seats):
+            name = player.name if isinstance(player, AIPlayer) else player
+            row = {"seat": seat, "difficulty": DIFFICULTY_CODES[difficulties.get(name, 'human')],
+                   "won": 1 if seat == winner_seat else 0}
+            row.update((field, stats[player][field]) for field in PLAYER_STAT_FIELDS)
+            players.append(row)
+        self.append_rows(game, players)
+
+    def append_rows(self, game, players):
+        """Record one game given as its games row and players rows; the game id is assigned here."""
+        game_id = len(self.games)
+        self.games.append(dict(game, game_id=game_id))
+        self.turns.add(game["turns"])
+        if game["winner_seat"] < 0:
+            self.no_winner_games += 1
+        else:
+            self.wins_by_seat[game["winner_seat"]] += 1
+        for row in players:
+            self.players.append(dict(row, game_id=game_id))
+            for field in PLAYER_STAT_FIELDS:
+                self.player_stats[field].add(row[field])
+            difficulty = DIFFICULTY_NAMES[row["difficulty"]]
+            self.games_by_difficulty[difficulty] += 1
+            self.wins_by_difficulty[difficulty] += row["won"]
+
+    def merge_spilled(self, spill_dirs):
+        """Append the games other stores flushed into ``spill_dirs`` (worker processes' stores, say).
+
+        Games are taken from the directories in turn, one at a time, so games
+        dealt out round-robin to workers come back in their original order.
+        Game ids are renumbered to follow this store's.
+        """
+        sources = []
+        for spill_dir in spill_dirs:
+            games = _ColumnTable("games", GAME_COLUMNS, spill_dir, self.games.chunk_rows)
+            players = _ColumnTable("players", PLAYER_COLUMNS, spill_dir, self.players.chunk_rows)
+            games.adopt_spilled()
+            players.adopt_spilled()
+            sources.append((games.iter_rows(), players.iter_rows(), []))
+        while sources:
+            for source in list(sources):
+                game_rows, player_rows, pending = source
+                game = next(game_rows, None)
+                if game is None:
+                    sources.remove(source)
+                    continue
+                seats = []
+                row = pending.pop() if pending else next(player_rows, None)
+                while row is not None and row["game_id"] == game["game_id"]:
+                    seats.append(row)
+                    row = next(player_rows, None)
+                if row is not None:
+                    pending.append(row)  # The first player of the next game
+                self.append_rows(game, seats)
+
+    def flush(self):
+        self.games.flush()
+        self.players.flush()
+
+    def win_rate_by_seat(self):
+        total = len(self.games)
+        return {seat: wins / total for seat, wins in sorted(self.wins_by_seat.items())} if total else {}
+
+    def win_rate_by_difficulty(self):
+        return {difficulty: self.wins_by_difficulty[difficulty] / games
+                for difficulty, games in self.games_by_difficulty.items()}
+
+    def summary(self):
+        summary = {
+            "games": len(self.games),
+            "no_winner_games": self.no_winner_games,
+            "turns": {
+                "mean": self.turns.mean,
+                "stdev": self.turns.stdev,
+                "p50": self.turns.percentile(50),
+                "p90": self.turns.percentile(90),
+                "p99": self.turns.percentile(99),
+                "max": self.turns.maximum,
+            },
+            "win_rate_by_seat": self.win_rate_by_seat(),
+            "win_rate_by_difficulty": self.win_rate_by_difficulty(),
+        }
+        for field, stat in self.player_stats.items():
+            summary[field] = {"mean": stat.mean, "p50": stat.percentile(50), "p90": stat.percentile(90), "max": stat.maximum}
+        return summary
+
+    def export_csv(self, directory):
+        """Write games.csv and players.csv into ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        for table in (self.games, self.players):
+            path = os.path.join(directory, f"{table.name}.csv")
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([column for column, _ in table.columns])
+                for row in table.iter_rows():
+                    writer.writerow(row.values())
+
+    def export_npy(self, directory):
+        """Write one ``<table>.<column>.npy`` file per column into ``directory``."""
+        os.makedirs(directory, exist_ok=True)
+        byte_order = '<' if sys.byteorder == 'little' else '>'
+        for table in (self.games, self.players):
+            for column, typecode in table.columns:
+                descr = NPY_DESCR[typecode]
+                if not descr.endswith('1'):
+                    descr = byte_order + descr
+                else:
+                    descr = '|' + descr
+                path = os.path.join(directory, f"{table.name}.{column}.npy")
+                with open(path, 'wb') as f:
+                    write_npy_header(f, descr, len(table))
+                    for chunk in table.iter_column_chunks(column):
+                        chunk.tofile(f)
+
+    def close(self):
+        if self.owns_spill_dir:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+
+def write_npy_header(f, descr, length):
+    """Write a version 1.0 .npy header for a 1-D array of ``length`` items."""
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({length},), }}"
+    # Magic (6) + version (2) + header length (2) + header + newline, padded to 64 bytes
+    padding = 64 - (10 + len(header) + 1) % 64
+    header = header + ' ' * (padding % 64) + '\n'
+    f.write(b'\x93NUMPY\x01\x00')
+    f.write(len(header).to_bytes(2, 'little'))
+    f.write(header.encode('latin1'))
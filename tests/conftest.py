@@ -0,0 +1,14 @@
+"""Shared fixtures: every test runs under the default special cards, with no pauses between turns."""
+import pytest
+
+from street_blackjack.engine import pacing, set_special_cards, setup_default_special_cards, special_cards
+
+@pytest.fixture(autouse=True)
+def default_rules():
+    saved_special_cards = dict(special_cards)
+    previous_mode = pacing.mode
+    setup_default_special_cards()
+    pacing.set_mode('batch')
+    yield
+    set_special_cards(saved_special_cards)
+    pacing.set_mode(previous_mode)
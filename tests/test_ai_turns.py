@@ -0,0 +1,21 @@
+from street_blackjack.engine import CARD_NAMES
+from street_blackjack.game import play_game
+
+DIFFICULTIES = {'AI PLAYER 1': 'easy', 'AI PLAYER 2': 'medium', 'AI PLAYER 3': 'hard'}
+
+def test_ai_only_games_without_an_event_handler_print_nothing(capsys):
+    winner, turns, _ = play_game(0, 3, 1, 7, DIFFICULTIES, seed=4, event_handler=None)
+    assert turns > 0
+    assert capsys.readouterr().out == ''
+
+def test_ai_turns_are_reported_as_structured_events():
+    events = []
+    winner, _, _ = play_game(0, 3, 1, 7, DIFFICULTIES, seed=4, event_handler=events.append)
+    kinds = {event.kind for event in events}
+    assert {'turn', 'single', 'draw'} <= kinds
+    for event in events:
+        assert all(isinstance(card, int) and 0 <= card < len(CARD_NAMES) for card in event.cards)
+        if event.kind in ('single', 'run'):
+            assert event.cards
+    assert winner is not None
+    assert events[-1].kind == 'win' and events[-1].player is winner
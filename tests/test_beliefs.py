@@ -0,0 +1,42 @@
+from street_blackjack.game import BeliefKeeper
+from street_blackjack.simulation import simulate_game
+
+class BeliefAudit:
+    """At the start of every turn, checks each tracker's particles against the real hand sizes."""
+
+    def __init__(self):
+        self.checked = 0
+
+    def subscribe(self, bus):
+        bus.subscribe('deal', self.on_deal)
+        bus.subscribe('turn', self.on_turn)
+
+    def on_deal(self, event):
+        self.game_state = event.value.game_state
+
+    def on_turn(self, event):
+        hands = self.game_state.player_hands
+        for ai_player in self.game_state.ai_players.values():
+            tracker = ai_player.beliefs
+            if tracker is None:
+                continue
+            hand_sizes = [len(hands[opponent]) for opponent in tracker.opponents]
+            for particle in range(tracker.num_particles):
+                row = tracker.owners[particle * tracker.num_slots:(particle + 1) * tracker.num_slots]
+                assert [row.count(seat) for seat in range(len(tracker.opponents))] == hand_sizes
+                assert row.count(tracker.own) == len(hands[ai_player])
+            for opponent in tracker.opponents:
+                assert 0.0 <= tracker.p_can_answer_pick_up(opponent) <= 1.0
+            self.checked += 1
+
+def test_trackers_follow_the_hands_they_cannot_see():
+    audit = BeliefAudit()
+    for seed in range(6):
+        simulate_game(['hard', 'easy', 'adaptive', 'medium'][:2 + seed % 3], num_decks=1 + seed % 2, seed=seed,
+                      consumers=[BeliefKeeper(), audit])
+    assert audit.checked > 100
+
+def test_games_without_a_keeper_play_without_trackers():
+    audit = BeliefAudit()
+    simulate_game(['hard', 'adaptive'], seed=3, consumers=[audit])
+    assert audit.checked == 0
@@ -0,0 +1,28 @@
+import os
+import sys
+
+from street_blackjack.bots import run_bot_match
+
+SAMPLE_BOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'sample_bot.py')
+
+def bot_command(delay=None):
+    command = f'"{sys.executable}" "{SAMPLE_BOT}"'
+    return f'{command} {delay}' if delay is not None else command
+
+def outcome(report):
+    # Games finish in any order, so the mean may differ in its last bits
+    return report["wins"], report["no_winner"], round(report["mean_turns"], 9), report["decisions"]
+
+def test_concurrent_games_are_reproducible_from_the_seed():
+    first = run_bot_match(bot_command(), ['medium', 'hard'], games=12, concurrency=6, base_seed=5)
+    second = run_bot_match(bot_command(), ['medium', 'hard'], games=12, concurrency=6, base_seed=5)
+    one_at_a_time = run_bot_match(bot_command(), ['medium', 'hard'], games=12, concurrency=1, base_seed=5)
+    assert first["fallbacks"] == second["fallbacks"] == one_at_a_time["fallbacks"] == 0
+    assert outcome(first) == outcome(second) == outcome(one_at_a_time)
+    assert first["exit_code"] is not None
+
+def test_slow_answers_time_out_and_fall_back_to_the_easy_strategy():
+    report = run_bot_match(bot_command(delay=0.3), ['easy'], games=1, concurrency=1, move_timeout=0.05, base_seed=1)
+    assert report["timeouts"] > 0
+    assert report["fallbacks"] == report["timeouts"]
+    assert sum(report["wins"].values()) + report["no_winner"] == 1
@@ -0,0 +1,33 @@
+from street_blackjack.game import BRANCHING_METRICS, BranchingProfiler
+from street_blackjack.simulation import load_position_cases, run_branching_survey, run_position_benchmark, simulate_game
+
+class MoveCounter:
+    def __init__(self):
+        self.moves = 0
+
+    def subscribe(self, bus):
+        bus.subscribe('move', self.on_move)
+
+    def on_move(self, event):
+        self.moves += 1
+
+def test_histograms_cover_every_move_once_the_game_is_won():
+    profiler = BranchingProfiler()
+    counter = MoveCounter()
+    winner, _, _ = simulate_game(['easy', 'hard', 'medium'], seed=11, consumers=[profiler, counter])
+    assert winner is not None
+    for metric in BRANCHING_METRICS:
+        assert profiler.game[metric].count == profiler.totals[metric].count == counter.moves
+        assert sum(profiler.totals[metric].histogram.values()) == counter.moves
+    assert profiler.totals['hand_size'].minimum >= 1
+
+def test_dumped_positions_replay_as_benchmark_cases(tmp_path):
+    dump_path = str(tmp_path / 'positions.jsonl')
+    survey = run_branching_survey(['hard', 'medium'], games=2, base_seed=3, dump_path=dump_path, count_threshold=3)
+    cases = load_position_cases(dump_path)
+    assert cases and cases == survey["dumped"]
+    assert all(max(case["measured"]["runs_generated"], case["measured"]["pickup_combinations"]) > 3 for case in cases)
+    rows = run_position_benchmark(dump_path, repeats=1)
+    assert [row["case"] for row in rows] == cases
+    assert all(row["runs"] == row["case"]["measured"]["runs"] for row in rows if not row["case"]["pick_up_stack"])
+    assert all("decision" in row["timings"] for row in rows)
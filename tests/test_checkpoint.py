@@ -0,0 +1,56 @@
+import pytest
+
+from street_blackjack import simulation
+from street_blackjack.simulation import Checkpointer, run_series
+
+LINE_UP = ['easy', 'medium', 'hard', 'adaptive']
+
+def outcome(report):
+    return {key: value for key, value in report.items() if key not in ('seconds', 'resumed_from')}
+
+def test_checkpoints_belong_to_the_job_that_wrote_them(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    Checkpointer(path, "job a").save({"games_played": 3})
+    assert Checkpointer(path, "job a").load()["games_played"] == 3
+    with pytest.raises(ValueError):
+        Checkpointer(path, "job b").load()
+    assert Checkpointer(None, "job a").load() is None
+
+def test_a_resumed_series_ends_as_an_uninterrupted_one(tmp_path):
+    path = str(tmp_path / "series.json")
+    uninterrupted = run_series(LINE_UP, games=12, base_seed=7)
+    first_half = run_series(LINE_UP, games=5, base_seed=7, checkpoint_path=path)
+    resumed = run_series(LINE_UP, games=12, base_seed=7, checkpoint_path=path)
+    assert first_half["games"] == 5
+    assert resumed["resumed_from"] == 5
+    assert outcome(resumed) == outcome(uninterrupted)
+
+class Interrupter:
+    """Presses Ctrl-C a few moves into a game."""
+
+    def subscribe(self, bus):
+        bus.subscribe('move', self.on_move)
+
+    def on_move(self, event):
+        if event.turn >= 5:
+            raise KeyboardInterrupt
+
+def test_a_series_interrupted_mid_game_resumes_from_the_last_finished_game(tmp_path, monkeypatch):
+    path = str(tmp_path / "series.json")
+    uninterrupted = run_series(LINE_UP, games=12, base_seed=7)
+    calls = []
+    play = simulation.simulate_game
+
+    def interrupted_on_the_sixth_game(*args, **kwargs):
+        calls.append(None)
+        if len(calls) == 6:
+            kwargs["consumers"] = list(kwargs["consumers"]) + [Interrupter()]
+        return play(*args, **kwargs)
+
+    monkeypatch.setattr(simulation, "simulate_game", interrupted_on_the_sixth_game)
+    with pytest.raises(KeyboardInterrupt):
+        run_series(LINE_UP, games=12, base_seed=7, checkpoint_path=path, checkpoint_seconds=3600)
+    monkeypatch.undo()
+    resumed = run_series(LINE_UP, games=12, base_seed=7, checkpoint_path=path)
+    assert resumed["resumed_from"] == 5
+    assert outcome(resumed) == outcome(uninterrupted)
@@ -0,0 +1,45 @@
+import math
+
+import pytest
+
+from street_blackjack.simulation import duplicate_rotations, relative_scores, run_duplicate_evaluation, simulate_game
+
+class DealLog:
+    def __init__(self):
+        self.hands = []
+
+    def subscribe(self, bus):
+        bus.subscribe('deal', self.on_deal)
+
+    def on_deal(self, event):
+        game_state = event.value.game_state
+        self.hands.append([tuple(game_state.player_hands[player]) for player in game_state.players])
+
+def test_every_strategy_plays_every_seat_once():
+    rotations = duplicate_rotations(['easy', 'medium', 'hard'])
+    assert rotations == [['easy', 'medium', 'hard'], ['medium', 'hard', 'easy'], ['hard', 'easy', 'medium']]
+    for seat in range(3):
+        assert sorted(rotation[seat] for rotation in rotations) == ['easy', 'hard', 'medium']
+
+def test_every_rotation_of_a_deal_gets_the_same_cards():
+    log = DealLog()
+    for rotation in duplicate_rotations(['easy', 'medium', 'hard']):
+        simulate_game(rotation, seed=42, consumers=[log])
+    assert log.hands[0] == log.hands[1] == log.hands[2]
+
+def test_scores_are_win_shares_above_the_fair_share():
+    strategies = ['easy', 'hard']
+    assert relative_scores(['easy', 'hard', 'hard'], 1, strategies) == pytest.approx([-1 / 3, 0.5 - 2 / 3])
+    assert relative_scores(['easy', 'hard', 'hard'], 0, strategies) == pytest.approx([1 - 1 / 3, -2 / 3])
+    assert relative_scores(['easy', 'hard', 'hard'], None, strategies) == [0.0, 0.0]
+
+def test_duplicate_scores_of_distinct_strategies_add_up_to_zero():
+    report = run_duplicate_evaluation(['easy', 'medium', 'hard'], deals=4, workers=1, base_seed=3)
+    assert (report["games"], report["plain_games"]) == (12, 12)
+    assert math.isclose(sum(result["mean"] for result in report["results"]), 0.0, abs_tol=1e-9)
+    assert all("variance_reduction" in result for result in report["results"])
+    assert report == run_duplicate_evaluation(['easy', 'medium', 'hard'], deals=4, workers=1, base_seed=3)
+
+def test_at_least_one_deal_is_needed():
+    with pytest.raises(ValueError):
+        run_duplicate_evaluation(['easy', 'hard'], deals=0, workers=1)
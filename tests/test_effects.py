@@ -0,0 +1,76 @@
+from street_blackjack.engine import (
+    CANCEL, CHANGE_SUIT, COVER, MISS_A_TURN, PICK_UP_FIVE, PICK_UP_TWO, REVERSE, GameState, add_special_indicator,
+    resolve_effects)
+from street_blackjack.game import apply_special_effect
+
+PLAYERS = ['PLAYER 1', 'PLAYER 2', 'PLAYER 3', 'PLAYER 4']
+
+def resolve(cards, game_state=None, suit='Hearts'):
+    game_state = game_state or GameState(list(PLAYERS))
+    chosen = []
+    def choose_suit(player):
+        chosen.append(player)
+        return suit
+    effect, top_card, events = resolve_effects(cards, 'PLAYER 1', game_state, choose_suit)
+    return game_state, effect, top_card, events, chosen
+
+# What the single-file game's apply_special_effect did to the game state for each effect
+
+def test_pick_up_two_and_five_add_to_the_stack():
+    game_state, effect, top_card, _, _ = resolve(['2 of Hearts'])
+    assert (effect, top_card, game_state.pick_up_stack, game_state.last_effect) == \
+        (PICK_UP_TWO, '2 of Hearts', 2, PICK_UP_TWO)
+    game_state, effect, _, _, _ = resolve(['Jack of Clubs'], game_state)
+    assert (effect, game_state.pick_up_stack, game_state.last_effect) == (PICK_UP_FIVE, 7, PICK_UP_FIVE)
+
+def test_miss_a_turn_skips_the_next_player_in_the_direction_of_play():
+    game_state, effect, _, _, _ = resolve(['8 of Hearts'])
+    assert effect == MISS_A_TURN
+    assert game_state.missed_turns == {'PLAYER 1': 0, 'PLAYER 2': 1, 'PLAYER 3': 0, 'PLAYER 4': 0}
+    game_state = GameState(list(PLAYERS))
+    game_state.reverse_direction()
+    resolve(['8 of Hearts'], game_state)
+    assert game_state.missed_turns['PLAYER 4'] == 1
+
+def test_cover_asks_for_the_card_to_be_covered():
+    game_state, effect, top_card, _, _ = resolve(['Queen of Spades'])
+    assert (effect, top_card, game_state.last_effect) == (COVER, 'Queen of Spades', COVER)
+    assert game_state.cover_card == add_special_indicator('Queen of Spades')
+
+def test_cancel_clears_a_pick_up_stack_only():
+    game_state, _, _, _, _ = resolve(['2 of Hearts'])
+    _, effect, _, events, _ = resolve(['Jack of Hearts'], game_state)
+    assert (effect, game_state.pick_up_stack, game_state.last_effect, events[-1].value) == (CANCEL, 0, None, 2)
+    game_state = GameState(list(PLAYERS))
+    game_state.pick_up_stack = 3  # Left over, but the last effect was not a Pick Up
+    resolve(['Jack of Diamonds'], game_state)
+    assert game_state.pick_up_stack == 3
+
+def test_reverse_turns_the_direction_of_play():
+    game_state, effect, _, _, _ = resolve(['King of Clubs'])
+    assert (effect, game_state.direction) == (REVERSE, -1)
+    resolve(['King of Hearts'], game_state)
+    assert game_state.direction == 1
+
+def test_change_suit_names_the_new_top_card():
+    game_state, effect, top_card, _, chosen = resolve(['Ace of Clubs'], suit='Diamonds')
+    assert (effect, top_card, chosen) == (CHANGE_SUIT, 'Ace of Diamonds', ['PLAYER 1'])
+
+def test_runs_count_only_their_trailing_cards_of_one_rank():
+    game_state, effect, top_card, _, _ = resolve(['2 of Hearts', '3 of Hearts', '3 of Clubs'])
+    assert (effect, top_card, game_state.pick_up_stack) == (0, '3 of Clubs', 0)
+    game_state, effect, _, _, _ = resolve(['2 of Hearts', '2 of Clubs', '2 of Spades'])
+    assert (effect, game_state.pick_up_stack) == (PICK_UP_TWO, 6)
+
+def test_misses_add_up_and_the_last_change_suit_wins():
+    game_state, effect, _, _, _ = resolve(['8 of Hearts', '8 of Clubs'])
+    assert effect == MISS_A_TURN
+    assert game_state.missed_turns == {'PLAYER 1': 0, 'PLAYER 2': 1, 'PLAYER 3': 1, 'PLAYER 4': 0}
+    _, effect, top_card, _, chosen = resolve(['Ace of Hearts', 'Ace of Spades'], suit='Clubs')
+    assert (effect, top_card, len(chosen)) == (CHANGE_SUIT, 'Ace of Clubs', 1)
+
+def test_apply_special_effect_keeps_the_single_card_and_run_calls():
+    game_state = GameState(list(PLAYERS))
+    assert apply_special_effect('2 of Hearts', 'PLAYER 1', game_state) == (PICK_UP_TWO, '2 of Hearts')
+    assert apply_special_effect(['5 of Hearts', '5 of Clubs'], 'PLAYER 1', game_state) == (0, '5 of Clubs')
+    assert game_state.pick_up_stack == 2
@@ -0,0 +1,52 @@
+import math
+import threading
+
+from street_blackjack.ai import (
+    AIPlayer, ENDGAME_CARD_VALUE, ENDGAME_DISCOUNT, clear_endgame_table, solve_endgame)
+from street_blackjack.engine import find_valid_runs, find_valid_single_cards
+
+def moves(hand, top_card):
+    singles = find_valid_single_cards(hand, top_card)
+    return singles, find_valid_runs(hand, top_card, singles)
+
+def test_going_out_with_a_run_beats_a_single_card():
+    hand = ['4 of Hearts', '5 of Hearts']
+    singles, runs = moves(hand, '3 of Hearts')
+    action, choice, value = solve_endgame(hand, '3 of Hearts', singles, runs)
+    assert (action, runs[choice - 1] if action == 2 else None, value) == (2, '4 of Hearts - 5 of Hearts', 1.0)
+
+def test_later_turns_are_searched_to_the_end_of_the_hand():
+    clear_endgame_table()
+    hand = ['9 of Clubs', '4 of Spades']
+    singles, runs = moves(hand, '9 of Hearts')
+    # Playing the 9 leaves the 4 of Spades, which 16 of the 52 top cards let us play out next turn
+    draw = ENDGAME_DISCOUNT * ENDGAME_CARD_VALUE ** 2
+    next_turn = (16 * 1.0 + 36 * draw) / 52
+    action, choice, value = solve_endgame(hand, '9 of Hearts', singles, runs)
+    assert (action, choice) == (1, 1)
+    assert math.isclose(value, ENDGAME_DISCOUNT * next_turn)
+
+def test_only_hard_and_adaptive_ais_search_small_hands():
+    assert AIPlayer('AI PLAYER 1', 'hard').solves_endgame(['9 of Clubs', '4 of Spades'])
+    assert not AIPlayer('AI PLAYER 1', 'hard').solves_endgame(['9 of Clubs', '4 of Spades', '5 of Spades'])
+    assert not AIPlayer('AI PLAYER 1', 'medium').solves_endgame(['9 of Clubs'])
+
+def test_the_table_can_be_shared_with_the_planner_thread():
+    hands = [['9 of Clubs', '4 of Spades'], ['5 of Hearts', '7 of Hearts'], ['Queen of Hearts', '3 of Diamonds']]
+    errors = []
+
+    def solve(rounds):
+        try:
+            for _ in range(rounds):
+                for hand in hands:
+                    solve_endgame(hand, '9 of Hearts', *moves(hand, '9 of Hearts'))
+                clear_endgame_table()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=solve, args=(200,)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
@@ -0,0 +1,44 @@
+from street_blackjack.engine import EventBus
+from street_blackjack.simulation import simulate_game
+
+class EventLog:
+    def __init__(self, kinds):
+        self.kinds = kinds
+        self.events = []
+
+    def subscribe(self, bus):
+        for kind in self.kinds:
+            bus.subscribe(kind, self.events.append)
+
+def test_consumers_hear_each_event_in_the_order_they_subscribed():
+    bus = EventBus()
+    heard = []
+    bus.subscribe('move', lambda event: heard.append(('first', event.turn)))
+    bus.subscribe('move', lambda event: heard.append(('second', event.turn)))
+    bus.publish('move', 1, None)
+    bus.publish('move', 2, None)
+    bus.publish('win', 3, None)  # Nobody subscribed: nothing is built or delivered
+    assert heard == [('first', 1), ('second', 1), ('first', 2), ('second', 2)]
+    assert bus.wants('move') and not bus.wants('win')
+
+def test_a_game_publishes_its_events_in_play_order():
+    log = EventLog(['deal', 'turn', 'play', 'draw', 'move', 'reshuffle', 'win'])
+    simulate_game(['easy', 'medium', 'hard'], seed=11, consumers=[log])
+    kinds = [event.kind for event in log.events]
+    assert kinds[0] == 'deal' and kinds[-1] == 'win' and kinds.count('win') == 1
+    for index, event in enumerate(log.events):
+        if event.kind == 'turn':
+            # A turn's play and draw events come before its move, and the next turn after it
+            following = kinds[index + 1:kinds.index('move', index)]
+            assert set(following) <= {'play', 'draw', 'reshuffle'}
+    assert [event.turn for event in log.events if event.kind == 'move'] == \
+        sorted(event.turn for event in log.events if event.kind == 'move')
+
+def test_reshuffles_between_turns_always_put_cards_back():
+    log = EventLog(['reshuffle'])
+    for seed in range(10):
+        # Six hands of seven leave a short deck, so it is checked for a reshuffle before nearly every turn
+        simulate_game(['easy', 'medium', 'hard', 'adaptive', 'easy', 'medium'], seed=seed, consumers=[log])
+    between_turns = [event for event in log.events if event.value == 'between turns']
+    assert between_turns
+    assert all(event.cards for event in between_turns)
@@ -0,0 +1,10 @@
+from street_blackjack.fuzz import run_move_fuzz
+
+def test_fast_move_generators_agree_with_the_references_under_house_rules_too():
+    report = run_move_fuzz(300, seed=3)
+    assert all(result['checked'] > 0 for result in report['functions'])
+    assert [result['mismatches'] for result in report['functions']] == [0] * len(report['functions'])
+
+def test_two_deck_shoes_agree_as_well():
+    report = run_move_fuzz(200, seed=4, num_decks=2, rules=False)
+    assert sum(result['mismatches'] for result in report['functions']) == 0
@@ -0,0 +1,76 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from street_blackjack.bots import BotTableServer
+
+@pytest.fixture
+def server():
+    server = BotTableServer(('127.0.0.1', 0), move_timeout=5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def call(server, method, path, body=None):
+    connection = http.client.HTTPConnection(*server.server_address, timeout=10)
+    try:
+        connection.request(method, path, json.dumps(body) if body is not None else None,
+                           {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+def last_move(moves):
+    return moves["moves"][-1]["id"]  # Runs come last, so this gets rid of cards fastest
+
+def test_a_bot_plays_a_table_to_the_end_over_http(server):
+    status, state = call(server, 'POST', '/tables', {"seats": ['external', 'easy'], "seed": 3})
+    assert status == 201
+    table = state["table"]
+    assert "hand" in state["seats"][0] and "hand" not in state["seats"][1]
+    for _ in range(2000):
+        if state["status"] != 'running':
+            break
+        status, moves = call(server, 'GET', f'/tables/{table}/moves')
+        assert status == 200 and moves["seat"] == 0 and moves["moves"][0] == {"action": "draw", "id": 0}
+        status, state = call(server, 'POST', f'/tables/{table}/moves',
+                             {"move": last_move(moves), "decision": moves["decision"]})
+        assert status == 200
+    assert state["status"] == 'finished'
+    assert state["winner_seat"] in (0, 1, None)
+    status, _ = call(server, 'DELETE', f'/tables/{table}')
+    assert status == 200
+    assert call(server, 'GET', f'/tables/{table}')[0] == 404
+
+def test_bad_requests_are_refused(server):
+    assert call(server, 'POST', '/tables', {"seats": ['external']})[0] == 400
+    assert call(server, 'GET', '/tables/99/moves')[0] == 404
+    _, state = call(server, 'POST', '/tables', {"seats": ['external', 'hard'], "seed": 1})
+    table = state["table"]
+    _, moves = call(server, 'GET', f'/tables/{table}/moves')
+    assert call(server, 'POST', f'/tables/{table}/moves', {"move": len(moves["moves"])})[0] == 400
+    assert call(server, 'POST', f'/tables/{table}/moves', {"move": 0, "decision": moves["decision"] + 1})[0] == 400
+    call(server, 'DELETE', f'/tables/{table}')
+
+def test_a_batch_moves_every_table_in_one_round_trip(server):
+    tables = [call(server, 'POST', '/tables', {"seats": ['external', 'medium'], "seed": seed})[1]["table"]
+              for seed in (1, 2)]
+    _, reply = call(server, 'POST', '/batch', {"requests": [
+        {"method": "GET", "path": f"/tables/{table}/moves"} for table in tables]})
+    moves = [response["body"] for response in reply["responses"]]
+    _, reply = call(server, 'POST', '/batch', {"requests": [
+        {"method": "POST", "path": f"/tables/{table}/moves", "body": {"move": 0, "decision": table_moves["decision"]}}
+        for table, table_moves in zip(tables, moves)] + [{"method": "POST", "path": "/batch"}]})
+    responses = reply["responses"]
+    assert [response["status"] for response in responses] == [200, 200, 400]
+    for table, table_moves, response in zip(tables, moves, responses):
+        state = response["body"]
+        assert state["table"] == table
+        assert state["status"] != 'running' or state["pending"]["decision"] > table_moves["decision"]
+    for table in tables:
+        call(server, 'DELETE', f'/tables/{table}')
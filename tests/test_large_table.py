@@ -0,0 +1,33 @@
+import collections
+
+from street_blackjack.engine import find_pickup_runs, find_valid_runs, find_valid_single_cards, ranks
+from street_blackjack.simulation import SIMULATION_MAX_TURNS, run_scaling_benchmark, simulate_game
+
+def test_a_full_large_table_plays_out():
+    line_up = ['easy', 'medium', 'hard', 'adaptive', 'learning'] * 8
+    winner, turns, stats = simulate_game(line_up, num_decks=8, cards_per_player=10, seed=5)
+    assert 0 < turns <= SIMULATION_MAX_TURNS
+    assert winner is not None or turns == SIMULATION_MAX_TURNS
+    assert len(stats) == 40
+
+def test_pickup_runs_do_not_repeat_interchangeable_copies():
+    hand = ['2 of Hearts', '2 of Hearts', '2 of Hearts', 'Jack of Clubs', '7 of Spades']
+    runs = find_pickup_runs(hand)
+    assert len(runs) == len(set(runs))
+    assert sorted(runs) == sorted([
+        ('2 of Hearts', '2 of Hearts'), ('2 of Hearts', 'Jack of Clubs'),
+        ('2 of Hearts', '2 of Hearts', '2 of Hearts'), ('2 of Hearts', '2 of Hearts', 'Jack of Clubs'),
+        ('2 of Hearts', '2 of Hearts', '2 of Hearts', 'Jack of Clubs')])
+
+def test_straights_round_a_whole_suit_never_reuse_a_card():
+    hand = [f"{rank} of Spades" for rank in ranks]
+    singles = find_valid_single_cards(hand, '5 of Spades')
+    for run in find_valid_runs(hand, '5 of Spades', singles):
+        cards = run.split(' - ')
+        assert max(collections.Counter(cards).values()) == 1
+
+def test_scaling_benchmark_reports_every_table():
+    report = run_scaling_benchmark(tables=[(2, 1), (6, 2)], games=1)
+    assert [(row["players"], row["decks"]) for row in report["rows"]] == [(2, 1), (6, 2)]
+    assert all(row["turns"] > 0 and row["us_per_turn"] > 0 for row in report["rows"])
+    assert report["hotspots"] and report["large_total"] > 0
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from street_blackjack import engine
+from street_blackjack.engine import PacingController
+from street_blackjack.game import play_game
+
+@pytest.fixture
+def waits(monkeypatch):
+    """Records every prompt and sleep instead of waiting for them."""
+    recorded = []
+    monkeypatch.setattr('builtins.input', lambda prompt='': recorded.append(('input', prompt)) or '')
+    monkeypatch.setattr(time, 'sleep', lambda seconds: recorded.append(('sleep', seconds)))
+    return recorded
+
+def test_interactive_pacing_prompts_and_sleeps(waits):
+    pacing = PacingController('interactive')
+    pacing.end_turn()
+    pacing.sleep(3)
+    assert waits == [('input', "Press Enter to continue..."), ('sleep', 3)]
+
+def test_spectator_pacing_waits_a_fixed_delay_without_prompts(waits):
+    pacing = PacingController('spectator', turn_delay=0.25)
+    pacing.confirm()
+    pacing.end_turn()
+    pacing.sleep(3)
+    assert waits == [('sleep', 0.25), ('sleep', 0.25)]
+
+def test_batch_pacing_never_waits(waits):
+    pacing = PacingController('batch')
+    pacing.confirm()
+    pacing.end_turn()
+    pacing.sleep(3)
+    assert waits == []
+
+def test_unknown_modes_are_refused():
+    with pytest.raises(ValueError):
+        PacingController('fast')
+
+def test_a_spectated_ai_game_never_prompts(waits, capsys):
+    engine.pacing.set_mode('spectator', 0.0)
+    winner, turns, _ = play_game(0, 3, 1, 7, {'AI PLAYER 1': 'easy', 'AI PLAYER 2': 'medium', 'AI PLAYER 3': 'hard'},
+                                 seed=2)
+    assert turns > 0
+    assert capsys.readouterr().out
+    assert [kind for kind, _ in waits if kind == 'input'] == []
+    assert all(seconds == 0.0 for kind, seconds in waits)
@@ -0,0 +1,30 @@
+from street_blackjack.game import StatsCollector
+from street_blackjack.simulation import (
+    SIMULATION_MAX_TURNS, SimulationTotals, run_parallel_simulation, seat_difficulties, simulate_game)
+
+LINE_UP = ['easy', 'medium', 'hard', 'easy']
+
+def serial_totals(games, base_seed):
+    layout = SimulationTotals(LINE_UP, SIMULATION_MAX_TURNS)
+    slot = [0] * layout.size
+    for game_index in range(games):
+        line_up = seat_difficulties(LINE_UP, game_index)
+        winner, turns, stats = simulate_game(line_up, seed=base_seed + game_index, consumers=[StatsCollector()])
+        layout.add_game(slot, line_up, winner, turns, stats)
+    return slot
+
+def test_parallel_totals_match_a_serial_run():
+    expected = serial_totals(10, base_seed=7)
+    one_worker = run_parallel_simulation(LINE_UP, games=10, workers=1, base_seed=7)
+    three_workers = run_parallel_simulation(LINE_UP, games=10, workers=3, base_seed=7)
+    assert one_worker["totals"] == three_workers["totals"] == expected
+    assert three_workers["games"] == 10 and three_workers["workers"] == 3
+    assert round(sum(three_workers["win_rate_by_seat"]) * 10) + three_workers["no_winner"] == 10
+
+def test_maxima_are_combined_and_everything_else_is_summed():
+    layout = SimulationTotals(['easy', 'hard'], max_turns=3)
+    first = list(range(layout.size))
+    second = [2 * value for value in first]
+    total = layout.reduce(first + second, 2)
+    for offset in range(layout.size):
+        assert total[offset] == (second[offset] if layout.is_maximum(offset) else 3 * first[offset])
@@ -0,0 +1,90 @@
+from street_blackjack.engine import CARD_IDS, card_name, get_special_effect
+from street_blackjack.records import (
+    ACTION_PASS, ACTION_RUN, ACTION_SINGLE, GameEndRecord, GameRecorder, GameRecordReader, GameReplay, GameStartRecord,
+    RECORD_TURN, ReshuffleRecord, TurnRecord, check_keyframes, merge_record_files)
+from street_blackjack.simulation import seat_difficulties, simulate_game
+
+LINE_UP = ['easy', 'medium', 'hard']
+
+class MoveLog:
+    """Keeps the cards of every 'move' event, to compare with what the recorder wrote."""
+
+    def __init__(self):
+        self.moves = []
+
+    def subscribe(self, bus):
+        bus.subscribe('move', self.on_move)
+
+    def on_move(self, event):
+        move = event.value
+        self.moves.append((event.turn, bytes(CARD_IDS[card] for card in move.played),
+                           bytes(CARD_IDS[card] for card in move.drawn), CARD_IDS[event.top_card]))
+
+def record_games(path, games, consumers=()):
+    with GameRecorder(path) as recorder:
+        for game_index in range(games):
+            simulate_game(seat_difficulties(LINE_UP, game_index), seed=game_index, recorder=recorder,
+                          consumers=consumers)
+
+def test_turns_decode_to_the_moves_that_were_played(tmp_path):
+    path = str(tmp_path / "games.bjrec")
+    log = MoveLog()
+    record_games(path, 3, consumers=[log])
+    with GameRecordReader(path) as reader:
+        records = list(reader)
+        turns = [(record.turn, record.played, record.drawn, record.top_card)
+                 for record in reader.turns() if record.action != ACTION_PASS]
+        assert sum(reader.count_turns().values()) == sum(1 for _ in reader.turns())
+        assert all(record.seat == 1 for record in reader.turns(seat=1))
+        assert {record.game_id for record in reader.records(game_id=2)} == {2}
+    assert turns == log.moves
+    assert [record.game_id for record in records if isinstance(record, GameStartRecord)] == [0, 1, 2]
+    assert [record.game_id for record in records if isinstance(record, GameEndRecord)] == [0, 1, 2]
+    for record in records:
+        if isinstance(record, TurnRecord) and record.played:
+            assert record.action == (ACTION_SINGLE if len(record.played) == 1 else ACTION_RUN)
+            assert record.effects == bytes(get_special_effect(card_name(card)) for card in record.played)
+
+def test_recorder_appends_with_new_game_ids(tmp_path):
+    path = str(tmp_path / "games.bjrec")
+    record_games(path, 2)
+    record_games(path, 1)
+    with GameRecordReader(path) as reader:
+        assert [record.game_id for record in reader.records(record_types=(RECORD_TURN,))][-1] == 2
+
+def test_merged_parts_match_a_sequential_recording(tmp_path):
+    sequential = str(tmp_path / "sequential.bjrec")
+    record_games(sequential, 5)
+    parts = [str(tmp_path / f"part-{worker}.bjrec") for worker in range(2)]
+    for worker, part in enumerate(parts):
+        with GameRecorder(part) as recorder:
+            for game_index in range(worker, 5, 2):
+                simulate_game(seat_difficulties(LINE_UP, game_index), seed=game_index, recorder=recorder)
+    merged = str(tmp_path / "merged.bjrec")
+    merge_record_files(parts, merged)
+    for suffix in ('', '.idx'):
+        with open(sequential + suffix, 'rb') as expected, open(merged + suffix, 'rb') as actual:
+            assert actual.read() == expected.read()
+
+def test_seek_lands_on_the_recorded_turn(tmp_path):
+    path = str(tmp_path / "games.bjrec")
+    record_games(path, 2)
+    with GameRecordReader(path) as reader:
+        turns = list(reader.turns(game_id=1))
+    target = turns[len(turns) // 2].turn
+    with GameReplay(path) as replay:
+        state = replay.seek(1, target)
+    assert state.turn == target
+    assert state.top_card == [record.top_card for record in turns if record.turn == target][-1]
+
+def test_replays_reproduce_every_keyframe(tmp_path):
+    path = str(tmp_path / "games.bjrec")
+    with GameRecorder(path, keyframe_interval=4) as recorder:
+        for game_index in range(20):
+            line_up = ['easy', 'medium', 'hard', 'adaptive', 'easy', 'medium'][:2 + game_index % 5]
+            simulate_game(line_up, num_decks=1 + game_index % 2, seed=game_index, recorder=recorder)
+    with GameRecordReader(path) as reader:
+        assert any(isinstance(record, ReshuffleRecord) for record in reader)
+    checked, mismatches = check_keyframes(path)
+    assert checked > 100
+    assert mismatches == []
@@ -0,0 +1,22 @@
+from street_blackjack.simulation import CORPUS_PATH, run_corpus_benchmark
+
+def small_corpus(path, lines):
+    with open(CORPUS_PATH) as f:
+        cases = f.readlines()[:lines]
+    with open(path, 'w') as f:
+        f.writelines(cases)
+    return str(path)
+
+def test_a_baseline_from_another_corpus_fails_until_it_is_rebuilt(tmp_path):
+    baseline = str(tmp_path / "baseline.json")
+    first = run_corpus_benchmark(small_corpus(tmp_path / "corpus.jsonl", 4), baseline, repeats=1)
+    assert first["baseline_written"] and not first["stale"]
+    again = run_corpus_benchmark(str(tmp_path / "corpus.jsonl"), baseline, repeats=1)
+    assert set(again["comparison"]) == set(first["phases"])
+
+    changed = small_corpus(tmp_path / "corpus.jsonl", 5)
+    report = run_corpus_benchmark(changed, baseline, repeats=1)
+    assert report["stale"] and report["comparison"] == {} and not report["baseline_written"]
+    rebuilt = run_corpus_benchmark(changed, baseline, repeats=1, update_baseline=True)
+    assert rebuilt["baseline_written"] and not rebuilt["stale"]
+    assert not run_corpus_benchmark(changed, baseline, repeats=1)["stale"]
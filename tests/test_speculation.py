@@ -0,0 +1,62 @@
+from street_blackjack.engine import find_valid_runs, find_valid_single_cards
+from street_blackjack.game import SpeculativePlanner, StatsCollector, play_game
+
+def name(player):
+    return getattr(player, 'name', player)
+
+class ScriptedHuman:
+    """Answers the human prompts: play the first valid card when there is one, otherwise draw."""
+
+    def __init__(self):
+        self.last_prompt = None
+
+    def __call__(self, prompt=''):
+        answer = '1'
+        if prompt == self.last_prompt and prompt.startswith("Enter the number"):
+            answer = '3'  # The first card was not on offer, so draw instead
+        self.last_prompt = prompt
+        return answer
+
+class CheckedPlanner(SpeculativePlanner):
+    """Checks every move list handed to an AI against one worked out on the spot."""
+
+    def __init__(self):
+        super().__init__()
+        self.hits = 0
+
+    def take(self, ai_player, hand, top_card):
+        planned = super().take(ai_player, hand, top_card)
+        if planned is not None:
+            self.hits += 1
+            singles = find_valid_single_cards(list(hand), top_card)
+            assert planned == (singles, find_valid_runs(list(hand), top_card, singles))
+        return planned
+
+class TurnLog:
+    def __init__(self):
+        self.events = []
+
+    def subscribe(self, bus):
+        for kind in ('turn', 'move', 'draw', 'win'):
+            bus.subscribe(kind, self.on_event)
+
+    def on_event(self, event):
+        self.events.append((event.kind, name(event.player), tuple(event.cards), event.top_card))
+
+def play(seed, monkeypatch, planner=None):
+    monkeypatch.setattr('builtins.input', ScriptedHuman())
+    log = TurnLog()
+    consumers = [StatsCollector(), log] + ([planner] if planner else [])
+    winner, turns, stats = play_game(1, 2, 1, 7, {'AI PLAYER 1': 'hard', 'AI PLAYER 2': 'learning'}, seed=seed,
+                                     event_handler=None, max_turns=300, consumers=consumers)
+    return name(winner), turns, {name(player): player_stats for player, player_stats in stats.items()}, log.events
+
+def test_speculated_moves_match_and_leave_games_unchanged(monkeypatch, capsys):
+    hits = 0
+    for seed in range(4):
+        planner = CheckedPlanner()
+        assert play(seed, monkeypatch, planner) == play(seed, monkeypatch)
+        assert planner.thread is None
+        hits += planner.hits
+    capsys.readouterr()
+    assert hits > 0
@@ -0,0 +1,79 @@
+import ast
+import array
+import csv
+import os
+
+from street_blackjack.stats import StatsStore, StreamingStat
+
+def game_stats(*rows):
+    return {f'AI PLAYER {seat + 1}': dict(zip(("cards_drawn", "runs_played", "single_cards_played", "longest_run"), row))
+            for seat, row in enumerate(rows)}
+
+def fill(store, games):
+    difficulties = {'AI PLAYER 1': 'hard', 'AI PLAYER 2': 'easy'}
+    for game in range(games):
+        winner = None if game % 3 == 2 else f'AI PLAYER {game % 2 + 1}'
+        store.append_game(winner, 10 + game, game_stats((game, 1, 2, 3), (0, 2, 1, 4)), seed=100 + game,
+                          num_decks=1, cards_per_player=7, difficulties=difficulties)
+
+def read_npy(path):
+    with open(path, 'rb') as f:
+        assert f.read(8) == b'\x93NUMPY\x01\x00'
+        header = ast.literal_eval(f.read(int.from_bytes(f.read(2), 'little')).decode('latin1'))
+        data = f.read()
+    typecode = {'i1': 'b', 'u1': 'B', 'i4': 'i', 'i8': 'q', 'u8': 'Q'}[header['descr'][1:]]
+    values = array.array(typecode, data)
+    assert len(values) == header['shape'][0]
+    return list(values)
+
+def test_streaming_stat_matches_direct_computation():
+    values = [3, 1, 4, 1, 5, 9, 2, 6]
+    stat, other = StreamingStat(), StreamingStat()
+    for value in values[:5]:
+        stat.add(value)
+    for value in values[5:]:
+        other.add(value)
+    stat.merge(other)
+    mean = sum(values) / len(values)
+    assert stat.count == len(values)
+    assert abs(stat.mean - mean) < 1e-12
+    assert abs(stat.variance - sum((value - mean) ** 2 for value in values) / (len(values) - 1)) < 1e-12
+    assert (stat.minimum, stat.maximum, stat.percentile(50)) == (1, 9, 3)
+    assert StreamingStat().load_state(stat.state()).state() == stat.state()
+
+def test_aggregates_and_exports_survive_spilling(tmp_path):
+    store = StatsStore(spill_dir=str(tmp_path / "spill"), chunk_rows=4)
+    fill(store, 10)
+    assert len(store) == 10 and store.games.spilled_rows == 8
+    summary = store.summary()
+    assert summary["no_winner_games"] == 3
+    assert summary["turns"]["max"] == 19
+    assert store.wins_by_difficulty == {'hard': 3, 'easy': 4}
+
+    store.export_csv(str(tmp_path / "csv"))
+    with open(tmp_path / "csv" / "games.csv") as f:
+        games = list(csv.DictReader(f))
+    assert [int(row["seed"]) for row in games] == list(range(100, 110))
+    assert [int(row["winner_seat"]) for row in games][:3] == [0, 1, -1]
+
+    store.export_npy(str(tmp_path / "npy"))
+    assert read_npy(tmp_path / "npy" / "games.turns.npy") == list(range(10, 20))
+    assert read_npy(tmp_path / "npy" / "players.cards_drawn.npy")[:4] == [0, 0, 1, 0]
+    assert sorted(os.listdir(tmp_path / "npy")) == sorted(
+        f"{table.name}.{column}.npy" for table in (store.games, store.players) for column, _ in table.columns)
+
+def test_merge_spilled_takes_games_in_turn(tmp_path):
+    parts = []
+    for worker in range(2):
+        part = StatsStore(spill_dir=str(tmp_path / f"worker-{worker}"), chunk_rows=3)
+        fill(part, 5 - worker)
+        part.flush()
+        parts.append(part)
+    merged = StatsStore()
+    merged.merge_spilled([part.spill_dir for part in parts])
+    assert len(merged) == 9
+    assert list(merged.games.column("seed")) == [100, 100, 101, 101, 102, 102, 103, 103, 104]
+    assert list(merged.games.column("game_id")) == list(range(9))
+    assert list(merged.players.column("game_id")) == [game for game in range(9) for _ in range(2)]
+    assert merged.wins_by_difficulty == parts[0].wins_by_difficulty + parts[1].wins_by_difficulty
+    merged.close()
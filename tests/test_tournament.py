@@ -0,0 +1,29 @@
+import math
+
+from street_blackjack.simulation import ELO_SCALE, fit_bradley_terry
+
+def test_an_even_record_rates_both_sides_equally():
+    ratings, errors = fit_bradley_terry(['easy', 'hard'], {('easy', 'hard'): 10, ('hard', 'easy'): 10})
+    assert ratings['easy'] == ratings['hard'] == 0.0
+    assert errors['easy'] == errors['hard'] > 0.0
+
+def test_the_prior_counts_the_same_for_both_sides():
+    wins = {('easy', 'hard'): 3, ('hard', 'easy'): 9}
+    ratings, _ = fit_bradley_terry(['easy', 'hard'], wins, prior=0.5)
+    # Two players: the fit is exact, at (9 + 0.5) / (3 + 0.5) odds
+    assert math.isclose(ratings['hard'] - ratings['easy'], math.log(9.5 / 3.5) * ELO_SCALE)
+
+def test_ratings_do_not_depend_on_the_order_of_the_names():
+    wins = {('easy', 'medium'): 4, ('medium', 'easy'): 8, ('medium', 'hard'): 5, ('hard', 'medium'): 7,
+            ('easy', 'hard'): 2, ('hard', 'easy'): 10}
+    forward, forward_errors = fit_bradley_terry(['easy', 'medium', 'hard'], wins)
+    backward, backward_errors = fit_bradley_terry(['hard', 'medium', 'easy'], wins)
+    for name in forward:
+        assert math.isclose(forward[name], backward[name], abs_tol=1e-6)
+        assert math.isclose(forward_errors[name], backward_errors[name], rel_tol=1e-6)
+    assert forward['easy'] < forward['medium'] < forward['hard']
+
+def test_an_unbeaten_player_still_gets_a_finite_rating():
+    ratings, errors = fit_bradley_terry(['easy', 'hard'], {('hard', 'easy'): 12})
+    assert math.isfinite(ratings['hard']) and ratings['hard'] > 0
+    assert all(math.isfinite(error) for error in errors.values())
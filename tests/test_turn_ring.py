@@ -0,0 +1,52 @@
+from street_blackjack.engine import GameState, TurnRing
+
+def seating(ring, start, direction=1):
+    return list(ring.walk(start, direction))
+
+def test_ring_steps_both_ways_and_wraps():
+    ring = TurnRing(['A', 'B', 'C', 'D'])
+    assert ring.step('D') == 'A'
+    assert ring.step('A', -1) == 'D'
+    assert seating(ring, 'C') == ['C', 'D', 'A', 'B']
+    assert seating(ring, 'C', -1) == ['C', 'B', 'A', 'D']
+
+def test_ring_insertion_and_removal_keep_the_links_consistent():
+    ring = TurnRing(['A', 'B', 'C'])
+    version = ring.version
+    ring.insert_after('A', 'E')
+    ring.remove('C')
+    assert ring.version == version + 2
+    assert seating(ring, 'A') == ['A', 'E', 'B']
+    assert seating(ring, 'A', -1) == ['A', 'B', 'E']
+    for player in ('A', 'E', 'B'):
+        assert ring.step(ring.step(player), -1) == player
+    for player in ('A', 'E'):
+        ring.remove(player)
+    assert len(ring) == 1 and ring.step('B') == 'B'
+    ring.remove('B')
+    ring.insert_after(None, 'F')
+    assert seating(ring, 'F') == ['F']
+
+def test_reversal_and_stacked_skips_follow_the_current_direction():
+    game_state = GameState(['A', 'B', 'C', 'D', 'E'])
+    assert game_state.player_after('A', 2) == 'C'
+    game_state.reverse_direction()
+    assert game_state.player_after('A', 2) == 'D'
+    game_state.missed_turns['E'] = 2
+    game_state.missed_turns['D'] = 1
+    assert game_state.next_player() == 'C'  # E and D are both skipped going counter-clockwise
+    game_state.current_player = 'A'
+    assert game_state.next_player() == 'D'  # E still owed a second missed turn
+    assert set(game_state.missed_turns.values()) == {0}
+
+def test_players_leave_and_join_without_disturbing_the_turn_order():
+    game_state = GameState(['A', 'B', 'C', 'D'])
+    game_state.current_player = 'B'
+    game_state.remove_player('B')
+    assert game_state.next_player() == 'C'
+    game_state.add_player('E')
+    assert seating(game_state.ring, 'C') == ['C', 'D', 'A', 'E']
+    assert game_state.seats['E'] == 4
+    game_state.reverse_direction()
+    game_state.add_player('F')  # Joins just before C's next turn in the new direction
+    assert seating(game_state.ring, 'C', -1) == ['C', 'E', 'A', 'D', 'F']